@@ -0,0 +1,107 @@
+"""Набор бенчмарков экспорта таблиц и графиков в реальные файлы xlsx.
+
+Каждый сценарий запускается в отдельном процессе, чтобы пиковая память не зависела от остальных.
+Измеряются время, прирост пиковой памяти процесса (RSS) и размер файла.
+
+Запуск:
+    python -m benchmarks [--case NAME ...] [--scale N] [--repeat N] [--save results.json] [--compare baseline.json]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.cases import CASES
+
+
+def peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss в Linux возвращается в килобайтах, в macOS - в байтах
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_case(name, scale):
+    """Выполняет сценарий в текущем процессе и возвращает его метрики"""
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, '%s.xlsx' % name)
+
+        rss_before = peak_rss_bytes()
+        started = time.perf_counter()
+        CASES[name](filename, scale)
+        elapsed = time.perf_counter() - started
+
+        return {
+            'time': elapsed,
+            'peak_rss': max(peak_rss_bytes() - rss_before, 0),
+            'size': os.path.getsize(filename),
+        }
+
+
+def run_isolated(name, scale):
+    output = subprocess.check_output(
+        [sys.executable, '-m', 'benchmarks', '--child', name, '--scale', str(scale)]
+    )
+    return json.loads(output)
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, metrics in results.items():
+        if name not in baseline:
+            continue
+
+        for metric in ('time', 'peak_rss', 'size'):
+            before = baseline[name][metric]
+            if before and metrics[metric] > before * (1 + threshold):
+                regressions.append('%s.%s: %.3g -> %.3g (%+.0f%%)' % (
+                    name, metric, before, metrics[metric], (metrics[metric] / before - 1) * 100))
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    parser.add_argument('--case', action='append', choices=sorted(CASES), help='run only selected cases')
+    parser.add_argument('--scale', type=int, default=1, help='multiply rows/tables count')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per case, the fastest is reported')
+    parser.add_argument('--save', help='save results to json file')
+    parser.add_argument('--compare', help='compare with results saved earlier')
+    parser.add_argument('--threshold', type=float, default=0.1, help='allowed regression, 0.1 = 10%%')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_case(args.child, args.scale)))
+        return
+
+    results = {}
+    for name in args.case or sorted(CASES):
+        runs = [run_isolated(name, args.scale) for _ in range(0, args.repeat)]
+        results[name] = min(runs, key=lambda metrics: metrics['time'])
+
+        metrics = results[name]
+        print('%-22s %8.3fs %10.1f MB %10.1f KB' % (
+            name, metrics['time'], metrics['peak_rss'] / 2 ** 20, metrics['size'] / 2 ** 10))
+
+    if args.save:
+        with open(args.save, 'w') as fh:
+            json.dump({'scale': args.scale, 'results': results}, fh, indent=2)
+
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+
+        regressions = compare(results, baseline['results'], args.threshold)
+        for regression in regressions:
+            print('REGRESSION', regression)
+
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
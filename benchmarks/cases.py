@@ -0,0 +1,164 @@
+"""Сценарии бенчмарков экспорта: каждый сценарий строит workbook и записывает его в файл"""
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+from pandex import Sheet, Table, ChunkedTable, Side, LineChart, ColumnChart, Threshold, TopN, ColorScale
+
+CASES = {}
+
+
+def case(function):
+    CASES[function.__name__] = function
+    return function
+
+
+def _frame(rows, cols):
+    return pd.DataFrame(np.random.randn(rows, cols), columns=['c%d' % i for i in range(0, cols)])
+
+
+def _write(filename, tables, options=None, streaming=False, native=False):
+    workbook = xlsxwriter.Workbook(filename, options or {})
+    sheet = Sheet(workbook, 'Bench', streaming=streaming, native=native)
+
+    group = sheet.create_shape()
+    for table in tables:
+        group.add(table, side=Side.BOTTOM, margin_rows=1)
+
+    if streaming or native:
+        sheet.flush()
+
+    workbook.close()
+
+
+@case
+def flat_tall(filename, scale):
+    _write(filename, [Table(_frame(100000 * scale, 5))])
+
+
+@case
+def flat_wide(filename, scale):
+    _write(filename, [Table(_frame(1000 * scale, 500))])
+
+
+@case
+def multi_header(filename, scale):
+    columns = pd.MultiIndex.from_product([['a%d' % i for i in range(0, 4)],
+                                          ['b%d' % i for i in range(0, 5)],
+                                          ['c%d' % i for i in range(0, 5)]])
+    df = pd.DataFrame(np.random.randn(5000 * scale, len(columns)), columns=columns)
+
+    _write(filename, [Table(df)])
+
+
+@case
+def wide_multi_header(filename, scale):
+    # 4 уровня колонок, 16000 колонок - почти предел листа Excel (16384)
+    columns = pd.MultiIndex.from_product([['a%d' % i for i in range(0, 5)],
+                                          ['b%d' % i for i in range(0, 8)],
+                                          ['c%d' % i for i in range(0, 20)],
+                                          ['d%d' % i for i in range(0, 20)]])
+    df = pd.DataFrame(np.random.randn(5 * scale, len(columns)), columns=columns)
+
+    _write(filename, [Table(df)])
+
+
+@case
+def multi_index(filename, scale):
+    index = pd.MultiIndex.from_product([['a%d' % i for i in range(0, 10 * scale)],
+                                        ['b%d' % i for i in range(0, 50)],
+                                        ['c%d' % i for i in range(0, 100)]])
+    df = pd.DataFrame(np.random.randn(len(index), 5), index=index, columns=['v%d' % i for i in range(0, 5)])
+
+    _write(filename, [Table(df)])
+
+
+@case
+def mixed_dtypes(filename, scale):
+    rows = 50000 * scale
+    df = pd.DataFrame({
+        'float': np.random.randn(rows),
+        'int': np.arange(rows),
+        'bool': np.arange(rows) % 2 == 0,
+        'date': pd.date_range('2020-01-01', periods=rows, freq='min'),
+        'text': np.array(['alpha', 'beta', 'gamma', None], dtype=object)[np.arange(rows) % 4],
+        'category': pd.Categorical(np.array(['x', 'y', 'z'])[np.arange(rows) % 3]),
+    })
+
+    _write(filename, [Table(df)])
+
+
+@case
+def categorical(filename, scale):
+    rows = 100000 * scale
+    keys = np.array(['north', 'south', 'east', 'west'])
+    df = pd.DataFrame({
+        'region': pd.Categorical(keys[np.arange(rows) % 4]),
+        'segment': np.array(['retail', 'wholesale', 'online'], dtype=object)[np.arange(rows) % 3],
+        'value': np.random.randn(rows),
+    }, index=pd.Index(keys[np.arange(rows) % 4]))
+
+    _write(filename, [Table(df)])
+
+
+@case
+def many_small_tables(filename, scale):
+    df = _frame(5, 5)
+
+    workbook = xlsxwriter.Workbook(filename)
+    sheet = Sheet(workbook, 'Bench')
+    for _ in range(0, 20 * scale):
+        group = sheet.create_shape(side=Side.BOTTOM, margin_rows=1)
+        for i in range(0, 100):
+            group.add(Table(df), side=Side.RIGHT, margin_cols=1 if i else 0)
+
+    workbook.close()
+
+
+@case
+def charts(filename, scale):
+    # ColumnChart раскрашивает не больше len(ModeColor) колонок
+    df = _frame(5, 5).abs()
+
+    workbook = xlsxwriter.Workbook(filename)
+    sheet = Sheet(workbook, 'Bench')
+    for _ in range(0, 50 * scale):
+        group = sheet.create_shape(side=Side.BOTTOM, margin_rows=1)
+
+        table = Table(df)
+        group.add(table)
+        group.add(LineChart('Line', table, [0, 1, 2]), margin_cols=1)
+        group.add(ColumnChart('Column', table), margin_cols=1)
+
+    workbook.close()
+
+
+@case
+def streaming_flat_tall(filename, scale):
+    _write(filename, [Table(_frame(100000 * scale, 5))], options={'constant_memory': True}, streaming=True)
+
+
+@case
+def native_flat_tall(filename, scale):
+    _write(filename, [Table(_frame(100000 * scale, 5))], native=True)
+
+
+@case
+def chunked_tall(filename, scale):
+    chunks = (_frame(50000, 5) for _ in range(0, 4 * scale))
+    _write(filename, [ChunkedTable(chunks, rows=200000 * scale)], native=True)
+
+
+@case
+def sparse_wide(filename, scale):
+    # 95% пустых ячеек
+    df = _frame(2000 * scale, 200)
+    df = df.where(np.random.rand(*df.shape) < 0.05)
+    _write(filename, [Table(df, sparse=True, sparse_columns_format=True)], native=True)
+
+
+@case
+def highlighted(filename, scale):
+    # 1M ячеек, выделенных тремя правилами условного форматирования
+    rules = [Threshold('<', 0, '#CB3C39'), TopN(1, '#92D050', percent=True), ColorScale('#FFFFFF', '#31859C')]
+    _write(filename, [Table(_frame(100000 * scale, 10), highlight=rules)], native=True)
@@ -0,0 +1,51 @@
+"""Время импорта пакета в новом процессе интерпретатора.
+
+Каждый импорт выполняется в отдельном процессе repeat раз, выводится медиана.
+Разметка листов (Sheet, Layout) и графики не должны загружать pandas.
+
+Запуск: python -m benchmarks.import_time [repeat]
+"""
+import statistics
+import subprocess
+import sys
+import time
+
+STATEMENTS = [
+    'pass',
+    'import pandex',
+    'from pandex import Sheet, Side, Layout',
+    'from pandex import ChartFactory',
+    'from pandex import Table',
+    'import pandas',
+]
+
+# импорты, после которых pandas не должен быть загружен
+LIGHT_STATEMENTS = STATEMENTS[1:4]
+
+
+def measure(statement, repeat):
+    """Медиана времени запуска интерпретатора с импортом и признак загрузки pandas"""
+    code = '%s\nimport sys\nprint("pandas" in sys.modules)' % statement
+
+    timings = []
+    for _ in range(0, repeat):
+        started = time.perf_counter()
+        output = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True).stdout
+        timings.append(time.perf_counter() - started)
+
+    return statistics.median(timings), output.strip() == 'True'
+
+
+if __name__ == '__main__':
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    failed = False
+    for statement in STATEMENTS:
+        elapsed, pandas_loaded = measure(statement, repeat)
+        print('%-40s %7.1fms  pandas: %s' % (statement, elapsed * 1000, 'loaded' if pandas_loaded else 'no'))
+
+        if pandas_loaded and statement in LIGHT_STATEMENTS:
+            failed = True
+
+    if failed:
+        sys.exit('pandas is loaded by the layout imports')
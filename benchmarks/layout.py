@@ -0,0 +1,119 @@
+"""Накладные расходы разметки листов с большим количеством маленьких элементов.
+
+Элементы - ячейки 1x2 без pandas, поэтому время показывает только работу Layout, Group и Cursor:
+группы по 10 элементов, расположенные друг под другом и справа.
+Базовый вариант повторяет прежнюю реализацию: Cursor со свойствами row/col и copy.deepcopy курсора в Group.
+
+Запуск: python -m benchmarks.layout [elements]
+"""
+import contextlib
+import copy
+import sys
+import time
+from unittest.mock import patch
+
+import xlsxwriter
+
+from pandex import Layout, Sheet, Side
+from pandex.sheet import Group, Size
+
+REPEAT = 5
+
+
+class PropertyCursor:
+    """Cursor до перехода на __slots__"""
+
+    def __init__(self, row=0, col=0):
+        self._row = row
+        self._col = col
+
+    @property
+    def row(self):
+        return self._row
+
+    @row.setter
+    def row(self, value):
+        self._row = value
+
+    @property
+    def col(self):
+        return self._col
+
+    @col.setter
+    def col(self, value):
+        self._col = value
+
+    def copy(self):
+        return PropertyCursor(self._row, self._col)
+
+
+def deepcopy_group_init(self, sheet, cursor):
+    self._sheet = sheet
+
+    self._cursor_start = cursor
+    self._cursor_end = copy.deepcopy(cursor)
+
+
+def baseline():
+    """Подменяет Cursor и Group.__init__ в pandex.sheet прежней реализацией"""
+    stack = contextlib.ExitStack()
+    stack.enter_context(patch('pandex.sheet.Cursor', PropertyCursor))
+    stack.enter_context(patch.object(Group, '__init__', deepcopy_group_init))
+    return stack
+
+
+class TinyElement:
+    def measure(self):
+        return Size(rows=1, cols=2)
+
+    def write(self, workbook, worksheet, cursor):
+        worksheet.write_number(cursor.row, cursor.col, 1)
+
+        cursor.row += 1
+        cursor.col += 2
+
+
+def layout(sheet, count, group_size=10):
+    for start in range(0, count, group_size):
+        group = sheet.create_shape(Side.BOTTOM if start % (group_size * 10) else Side.RIGHT, margin_rows=1)
+
+        for position in range(start, min(start + group_size, count)):
+            group.add(TinyElement(), side=Side.BOTTOM if position % 2 else Side.RIGHT)
+
+
+def measure_layout(count):
+    started = time.perf_counter()
+    layout(Layout(), count)
+    return time.perf_counter() - started
+
+
+def measure_sheet(count):
+    workbook = xlsxwriter.Workbook('bench.xlsx', {'in_memory': True})
+    sheet = Sheet(workbook, 'Layout')
+
+    started = time.perf_counter()
+    layout(sheet, count)
+    return time.perf_counter() - started
+
+
+def measure(method, count, patched=False):
+    """Лучшее время из REPEAT запусков"""
+    times = []
+    for _ in range(REPEAT):
+        with baseline() if patched else contextlib.nullcontext():
+            times.append(method(count))
+
+    return min(times)
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+    print('elements: %d' % count)
+    for name, method in [('layout', measure_layout), ('sheet', measure_sheet)]:
+        legacy = measure(method, count, patched=True)
+        current = measure(method, count)
+
+        print('%s baseline: %.3fs (%.2fus per element)' % (name, legacy, legacy / count * 1e6))
+        print('%s current:  %.3fs (%.2fus per element)' % (name, current, current / count * 1e6))
+        print('%s speedup:  %.2fx' % (name, legacy / current))
@@ -0,0 +1,64 @@
+"""Сравнение записи многоуровневого заголовка через merge_range с записью плана объединений (MergePlan).
+
+Заголовок из 4 уровней колонок; по умолчанию 20000 колонок, из которых на лист попадают первые 16384.
+
+Каждый способ записи запускается REPEAT раз, выводится лучшее время.
+
+Запуск: python -m benchmarks.merge_plan [columns]
+"""
+import sys
+import time
+
+import pandas as pd
+import xlsxwriter
+
+from pandex.sheet import Cursor
+from pandex.table import TableHeader, write_span
+
+REPEAT = 5
+
+
+def make_columns(count):
+    outer = max(count // 2000, 1)
+    return pd.MultiIndex.from_product([
+        ['a%d' % i for i in range(0, outer)],
+        ['b%d' % i for i in range(0, 5)],
+        ['c%d' % i for i in range(0, 20)],
+        ['d%d' % i for i in range(0, 20)],
+    ])
+
+
+def write_merge_range(header, worksheet, cell_format):
+    header.plan(Cursor())
+    for span in header.spans:
+        write_span(worksheet, span, cell_format)
+
+
+def write_plan(header, worksheet, cell_format):
+    header.write(worksheet, Cursor(), cell_format)
+
+
+def measure(writer, columns):
+    workbook = xlsxwriter.Workbook('bench.xlsx', {'in_memory': True})
+    worksheet = workbook.add_worksheet()
+    cell_format = workbook.add_format({'border': 1})
+
+    header = TableHeader(pd.RangeIndex(1), columns)
+
+    started = time.perf_counter()
+    writer(header, worksheet, cell_format)
+    return time.perf_counter() - started, len(worksheet.merge)
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    columns = make_columns(count)
+
+    legacy, legacy_merges = min(measure(write_merge_range, columns) for _ in range(0, REPEAT))
+    plan, plan_merges = min(measure(write_plan, columns) for _ in range(0, REPEAT))
+    assert legacy_merges == plan_merges
+
+    print('columns: %d, levels: %d, merges: %d' % (len(columns), columns.nlevels, plan_merges))
+    print('merge_range: %.3fs' % legacy)
+    print('merge plan:  %.3fs' % plan)
+    print('speedup:     %.2fx' % (legacy / plan))
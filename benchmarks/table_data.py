@@ -0,0 +1,58 @@
+"""Сравнение построчной записи через itertuples с поколоночной записью TableData.
+
+Запуск: python -m benchmarks.table_data [rows]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+from pandex.sheet import Cursor
+from pandex.table import TableData
+
+
+def make_frame(rows):
+    return pd.DataFrame({
+        'float': np.random.randn(rows),
+        'int': np.arange(rows),
+        'bool': np.arange(rows) % 2 == 0,
+        'date': pd.date_range('2020-01-01', periods=rows, freq='min'),
+        'text': np.array(['a', 'b', 'c', 'd'], dtype=object)[np.arange(rows) % 4],
+    })
+
+
+def write_itertuples(df, worksheet, cell_format):
+    row_index = 0
+    for row in df.itertuples():
+        for col_index, value in enumerate(row[1:]):
+            worksheet.write(row_index, col_index, value, cell_format)
+        row_index += 1
+
+
+def write_columns(df, worksheet, cell_format):
+    TableData(df).write(worksheet, Cursor(), cell_format)
+
+
+def measure(writer, df):
+    workbook = xlsxwriter.Workbook('bench.xlsx', {'in_memory': True})
+    worksheet = workbook.add_worksheet()
+    cell_format = workbook.add_format({'border': 1})
+
+    started = time.perf_counter()
+    writer(df, worksheet, cell_format)
+    return time.perf_counter() - started
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    df = make_frame(rows)
+
+    legacy = measure(write_itertuples, df)
+    columns = measure(write_columns, df)
+
+    print('rows: %d, cells: %d' % (rows, df.size))
+    print('itertuples: %.3fs' % legacy)
+    print('columns:    %.3fs' % columns)
+    print('speedup:    %.2fx' % (legacy / columns))
@@ -0,0 +1,50 @@
+"""Масштабирование параллельного рендеринга листов по числу процессов.
+
+Запуск: python -m benchmarks.workbook [sheets] [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from pandex import Table
+from pandex.workbook import SheetSpec, render_workbook
+
+
+def build(df, sheet):
+    group = sheet.create_shape()
+    group.add(Table(df))
+
+
+def make_specs(sheets, rows):
+    df = pd.DataFrame(np.random.randn(rows, 10), columns=['c%d' % i for i in range(0, 10)])
+    return [SheetSpec('Sheet %d' % i, partial(build, df)) for i in range(0, sheets)]
+
+
+def measure(specs, processes):
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        render_workbook(os.path.join(directory, 'bench.xlsx'), specs, processes=processes)
+        return time.perf_counter() - started
+
+
+if __name__ == '__main__':
+    sheets = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+
+    specs = make_specs(sheets, rows)
+
+    print('sheets: %d, rows per sheet: %d, cpus: %d' % (sheets, rows, os.cpu_count()))
+
+    serial = measure(specs, 1)
+    print('processes  1: %.3fs' % serial)
+
+    processes = 2
+    while processes <= min(os.cpu_count(), sheets):
+        elapsed = measure(specs, processes)
+        print('processes %2d: %.3fs (%.2fx)' % (processes, elapsed, serial / elapsed))
+        processes *= 2
@@ -1,10 +1,12 @@
 import pandas as pd
 import xlsxwriter
 
-from pandex import Sheet, Table, Side, LineChart
+from pandex import Sheet, Table, Side, ChartFactory
 
 
 class ForecastTable(Table):
+    title_rows = 1
+
     def write_table_title(self, cursor, worksheet, cell_format):
         columns_num = len(self._df.columns)
         worksheet.merge_range(cursor.row, cursor.col, cursor.row, cursor.col + columns_num, self._name, cell_format)
@@ -50,9 +52,12 @@ if __name__ == '__main__':
         tables_group.add(table, side=Side.BOTTOM, margin_rows=12 if i > 0 else 0)
         tables.append(table)
 
+    # ссылки на ячейки таблиц и оформление графиков общие для всех графиков фабрики
+    charts = ChartFactory()
+
     charts_group = sheet.create_shape(side=Side.RIGHT, margin_cols=1)
     for i in range(0, 3):
-        chart = LineChart('Прогноз рейтинга', tables[i], target_row=4)
+        chart = charts.rows_chart('Прогноз рейтинга', tables[i], [4])
         charts_group.add(chart, side=Side.BOTTOM, margin_rows=5 if i > 0 else 0)
 
     workbook.close()
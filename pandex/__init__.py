@@ -1,3 +1,44 @@
-from .sheet import Sheet, Side
-from .table import Table, TableIndex, TableHeader, TableData
-from .chart import PieChart, LineChart, ColumnChart
\ No newline at end of file
+"""Модули пакета загружаются при первом обращении к их классам (PEP 562):
+import pandex и разметка листов (Sheet, Layout) не загружают pandas, пока не используется таблица.
+"""
+import importlib
+
+__version__ = '0.1.5'
+
+# {имя: модуль пакета, в котором оно определено}
+_exports = {
+    'Sheet': 'sheet',
+    'Side': 'sheet',
+    'Layout': 'sheet',
+    'Table': 'table',
+    'TableIndex': 'table',
+    'TableHeader': 'table',
+    'TableData': 'table',
+    'ChunkedTable': 'chunked',
+    'PieChart': 'chart',
+    'LineChart': 'chart',
+    'ColumnChart': 'chart',
+    'ChartFactory': 'chart',
+    'ChartTemplate': 'chart',
+    'Threshold': 'highlight',
+    'TopN': 'highlight',
+    'ColorScale': 'highlight',
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name):
+    module_name = _exports.get(name)
+    if module_name is None:
+        raise AttributeError('module %r has no attribute %r' % (__name__, name))
+
+    value = getattr(importlib.import_module('.' + module_name, __name__), name)
+
+    # следующие обращения не проходят через __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
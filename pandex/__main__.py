@@ -0,0 +1,119 @@
+"""Пакетная генерация отчетов по описаниям (pandex.spec.ReportSpec) в одном долгоживущем процессе.
+
+Отчеты рендерятся в пуле процессов: pandas и pandex импортируются один раз на процесс пула,
+а не на каждый отчет. Каталог в аргументах заменяется всеми файлами описаний (.json, .yaml, .yml) в нем.
+Если несколько описаний записывают отчет в один и тот же файл (например, с одинаковым именем output
+при --output-dir), ни один отчет не рендерится.
+
+Классы таблиц из описаний ("module:Table") импортируются относительно текущего каталога и PYTHONPATH.
+
+Запуск:
+    python -m pandex report.json reports/ [--processes N] [--output-dir DIR]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+
+from .spec import render_spec, spec_output
+
+SPEC_EXTENSIONS = ('.json', '.yaml', '.yml')
+
+
+def find_specs(paths):
+    """Файлы описаний по путям к файлам и каталогам"""
+    specs = []
+    for path in paths:
+        if os.path.isdir(path):
+            specs.extend(sorted(
+                os.path.join(path, name) for name in os.listdir(path) if name.endswith(SPEC_EXTENSIONS)
+            ))
+        else:
+            specs.append(path)
+
+    return specs
+
+
+def duplicate_outputs(specs, output_dir=None):
+    """{путь к отчету: описания} для отчетов, которые записывают несколько описаний.
+
+    Описания, которые не удалось прочитать, пропускаются: их ошибки покажет рендеринг.
+    """
+    outputs = {}
+    for path in specs:
+        try:
+            output = spec_output(path, output_dir)
+        except Exception:
+            continue
+
+        outputs.setdefault(os.path.abspath(output), []).append(path)
+
+    return {output: paths for output, paths in outputs.items() if len(paths) > 1}
+
+
+def render_one(path, output_dir=None):
+    """Рендерит один отчет: (путь к описанию, путь к отчету или None, время, текст ошибки)"""
+    started = time.perf_counter()
+    try:
+        output = render_spec(path, output_dir)
+    except Exception:
+        return path, None, time.perf_counter() - started, traceback.format_exc()
+
+    return path, output, time.perf_counter() - started, None
+
+
+def _render_one(args):
+    return render_one(*args)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m pandex', description='Render xlsx reports from report specs')
+    parser.add_argument('specs', nargs='+', help='report spec files or directories with them')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='worker processes, 1 renders reports in the current process (default: CPU count)')
+    parser.add_argument('--output-dir', default=None, help='directory for reports instead of spec outputs')
+    args = parser.parse_args(argv)
+
+    specs = find_specs(args.specs)
+
+    duplicates = duplicate_outputs(specs, args.output_dir)
+    if duplicates:
+        for output, paths in sorted(duplicates.items()):
+            print('%s is written by several specs: %s' % (output, ', '.join(paths)), file=sys.stderr)
+
+        return 1
+
+    if args.output_dir is not None:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    tasks = [(path, args.output_dir) for path in specs]
+
+    if args.processes == 1 or len(tasks) <= 1:
+        results = map(_render_one, tasks)
+        pool = None
+    else:
+        context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else None)
+        pool = context.Pool(args.processes)
+        results = pool.imap_unordered(_render_one, tasks)
+
+    failed = 0
+    try:
+        for path, output, elapsed, error in results:
+            if error is None:
+                print('%s -> %s (%.2fs)' % (path, output, elapsed))
+            else:
+                failed += 1
+                print('%s failed (%.2fs):\n%s' % (path, elapsed, error), file=sys.stderr)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    print('%d reports, %d failed' % (len(tasks), failed))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,137 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import io
+import itertools
+
+import xlsxwriter
+
+from .sheet import Sheet, Side
+
+# Количество строк потокового листа, записываемых за один вызов в executor
+FLUSH_STEP_ROWS = 10000
+
+# Размер частей готового файла при передаче в асинхронный writer
+WRITE_CHUNK_SIZE = 65536
+
+
+class AsyncWorkbook:
+    """Асинхронная обертка над workbook для генерации отчетов внутри event loop (aiohttp и т.п.).
+
+    Запись таблиц, графиков и закрытие workbook выполняются в executor (по умолчанию - executor loop),
+    по одной операции за раз, поэтому event loop не блокируется, а несколько отчетов генерируются параллельно.
+
+    report = AsyncWorkbook()
+    sheet = report.add_sheet('Report', streaming=True)
+    group = sheet.create_shape()
+    await group.add(Table(df))
+    await sheet.flush()
+    await report.close()
+    await report.write_to(response)
+
+    Отмена задачи прерывает генерацию между таблицами (и между частями потокового листа):
+    операция, уже запущенная в executor, дорабатывает, а workbook становится недоступным для дальнейшей записи.
+    """
+
+    def __init__(self, options=None, executor=None):
+        self._output = io.BytesIO()
+        self.workbook = xlsxwriter.Workbook(self._output, options or {})
+
+        self._executor = executor
+        self._lock = asyncio.Lock()
+
+        self._cancelled = False
+        self._closed = False
+
+    def add_sheet(self, name, streaming: bool = False, native: bool = False):
+        self._check_writable()
+
+        return AsyncSheet(self, Sheet(self.workbook, name, streaming=streaming, native=native))
+
+    async def close(self):
+        """Закрывает workbook, собирая xlsx в памяти"""
+        await self.run(self.workbook.close)
+        self._closed = True
+
+    def getvalue(self):
+        """Содержимое закрытого workbook"""
+        if not self._closed:
+            raise RuntimeError('Workbook is not closed')
+
+        return self._output.getvalue()
+
+    async def write_to(self, writer, chunk_size: int = WRITE_CHUNK_SIZE):
+        """Передает закрытый workbook в асинхронный writer частями.
+
+        Поддерживаются writer с корутиной write (aiohttp.web.StreamResponse)
+        и с обычным write и корутиной drain (asyncio.StreamWriter).
+        """
+        data = memoryview(self.getvalue())
+
+        for start in range(0, len(data), chunk_size):
+            result = writer.write(data[start:start + chunk_size].tobytes())
+            if inspect.isawaitable(result):
+                await result
+            elif hasattr(writer, 'drain'):
+                await writer.drain()
+
+    async def run(self, function, *args, **kwargs):
+        """Выполняет операцию над workbook в executor; операции одного workbook выполняются по очереди"""
+        loop = asyncio.get_running_loop()
+
+        async with self._lock:
+            self._check_writable()
+
+            # контекст (в том числе активный Profiler) переносится в поток executor
+            context = contextvars.copy_context()
+            future = loop.run_in_executor(self._executor, functools.partial(context.run, function, *args, **kwargs))
+
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # операция в executor не прерывается и может оставить лист записанным частично
+                self._cancelled = True
+                raise
+
+    def _check_writable(self):
+        if self._cancelled:
+            raise RuntimeError('Workbook generation was cancelled')
+
+        if self._closed:
+            raise RuntimeError('Workbook is closed')
+
+
+class AsyncSheet:
+    """Лист AsyncWorkbook: разметка выполняется сразу, запись ячеек - в executor"""
+
+    def __init__(self, workbook: AsyncWorkbook, sheet: Sheet):
+        self._workbook = workbook
+        self.sheet = sheet
+
+    def create_shape(self, side: Side = Side.RIGHT, margin_rows: int = 0, margin_cols: int = 0):
+        return AsyncGroup(self._workbook, self.sheet.create_shape(side, margin_rows, margin_cols))
+
+    async def flush(self, step_rows: int = FLUSH_STEP_ROWS):
+        """Записывает потоковый лист частями по step_rows строк, возвращая управление event loop между частями"""
+        rows = self.sheet.iter_flush()
+
+        while await self._workbook.run(_advance, rows, step_rows):
+            pass
+
+
+class AsyncGroup:
+    def __init__(self, workbook: AsyncWorkbook, group):
+        self._workbook = workbook
+        self.group = group
+
+    async def add(self, obj, side: Side = Side.RIGHT, margin_rows: int = 0, margin_cols: int = 0):
+        await self._workbook.run(self.group.add, obj, side, margin_rows, margin_cols)
+
+    def get_cursors(self):
+        return self.group.get_cursors()
+
+
+def _advance(rows, count):
+    """Продвигает генератор на count шагов; возвращает False, если он закончился"""
+    return len(list(itertools.islice(rows, count))) == count
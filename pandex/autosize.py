@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+
+# Количество строк, по которым оцениваются ширины колонок больших таблиц
+AUTOSIZE_SAMPLE_ROWS = 10000
+
+MIN_WIDTH = 4
+MAX_WIDTH = 80
+PADDING = 2
+
+# Формат General показывает не больше 11 символов числа
+NUMBER_WIDTH = 11
+MAX_DECIMALS = 9
+
+
+def sample(values, size=AUTOSIZE_SAMPLE_ROWS):
+    """Равномерная выборка строк DataFrame или значений индекса, включая первую и последнюю"""
+    count = len(values)
+    if count > size:
+        positions = np.linspace(0, count - 1, size).astype(np.int64)
+    elif isinstance(values, (pd.DataFrame, pd.Index)):
+        return values
+    else:
+        # колоночные источники (pandex.sources) читаются в DataFrame целиком
+        positions = slice(0, count)
+
+    if isinstance(values, pd.Index):
+        return values[positions]
+
+    return values.iloc[positions]
+
+
+def fit(lengths):
+    """Ширины колонок Excel по длинам текста"""
+    return np.clip(np.asarray(lengths, dtype=np.float64) + PADDING, MIN_WIDTH, MAX_WIDTH)
+
+
+def data_lengths(df):
+    """Длины текста колонок DataFrame: числовые колонки оцениваются арифметически, остальные - по строкам"""
+    lengths = np.zeros(len(df.columns), dtype=np.float64)
+    if not len(df.index):
+        return lengths
+
+    dtypes = df.dtypes.tolist()
+    numeric = [
+        position for position, dtype in enumerate(dtypes)
+        if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+    ]
+
+    if numeric:
+        lengths[numeric] = number_lengths(df.iloc[:, numeric].to_numpy(dtype=np.float64, na_value=np.nan))
+
+    numeric = set(numeric)
+    for position in range(0, len(dtypes)):
+        if position not in numeric:
+            lengths[position] = text_length(df.iloc[:, position])
+
+    return lengths
+
+
+def number_lengths(values):
+    """Длины чисел двумерного массива по колонкам: знак, целая часть и дробная часть (до NUMBER_WIDTH символов)"""
+    finite = np.isfinite(values)
+    values = np.where(finite, values, 0.0)
+
+    magnitude = np.abs(values).max(axis=0, initial=0.0)
+    digits = np.floor(np.log10(np.maximum(magnitude, 1.0))) + 1
+    sign = (values < 0).any(axis=0)
+
+    # количество знаков после запятой: наименьшее, при котором все значения колонки становятся целыми
+    decimals = np.full(values.shape[1], MAX_DECIMALS, dtype=np.float64)
+    undecided = np.ones(values.shape[1], dtype=bool)
+    for count in range(0, MAX_DECIMALS):
+        scaled = values[:, undecided] * 10 ** count
+        integral = np.isclose(scaled, np.round(scaled), rtol=0, atol=1e-6).all(axis=0)
+
+        columns = np.flatnonzero(undecided)[integral]
+        decimals[columns] = count
+        undecided[columns] = False
+
+        if not undecided.any():
+            break
+
+    lengths = sign + digits + np.where(decimals > 0, decimals + 1, 0)
+    return np.minimum(lengths, np.maximum(NUMBER_WIDTH, sign + digits))
+
+
+def text_length(values):
+    """Наибольшая длина текстового представления значений (Series или Index)"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # категории переводятся в строки один раз, коды показывают, какие из них встречаются
+        categorical = values.cat if isinstance(values, pd.Series) else values
+        codes = np.asarray(categorical.codes)
+
+        used = np.zeros(len(categorical.categories), dtype=bool)
+        used[codes[codes >= 0]] = True
+
+        return float(pd.Series(categorical.categories).astype(str).str.len().to_numpy()[used].max(initial=0))
+
+    if pd.api.types.is_bool_dtype(values.dtype):
+        return 5.0
+
+    if pd.api.types.is_datetime64_any_dtype(values.dtype):
+        # даты без времени показываются как dd.mm.yyyy, с временем - с часами и минутами
+        series = pd.Series(values)
+        return 10.0 if (series.dropna().dt.normalize() == series.dropna()).all() else 19.0
+
+    filled = pd.Series(values).dropna()
+    if not len(filled):
+        return 0.0
+
+    return float(filled.astype(str).str.len().max())
+
+
+def index_lengths(index):
+    """Длины текста уровней индекса; значения MultiIndex переводятся в строки один раз на значение уровня"""
+    if not isinstance(index, pd.MultiIndex):
+        return [text_length(sample(index))]
+
+    lengths = []
+    for level, codes in zip(index.levels, index.codes):
+        codes = np.asarray(codes)
+
+        used = np.zeros(len(level), dtype=bool)
+        used[codes[codes >= 0]] = True
+
+        lengths.append(text_length(sample(level[used])))
+
+    return lengths
+
+
+def spans_lengths(spans, first_col, cols_count):
+    """Длины текста, приходящиеся на колонку, для ячеек и объединений заголовка.
+
+    Текст объединения делится поровну между колонками, которые оно занимает.
+    """
+    lengths = np.zeros(cols_count, dtype=np.float64)
+
+    for _, span_first_col, _, span_last_col, value in spans:
+        if value is None:
+            continue
+
+        cols = span_last_col - span_first_col + 1
+        start = span_first_col - first_col
+
+        lengths[start:start + cols] = np.maximum(lengths[start:start + cols], len(str(value)) / cols)
+
+    return lengths
+
+
+def table_widths(df, header_spans, first_col, sample_rows=AUTOSIZE_SAMPLE_ROWS):
+    """Ширины колонок таблицы (индекс и данные) с учетом заголовка, начиная с колонки first_col"""
+    lengths = np.concatenate([
+        index_lengths(df.index),
+        data_lengths(sample(df, sample_rows)),
+    ])
+
+    lengths = np.maximum(lengths, spans_lengths(header_spans, first_col, len(lengths)))
+
+    return fit(np.ceil(lengths))
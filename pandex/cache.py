@@ -0,0 +1,111 @@
+import hashlib
+import os
+import pickle
+import tempfile
+
+import xlsxwriter
+
+from . import __version__
+
+CACHE_SUFFIX = '.sheet'
+
+
+class RenderCache:
+    """Кеш отрисованных листов на диске (pandex.workbook.RenderedSheet) с вытеснением давно не использованных.
+
+    Ключ листа строится по содержимому его таблиц (Table.cache_key), их расположению и опциям workbook,
+    поэтому при повторной генерации отчета листы с неизменившимися таблицами берутся из кеша.
+    Общий размер файлов кеша ограничен max_bytes, порядок использования определяется по времени изменения файлов.
+
+    Файлы кеша читаются через pickle: каталог кеша должен быть доступен для записи только генератору отчетов.
+    """
+
+    def __init__(self, directory, max_bytes: int = 1024 ** 3):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, key):
+        """Отрисованный лист по ключу или None"""
+        path = self._path(key)
+
+        try:
+            with open(path, 'rb') as fh:
+                rendered = pickle.load(fh)
+        except Exception:
+            # поврежденный файл или лист, сохраненный другой версией классов (AttributeError, ImportError и т.п.)
+            self.misses += 1
+            return None
+
+        # время изменения отмечает последнее использование
+        os.utime(path)
+        self.hits += 1
+
+        return rendered
+
+    def put(self, key, rendered):
+        """Сохраняет отрисованный лист и вытесняет старые листы сверх max_bytes"""
+        fd, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                pickle.dump(rendered, fh, protocol=pickle.HIGHEST_PROTOCOL)
+
+            os.replace(temporary, self._path(key))
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+        self.evict()
+
+    def evict(self):
+        """Удаляет давно не использованные листы, пока размер кеша больше max_bytes"""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(CACHE_SUFFIX):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+            total -= size
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + CACHE_SUFFIX)
+
+
+def sheet_key(sheet, options=None):
+    """Ключ данных размеченного листа (Sheet(record_placements=True)); None, если какой-то из его элементов нельзя кешировать.
+
+    В ключ входят версии pandex и xlsxwriter: листы, отрисованные другой версией, не используются.
+    Элементы без ячеек (writes_cells = False, например графики) в ключ не входят, остальные элементы
+    должны иметь cache_key.
+    """
+    key = hashlib.sha256()
+    key.update(pickle.dumps((__version__, xlsxwriter.__version__, sorted((options or {}).items()))))
+
+    for cursor, element in sheet.placements:
+        if not getattr(element, 'writes_cells', True):
+            continue
+
+        if not hasattr(element, 'cache_key'):
+            return None
+
+        element_key = element.cache_key()
+        if element_key is None:
+            return None
+
+        key.update(pickle.dumps((cursor.row, cursor.col, element_key)))
+
+    return key.hexdigest()
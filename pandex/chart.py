@@ -1,8 +1,13 @@
+import weakref
 from enum import Enum
-from typing import List
+from typing import TYPE_CHECKING, List
 
-from pandex import Table
-from pandex.sheet import Cursor
+from .profiling import phase, profiled
+from .sheet import Cursor, Size
+
+if TYPE_CHECKING:
+    # таблицы нужны только для аннотаций: графики не загружают pandas до записи таблиц
+    from .table import Table
 
 CHART_AREA_PATTERN = {
     'pattern': 'light_downward_diagonal',
@@ -25,7 +30,14 @@ class ModeColor(Enum):
 
 
 class PieChart:
-    def __init__(self, name: str, table: Table, target_row: int = 0, unit: Unit = Unit.PERCENT):
+    # размер графика на листе
+    rows = 14
+    cols = 7
+
+    # график не записывает ячеек и не входит в ключ кеша листа (pandex.cache.sheet_key)
+    writes_cells = False
+
+    def __init__(self, name: str, table: 'Table', target_row: int = 0, unit: Unit = Unit.PERCENT):
         self._name = name
 
         self._table = table
@@ -33,6 +45,10 @@ class PieChart:
 
         self._unit = unit
 
+    def measure(self):
+        return Size(rows=self.rows, cols=self.cols)
+
+    @profiled('chart.write')
     def write(self, workbook, worksheet, cursor: Cursor):
         worksheet_name = worksheet.get_name()
         chart_data = self._get_chart_data(worksheet_name)
@@ -48,8 +64,8 @@ class PieChart:
 
         worksheet.insert_chart(cursor.row, cursor.col, chart)
 
-        cursor.row += 14
-        cursor.col += 7
+        cursor.row += self.rows
+        cursor.col += self.cols
 
     def _get_chart_data(self, sheet_name):
         data_labels = {
@@ -81,11 +97,22 @@ class PieChart:
 
 
 class ColumnChart:
+    # размер графика на листе
+    rows = 14
+    cols = 7
+
+    # график не записывает ячеек и не входит в ключ кеша листа (pandex.cache.sheet_key)
+    writes_cells = False
+
     def __init__(self, name, table, unit=Unit.PERCENT):
         self._name = name
         self._table = table
         self._unit = unit
 
+    def measure(self):
+        return Size(rows=self.rows, cols=self.cols)
+
+    @profiled('chart.write')
     def write(self, workbook, worksheet, cursor):
         worksheet_name = worksheet.get_name()
         chart_data = self._get_chart_data(worksheet_name)
@@ -109,8 +136,8 @@ class ColumnChart:
 
             worksheet.insert_chart(cursor.row, cursor.col, chart)
 
-            cursor.row += 14
-            cursor.col += 7
+            cursor.row += self.rows
+            cursor.col += self.cols
 
     def _get_chart_data(self, sheet_name):
         mode_colors = [mc.value for mc in ModeColor]
@@ -137,13 +164,24 @@ class ColumnChart:
 
 
 class LineChart:
-    def __init__(self, name: str, table: Table, target_rows: List[int], skip_columns: int = 0):
+    # размер графика на листе
+    rows = 14
+    cols = 7
+
+    # график не записывает ячеек и не входит в ключ кеша листа (pandex.cache.sheet_key)
+    writes_cells = False
+
+    def __init__(self, name: str, table: 'Table', target_rows: List[int], skip_columns: int = 0):
         self._name = name
 
         self._table = table
         self._target_rows = target_rows
         self._skip_columns = skip_columns
 
+    def measure(self):
+        return Size(rows=self.rows, cols=self.cols)
+
+    @profiled('chart.write')
     def write(self, workbook, worksheet, cursor: Cursor):
         worksheet_name = worksheet.get_name()
 
@@ -161,8 +199,8 @@ class LineChart:
 
         worksheet.insert_chart(cursor.row, cursor.col, chart)
 
-        cursor.row += 14
-        cursor.col += 7
+        cursor.row += self.rows
+        cursor.col += self.cols
 
     def _get_chart_data(self, sheet_name):
         header = self._table.header
@@ -179,3 +217,221 @@ class LineChart:
             'categories': [sheet_name] + header_mapping[-1][0 + self._skip_columns] + header_mapping[-1][-1],
             'values': [sheet_name] + data_mapping[row][0 + self._skip_columns] + data_mapping[row][-1],
         } for row in self._target_rows]
+
+
+class TableReferences:
+    """Ссылки на ячейки таблицы для серий графиков, рассчитанные за один проход по ее mapping.
+
+    Серии строк и колонок данных создаются один раз и переиспользуются всеми графиками этой таблицы.
+    """
+
+    def __init__(self, table: 'Table', sheet_name: str):
+        self._sheet_name = sheet_name
+
+        # mapping данных, по которому рассчитаны ссылки: при повторной записи таблицы он заменяется новым
+        self.data_mapping = table.data.cell_mapping
+
+        self._header = table.header.cell_mapping[-1].tolist()
+        self._index = table.index.cell_mapping[-1].tolist()
+        self._first_row, self._first_col, self._last_row, self._last_col = table.data.cell_mapping.bounds()
+
+        self._series = {}
+
+    def row_series(self, row: int, skip_columns: int = 0):
+        """Серия строки данных row: подписи - последний уровень заголовка, название - последний уровень индекса"""
+        key = ('row', row, skip_columns)
+        series = self._series.get(key)
+        if series is None:
+            data_row = self._first_row + (row if row >= 0 else row + self._last_row - self._first_row + 1)
+            series = self._series[key] = {
+                'name': [self._sheet_name] + self._index[row],
+                'categories': [self._sheet_name] + self._header[skip_columns] + self._header[-1],
+                'values': [self._sheet_name, data_row, self._first_col + skip_columns, data_row, self._last_col],
+            }
+
+        return series
+
+    def column_series(self, col: int):
+        """Серия колонки данных col: подписи - последний уровень индекса, название - последний уровень заголовка"""
+        key = ('column', col)
+        series = self._series.get(key)
+        if series is None:
+            data_col = self._first_col + (col if col >= 0 else col + self._last_col - self._first_col + 1)
+            series = self._series[key] = {
+                'name': [self._sheet_name] + self._header[col],
+                'categories': [self._sheet_name] + self._index[0] + self._index[-1],
+                'values': [self._sheet_name, self._first_row, data_col, self._last_row, data_col],
+            }
+
+        return series
+
+    @property
+    def columns_count(self):
+        return self._last_col - self._first_col + 1
+
+
+class ChartTemplate:
+    """Оформление графика, общее для многих графиков: тип, размер на листе, легенда, области и настройки серий.
+
+    colors - цвета серий по порядку: заливка для столбцов и секторов, цвет линии для линейных графиков.
+    show_hidden_data - показывать данные скрытых строк и колонок (chart.show_hidden_data).
+    """
+
+    def __init__(self, chart_type: str, subtype: str = None, rows: int = 14, cols: int = 7, legend: dict = None,
+                 chartarea: dict = None, plotarea: dict = None, series: dict = None, colors: List[str] = None,
+                 show_hidden_data: bool = False):
+        self.chart_type = chart_type
+        self.subtype = subtype
+
+        self.rows = rows
+        self.cols = cols
+
+        self.legend = legend
+        self.chartarea = chartarea
+        self.plotarea = plotarea
+
+        self.series = series or {}
+        self.colors = colors or []
+
+        self.show_hidden_data = show_hidden_data
+
+        # опции серий по позиции серии в графике, включая цвет
+        self._series_options = {}
+
+    def create(self, workbook, name: str):
+        options = {'type': self.chart_type}
+        if self.subtype:
+            options['subtype'] = self.subtype
+
+        chart = workbook.add_chart(options)
+
+        chart.set_title({'name': name})
+        if self.legend is not None:
+            chart.set_legend(self.legend)
+        if self.chartarea is not None:
+            chart.set_chartarea(self.chartarea)
+        if self.plotarea is not None:
+            chart.set_plotarea(self.plotarea)
+        if self.show_hidden_data:
+            chart.show_hidden_data()
+
+        return chart
+
+    def series_options(self, position: int):
+        options = self._series_options.get(position)
+        if options is None:
+            options = dict(self.series)
+            if self.colors:
+                color = {'color': self.colors[position % len(self.colors)]}
+                options['line' if self.chart_type == 'line' else 'fill'] = color
+
+            self._series_options[position] = options
+
+        return options
+
+
+LINE_TEMPLATE = ChartTemplate('line', legend={'position': 'top'}, chartarea={'pattern': CHART_AREA_PATTERN})
+
+COLUMN_TEMPLATE = ChartTemplate(
+    'column', subtype='percent_stacked',
+    chartarea={'pattern': CHART_AREA_PATTERN}, plotarea={'pattern': CHART_AREA_PATTERN},
+    series={'data_labels': {'value': True}}, colors=[mc.value for mc in ModeColor], show_hidden_data=True
+)
+
+COLUMN_PIECE_TEMPLATE = ChartTemplate(
+    'column', subtype='stacked',
+    chartarea={'pattern': CHART_AREA_PATTERN}, plotarea={'pattern': CHART_AREA_PATTERN},
+    series={'data_labels': {'value': True}}, colors=[mc.value for mc in ModeColor], show_hidden_data=True
+)
+
+# Шаблоны столбчатых графиков по единицам, как у ColumnChart: доли - нормированные столбцы, штуки - накопленные
+COLUMN_TEMPLATES = {
+    Unit.PERCENT: COLUMN_TEMPLATE,
+    Unit.PIECE: COLUMN_PIECE_TEMPLATE,
+}
+
+
+class SeriesChart:
+    """График, построенный ChartFactory: серии строк или колонок таблицы в оформлении шаблона"""
+
+    # график не записывает ячеек и не входит в ключ кеша листа (pandex.cache.sheet_key)
+    writes_cells = False
+
+    def __init__(self, factory, template: ChartTemplate, name: str, table: 'Table',
+                 rows: List[int] = None, columns: List[int] = None, skip_columns: int = 0):
+        self._factory = factory
+        self._template = template
+
+        self._name = name
+        self._table = table
+
+        self._rows = rows
+        self._columns = columns
+        self._skip_columns = skip_columns
+
+    def measure(self):
+        return Size(rows=self._template.rows, cols=self._template.cols)
+
+    def write(self, workbook, worksheet, cursor: Cursor):
+        with phase('chart.write', self._name) as record:
+            references = self._factory.references(self._table, worksheet.get_name())
+
+            if self._rows is not None:
+                series = [references.row_series(row, self._skip_columns) for row in self._rows]
+            else:
+                columns = self._columns if self._columns is not None else range(0, references.columns_count)
+                series = [references.column_series(col) for col in columns]
+
+            chart = self._template.create(workbook, self._name)
+            for position, table_series in enumerate(series):
+                chart.add_series(dict(table_series, **self._template.series_options(position)))
+
+            worksheet.insert_chart(cursor.row, cursor.col, chart)
+
+            # количество серий графика
+            record.cells = len(series)
+
+        cursor.row += self._template.rows
+        cursor.col += self._template.cols
+
+
+class ChartFactory:
+    """Строит графики по таблицам, разделяя ссылки на ячейки между всеми графиками одной таблицы.
+
+    factory = ChartFactory()
+    group.add(factory.rows_chart('Прогноз', table, [0, 4]))
+    group.add(factory.columns_chart('Доли', table, template=COLUMN_TEMPLATE))
+
+    Время записи каждого графика замеряется как фаза chart.write с названием графика:
+    Profiler.report(by_element=True) показывает его по отдельным графикам.
+    """
+
+    def __init__(self):
+        # {table: {имя листа: TableReferences}}; ссылки рассчитываются после записи таблицы в лист
+        # и пересчитываются, если таблица записана заново (в другое место)
+        self._references = weakref.WeakKeyDictionary()
+
+    def references(self, table: 'Table', sheet_name: str) -> TableReferences:
+        sheets = self._references.setdefault(table, {})
+
+        references = sheets.get(sheet_name)
+        if references is None or references.data_mapping is not table.data.cell_mapping:
+            references = sheets[sheet_name] = TableReferences(table, sheet_name)
+
+        return references
+
+    def rows_chart(self, name: str, table: 'Table', rows: List[int], template: ChartTemplate = LINE_TEMPLATE,
+                   skip_columns: int = 0):
+        """График по строкам данных rows (как LineChart)"""
+        return SeriesChart(self, template, name, table, rows=rows, skip_columns=skip_columns)
+
+    def columns_chart(self, name: str, table: 'Table', columns: List[int] = None, template: ChartTemplate = None,
+                      unit: Unit = Unit.PERCENT):
+        """График по колонкам данных columns, по умолчанию по всем (как ColumnChart).
+
+        Без template оформление выбирается по unit из COLUMN_TEMPLATES.
+        """
+        if template is None:
+            template = COLUMN_TEMPLATES[unit]
+
+        return SeriesChart(self, template, name, table, columns=columns)
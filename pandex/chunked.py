@@ -0,0 +1,259 @@
+import itertools
+
+from .autosize import sample
+from .mapping import CellGrid, CellLine
+from .profiling import phase, profiled
+from .sheet import Cursor, Size, merge_rows
+from .table import RowRecorder, Table
+
+
+class ChunkedIndex:
+    """Индекс ChunkedTable: индексы чанков, записанные друг под другом.
+
+    mapping уровней продолжается с каждым чанком, объединения многоуровневого индекса
+    не переходят через границы чанков.
+
+    cell_mapping - mapping, рассчитанный заранее (одноуровневый индекс при известном количестве строк);
+    pending=True - mapping станет известен только после записи всех чанков (см. finish).
+    """
+
+    def __init__(self, cell_mapping=None, pending=False):
+        self._planned = cell_mapping is not None
+        self._cell_mapping = cell_mapping or []
+        self._pending = pending
+
+        self._cells = 0
+        self._merges = 0
+
+    @property
+    def cell_mapping(self):
+        if self._pending:
+            raise ValueError('Mapping of a chunked multi-level index is known only after its rows are written '
+                             '(Sheet.flush), so charts cannot refer to it in streaming mode')
+
+        return self._cell_mapping
+
+    def append(self, index):
+        """Добавляет размеченный индекс очередного чанка"""
+        if not self._cell_mapping:
+            self._cell_mapping = list(index.cell_mapping)
+        elif not self._planned:
+            self._cell_mapping = [line.concat(chunk_line)
+                                  for line, chunk_line in zip(self._cell_mapping, index.cell_mapping)]
+
+        cells, merges = index.counters()
+        self._cells += cells
+        self._merges += merges
+
+    def finish(self):
+        """Отмечает, что индексы всех чанков добавлены"""
+        self._pending = False
+
+    def counters(self):
+        return self._cells, self._merges
+
+
+class ChunkedData:
+    """Данные ChunkedTable: сплошной блок, который растет вниз с каждым чанком"""
+
+    def __init__(self, row, col, cols_count, rows_count=0):
+        self._row = row
+        self._col = col
+        self._cols_count = cols_count
+
+        self._rows_count = rows_count
+        self._cell_mapping = CellGrid(row, col, rows_count, cols_count)
+
+    @property
+    def cell_mapping(self):
+        return self._cell_mapping
+
+    def append(self, data):
+        """Добавляет размеченные данные очередного чанка"""
+        rows_count = data.cell_mapping.shape[0]
+
+        self._rows_count += rows_count
+        self._cell_mapping = CellGrid(self._row, self._col, self._rows_count, self._cols_count)
+
+    def counters(self):
+        return self._rows_count * self._cols_count, 0
+
+
+class ChunkedTable(Table):
+    """Таблица из последовательности DataFrame с одинаковыми колонками,
+    например pd.read_sql(..., chunksize=...) или групп строк parquet.
+
+    Заголовок записывается по первому чанку, строки индекса и данных - чанк за чанком,
+    поэтому в памяти одновременно находится только один чанк. Чанки читаются один раз.
+
+    rows - общее количество строк, если оно известно заранее. Оно нужно для measure() и потоковой записи
+    (Sheet(streaming=True)), где таблица размечается до чтения чанков. Без потокового режима
+    ячейки всех чанков накапливаются в worksheet xlsxwriter, поэтому для выгрузок больше памяти
+    следует использовать streaming=True с опцией constant_memory или native=True.
+    """
+
+    def __init__(self, chunks, name=None, rows=None, columns_format=None, autosize=None, sparse=None,
+                 sparse_columns_format=None, highlight=None):
+        chunks = iter(chunks)
+
+        first = next(chunks, None)
+        if first is None:
+            raise ValueError('ChunkedTable requires at least one chunk')
+
+        # для заголовка, форматов и размеров достаточно пустого среза: в таблице хранятся только колонки и dtypes
+        super().__init__(first.iloc[:0], name=name, columns_format=columns_format, autosize=autosize, sparse=sparse,
+                         sparse_columns_format=sparse_columns_format, highlight=highlight)
+
+        self._chunks = itertools.chain([first], chunks)
+        self._rows = rows
+
+        # ширина колонок при autosize оценивается по первому чанку
+        self._sample = sample(first) if self.autosize else None
+
+        self._columns_format_list = None
+
+        self._body_cursor: Cursor = None
+        self._written_rows = 0
+
+    def measure(self):
+        if self._rows is None:
+            raise ValueError('Rows count of %s is unknown, pass rows to measure it' % type(self).__name__)
+
+        return Size(
+            rows=self.title_rows + self._df.columns.nlevels + self._rows,
+            cols=self._df.index.nlevels + len(self._df.columns)
+        )
+
+    def cache_key(self):
+        # чанки читаются один раз, поэтому содержимое таблицы до записи неизвестно
+        return None
+
+    def write(self, workbook, worksheet, cursor):
+        element = self._name or type(self).__name__
+
+        with phase('table.format', element):
+            xl_format = self._get_format(workbook)
+            self._columns_format_list = self._get_columns_format(workbook)
+
+        with phase('table.title', element):
+            self.write_table_title(cursor, worksheet, xl_format['header'])
+
+        with phase('table.header', element) as record:
+            self._header = self.header_class(self._df.index, self._df.columns)
+            self._header.write(worksheet, cursor, xl_format['header'])
+            record.cells, record.merges = self._header.counters()
+
+        self._start_body(cursor)
+
+        for chunk_cursor, chunk in self._iter_chunks():
+            with phase('table.index', element) as record:
+                index = self.index_class(chunk.index)
+                index.write(worksheet, chunk_cursor, xl_format['index'])
+                record.cells, record.merges = index.counters()
+
+            with phase('table.data', element) as record:
+                data = self.data_class(chunk, columns_format=self._columns_format_list, sparse=self.sparse)
+                data.write(worksheet, chunk_cursor, xl_format['data'])
+                record.cells, record.merges = data.counters()
+
+            self._index.append(index)
+            self._data.append(data)
+
+        cursor.row += self._written_rows
+        cursor.col += self._df.index.nlevels + len(self._df.columns)
+
+        with phase('table.highlight', element):
+            self._write_highlight(workbook, worksheet)
+
+        with phase('table.columns_width', element):
+            self._set_columns(worksheet, self._body_cursor.col,
+                              self._sparse_formats(xl_format['data'], self._columns_format_list), self._sample)
+
+            self.set_columns_width(worksheet)
+
+        return cursor
+
+    @profiled('table.prepare')
+    def prepare(self, workbook, worksheet, cursor):
+        if self._rows is None:
+            raise ValueError('Rows count of %s is required for streaming write' % type(self).__name__)
+
+        self._format = self._get_format(workbook)
+        self._columns_format_list = self._get_columns_format(workbook)
+
+        self._title = RowRecorder()
+        self.write_table_title(cursor, self._title, self._format['header'])
+
+        self._header = self.header_class(self._df.index, self._df.columns)
+        self._header.plan(cursor)
+
+        # mapping данных и одноуровневого индекса сразу охватывает все строки, чтобы на таблицу могли ссылаться графики
+        self._start_body(cursor, self._rows)
+
+        self._write_highlight(workbook, worksheet)
+
+        cursor.row += self._rows
+        cursor.col += self._df.index.nlevels + len(self._df.columns)
+
+        self._set_columns(worksheet, self._body_cursor.col,
+                          self._sparse_formats(self._format['data'], self._columns_format_list), self._sample)
+
+        self.set_columns_width(worksheet)
+
+        return cursor
+
+    def iter_rows(self, worksheet):
+        return merge_rows([
+            self._title.iter_rows(worksheet),
+            self._header.iter_rows(worksheet, self._format['header']),
+            self._iter_body_rows(worksheet),
+        ])
+
+    def _iter_body_rows(self, worksheet):
+        """Генератор построчной записи индекса и данных: чанки читаются по мере записи строк"""
+        for chunk_cursor, chunk in self._iter_chunks():
+            index = self.index_class(chunk.index)
+            index.plan(chunk_cursor)
+
+            data = self.data_class(chunk, columns_format=self._columns_format_list, sparse=self.sparse)
+            data.plan(chunk_cursor)
+
+            self._index.append(index)
+
+            yield from merge_rows([
+                index.iter_rows(worksheet, self._format['index']),
+                data.iter_rows(worksheet, self._format['data']),
+            ])
+
+        self._index.finish()
+
+    def _start_body(self, cursor, rows_count=None):
+        self._body_cursor = cursor.copy()
+        self._written_rows = 0
+
+        if rows_count is None:
+            self._index = ChunkedIndex()
+        elif self._df.index.nlevels == 1:
+            # строки одноуровневого индекса не объединяются, поэтому его mapping известен до чтения чанков
+            self._index = ChunkedIndex([CellLine(cursor.col, range(cursor.row, cursor.row + rows_count),
+                                                 horizontal=False)])
+        else:
+            self._index = ChunkedIndex(pending=True)
+
+        self._data = ChunkedData(cursor.row, cursor.col + self._df.index.nlevels, len(self._df.columns),
+                                 rows_count or 0)
+
+    def _iter_chunks(self):
+        """Чанки и курсоры, с которых они записываются"""
+        chunks, self._chunks = self._chunks, iter(())
+
+        for chunk in chunks:
+            if not chunk.columns.equals(self._df.columns) or chunk.index.nlevels != self._df.index.nlevels:
+                raise ValueError('Chunk columns differ from the columns of the first chunk')
+
+            yield Cursor(self._body_cursor.row + self._written_rows, self._body_cursor.col), chunk
+
+            self._written_rows += len(chunk.index)
+
+        if self._rows is not None and self._written_rows != self._rows:
+            raise ValueError('%s has %s rows, expected %s' % (type(self).__name__, self._written_rows, self._rows))
@@ -0,0 +1,223 @@
+import numpy as np
+import pandas as pd
+
+# Excel хранит даты как количество дней от 1899-12-30 (с учетом ошибки 1900 года)
+EXCEL_EPOCH = np.datetime64('1899-12-30', 'ns')
+# Начало отсчета дат workbook с опцией date_1904
+EXCEL_EPOCH_1904 = np.datetime64('1904-01-01', 'ns')
+EXCEL_LEAP_BUG_SERIAL = 61
+
+NS_PER_DAY = 86400 * 10 ** 9
+
+# Колонки object интернируются, если в выборке из первых INTERN_SAMPLE_SIZE значений
+# различных значений не больше INTERN_MAX_RATIO от размера выборки
+INTERN_SAMPLE_SIZE = 1000
+INTERN_MAX_RATIO = 0.5
+
+
+class Column:
+    """Колонка данных, приведенная к одному способу записи в worksheet.
+
+    Тип колонки определяется один раз, значения конвертируются целиком,
+    после чего ячейки пишутся типизированным методом worksheet без диспетчеризации по каждому значению.
+    """
+
+    def __init__(self, method, values, filled=None, codes=None, categories=None):
+        # имя метода worksheet: write_number, write_string, write_boolean или write
+        self.method = method
+        self.values = values
+
+        # маска непустых ячеек, None - пустых ячеек нет
+        self.filled = filled
+
+        # для интернированных колонок: коды значений (-1 - пустая ячейка) и сконвертированные значения по кодам,
+        # values в этом случае ссылаются на одни и те же объекты categories
+        self.codes = codes
+        self.categories = categories
+
+    def __len__(self):
+        return len(self.values)
+
+    def write(self, worksheet, row, col, cell_format, blanks=True):
+        """Записывает колонку сверху вниз, начиная с ячейки (row, col); blanks=False - пустые ячейки пропускаются"""
+        write = getattr(worksheet, self.method)
+        values = self.values
+
+        if self.filled is None:
+            for i, value in enumerate(values):
+                write(row + i, col, value, cell_format)
+            return
+
+        for i in np.flatnonzero(self.filled).tolist():
+            write(row + i, col, values[i], cell_format)
+
+        if not blanks:
+            return
+
+        for i in np.flatnonzero(~self.filled).tolist():
+            worksheet.write_blank(row + i, col, None, cell_format)
+
+    def write_cell(self, worksheet, row, col, i, cell_format, blanks=True):
+        """Записывает i-е значение колонки в ячейку (row, col)"""
+        if self.filled is None or self.filled[i]:
+            getattr(worksheet, self.method)(row, col, self.values[i], cell_format)
+        elif blanks:
+            worksheet.write_blank(row, col, None, cell_format)
+
+
+def dtype_kind(dtype):
+    """Название вида dtype для настройки форматов: float, int, bool, datetime, timedelta, category или object"""
+    if isinstance(dtype, pd.CategoricalDtype):
+        return 'category'
+
+    if pd.api.types.is_bool_dtype(dtype):
+        return 'bool'
+
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return 'datetime'
+
+    if pd.api.types.is_timedelta64_dtype(dtype):
+        return 'timedelta'
+
+    if pd.api.types.is_integer_dtype(dtype):
+        return 'int'
+
+    if pd.api.types.is_float_dtype(dtype):
+        return 'float'
+
+    return 'object'
+
+
+def prepare_column(series, date_1904=False):
+    """Определяет тип колонки и конвертирует ее значения для записи.
+
+    date_1904 - система дат workbook (опция date_1904, см. pandex.compat.date_1904).
+    """
+    dtype = series.dtype
+
+    if isinstance(dtype, pd.CategoricalDtype):
+        return interned_column(series.cat.codes.to_numpy(), series.cat.categories, date_1904=date_1904)
+
+    if pd.api.types.is_bool_dtype(dtype) and not series.hasnans:
+        return Column('write_boolean', series.to_numpy(dtype=bool).tolist())
+
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return _datetime_column(series, date_1904)
+
+    if pd.api.types.is_timedelta64_dtype(dtype):
+        return _timedelta_column(series)
+
+    if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+        return _numeric_column(series)
+
+    return _object_column(series)
+
+
+def interned_column(codes, categories, convert=None, date_1904=False):
+    """Колонка, значения которой заданы кодами категорий: категории конвертируются один раз.
+
+    convert(categories) возвращает Column сконвертированных категорий, по умолчанию prepare_column.
+    """
+    codes = np.asarray(codes)
+    column = convert(categories) if convert else prepare_column(pd.Series(categories), date_1904)
+
+    filled = codes >= 0
+    if column.filled is not None:
+        filled &= column.filled[codes]
+
+    categories = column.values
+    values = np.asarray(categories + [None], dtype=object)[codes].tolist()
+
+    return Column(column.method, values, None if filled.all() else filled, codes, categories)
+
+
+def factorize_low_cardinality(values):
+    """Коды и уникальные значения строковой колонки, если значений мало по сравнению с количеством ячеек, иначе None.
+
+    Интернируются только строки: pd.factorize считает равными True, 1 и 1.0 (False и 0),
+    поэтому в колонках смешанных типов значения разных типов получили бы один код.
+    """
+    if len(values) < INTERN_SAMPLE_SIZE:
+        return None
+
+    sample = pd.unique(values[:INTERN_SAMPLE_SIZE])
+    if len(sample) > INTERN_SAMPLE_SIZE * INTERN_MAX_RATIO or not is_string_values(sample):
+        return None
+
+    codes, uniques = pd.factorize(values)
+    if not is_string_values(uniques):
+        return None
+
+    return codes, uniques
+
+
+def is_string_values(values):
+    """Все непустые значения - строки"""
+    return pd.api.types.infer_dtype(values, skipna=True) in ('string', 'empty')
+
+
+def _numeric_column(series):
+    if pd.api.types.is_integer_dtype(series.dtype) and not series.hasnans:
+        return Column('write_number', series.to_numpy().tolist())
+
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    return _number_column(values)
+
+
+def _number_column(values):
+    # NaN и inf Excel не поддерживает, такие ячейки остаются пустыми
+    filled = np.isfinite(values)
+    return Column('write_number', values.tolist(), None if filled.all() else filled)
+
+
+def _datetime_column(series, date_1904=False):
+    if getattr(series.dt, 'tz', None) is not None:
+        series = series.dt.tz_localize(None)
+
+    values = series.to_numpy(dtype='datetime64[ns]')
+    filled = ~np.isnat(values)
+
+    if date_1904:
+        serial = (values - EXCEL_EPOCH_1904).astype(np.int64) / NS_PER_DAY
+    else:
+        serial = (values - EXCEL_EPOCH).astype(np.int64) / NS_PER_DAY
+
+        # Excel считает 1900 год високосным, поэтому даты до 1 марта 1900 сдвинуты на день
+        serial = np.where(serial < EXCEL_LEAP_BUG_SERIAL, serial - 1, serial)
+
+    return Column('write_number', serial.tolist(), None if filled.all() else filled)
+
+
+def _timedelta_column(series):
+    values = series.to_numpy(dtype='timedelta64[ns]')
+    filled = ~np.isnat(values)
+
+    days = values.astype(np.int64) / NS_PER_DAY
+
+    return Column('write_number', days.tolist(), None if filled.all() else filled)
+
+
+def _object_column(series):
+    values = np.asarray(series, dtype=object)
+
+    factorized = factorize_low_cardinality(values)
+    if factorized is not None:
+        codes, uniques = factorized
+        return interned_column(codes, uniques, _object_column)
+
+    filled = ~pd.isna(values)
+    if filled.all():
+        filled = None
+
+    inferred = pd.api.types.infer_dtype(values, skipna=True)
+    if inferred == 'string':
+        return Column('write_string', values.tolist(), filled)
+
+    if inferred in ('integer', 'floating', 'mixed-integer-float'):
+        return _number_column(pd.to_numeric(values).astype(np.float64))
+
+    if inferred == 'boolean':
+        return Column('write_boolean', values.tolist(), filled)
+
+    # смешанные типы записываются общим методом write с диспетчеризацией по значению
+    return Column('write', values.tolist(), filled)
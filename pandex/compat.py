@@ -0,0 +1,274 @@
+"""Обращения к внутренним методам и атрибутам xlsxwriter.
+
+Потоковая запись, NativeWriter и сборка листов из процессов пула пишут ячейки и объединения
+в обход публичных методов worksheet, поэтому зависят от внутреннего устройства xlsxwriter.
+Все такие обращения собраны здесь; при импорте проверяется версия xlsxwriter и наличие нужных методов
+и атрибутов.
+"""
+import io
+import re
+import warnings
+
+import numpy as np
+import xlsxwriter
+from xlsxwriter.exceptions import OverlappingRange
+from xlsxwriter.format import Format
+from xlsxwriter.sharedstrings import SharedStringTable
+from xlsxwriter.utility import xl_range
+from xlsxwriter.workbook import Workbook
+from xlsxwriter.worksheet import CellBlankTuple, CellStringTuple, Worksheet
+from xlsxwriter.xmlwriter import XMLwriter
+
+# Версии xlsxwriter, с которыми проверена работа с внутренними методами: [MIN_VERSION, MAX_VERSION)
+MIN_VERSION = (3, 0)
+MAX_VERSION = (4, 0)
+
+# Размеры листа Excel
+MAX_ROWS = 1048576
+MAX_COLS = 16384
+
+_REQUIRED = [
+    (Worksheet, '_convert_date_time'),
+    (Worksheet, '_check_dimensions'),
+    (Worksheet, '_write_sheet_data'),
+    (Worksheet, '_write_optimized_sheet_data'),
+    (Worksheet, '_assemble_xml_file'),
+    (Format, '_get_xf_index'),
+    (XMLwriter, '_escape_control_characters'),
+    (SharedStringTable, '_get_shared_string_index'),
+    (XMLwriter, '_xml_start_tag'),
+    (XMLwriter, '_xml_end_tag'),
+]
+
+# Атрибуты, которые создаются в __init__: проверяются на экземплярах
+_REQUIRED_ATTRIBUTES = [
+    (Worksheet, (
+        'table', 'merge', 'merged_cells', 'table_cells', 'str_table', 'fh',
+        'dim_rowmin', 'dim_colmin', 'dim_rowmax', 'dim_colmax',
+        'constant_memory', 'date_1904', 'xls_strmax', 'write_handlers',
+        'strings_to_formulas', 'strings_to_urls', 'strings_to_numbers',
+    )),
+    (Format, ('xf_index',)),
+    (Workbook, ('formats',)),
+]
+
+
+def _version(value):
+    return tuple(int(part) for part in re.findall(r'\d+', value)[:2])
+
+
+XLSXWRITER_VERSION = _version(xlsxwriter.__version__)
+
+def _probe(cls):
+    return cls(io.BytesIO()) if cls is Workbook else cls()
+
+
+_missing = ['%s.%s' % (cls.__name__, name) for cls, name in _REQUIRED if not hasattr(cls, name)]
+for _cls, _names in _REQUIRED_ATTRIBUTES:
+    _instance = _probe(_cls)
+    _missing.extend('%s.%s' % (_cls.__name__, name) for name in _names if not hasattr(_instance, name))
+
+if _missing:
+    raise ImportError('xlsxwriter %s is not supported by pandex, missing: %s'
+                      % (xlsxwriter.__version__, ', '.join(_missing)))
+
+if not MIN_VERSION <= XLSXWRITER_VERSION < MAX_VERSION:
+    warnings.warn('pandex is tested with xlsxwriter %d.x, installed %s' % (MIN_VERSION[0], xlsxwriter.__version__))
+
+
+def convert_date_time(worksheet, value):
+    """Дата, время или timedelta как число Excel с учетом настроек workbook (date_1904)"""
+    return worksheet._convert_date_time(value)
+
+
+def date_1904(worksheet):
+    """Workbook листа использует систему дат 1904 (опция date_1904); writer может передавать свою опцию date_1904"""
+    value = getattr(worksheet, 'date_1904', False)
+    return isinstance(value, (bool, int)) and bool(value)
+
+
+def check_dimensions(worksheet, row, col):
+    """Расширяет занятую область листа до ячейки (row, col); True - ячейка за пределами листа"""
+    return bool(worksheet._check_dimensions(row, col))
+
+
+def xf_index(cell_format):
+    """Индекс формата ячейки в workbook (назначается при первом обращении)"""
+    return cell_format._get_xf_index()
+
+
+def escape_control_characters(string):
+    return XMLwriter._escape_control_characters(string)
+
+
+def workbook_formats(workbook):
+    """Пары (xf_index, формат) форматов workbook"""
+    return [(cell_format.xf_index, cell_format) for cell_format in workbook.formats]
+
+
+def sheet_merges(worksheet):
+    """Объединения листа [first_row, first_col, last_row, last_col]"""
+    return [list(merge) for merge in worksheet.merge]
+
+
+def sheet_dimensions(worksheet):
+    """Первая и последняя ячейки занятой области листа; пустой список для пустого листа"""
+    if worksheet.dim_rowmin is None:
+        return []
+
+    return [(worksheet.dim_rowmin, worksheet.dim_colmin), (worksheet.dim_rowmax, worksheet.dim_colmax)]
+
+
+def write_sheet_data(worksheet, chunks):
+    """Записывает в XML листа элемент <sheetData> с готовым XML строк (строки chunks)"""
+    worksheet._xml_start_tag('sheetData')
+
+    for chunk in chunks:
+        worksheet.fh.write(chunk)
+
+    worksheet._xml_end_tag('sheetData')
+
+
+def has_cells(worksheet):
+    """В листе есть ячейки, записанные методами worksheet (write, merge_range и т.п.)"""
+    return any(worksheet.table.values())
+
+
+def clear_cells(worksheet):
+    """Удаляет записанные в лист ячейки и объединения"""
+    worksheet.table.clear()
+    worksheet.merge.clear()
+    worksheet.merged_cells.clear()
+
+
+def inside_sheet(last_row, last_col):
+    return last_row < MAX_ROWS and last_col < MAX_COLS
+
+
+def register_merges(worksheet, merges):
+    """Регистрирует объединения [first_row, first_col, last_row, last_col] в worksheet, как merge_range,
+    но без записи ячеек: объединения проверяются на пересечение с объединениями и таблицами листа
+    и между собой, после чего их ячейки отмечаются в worksheet.merged_cells.
+
+    Объединения за пределами листа должны быть отброшены заранее (см. inside_sheet).
+    """
+    merges = np.asarray(merges, dtype=np.int64).reshape(-1, 4)
+    if not len(merges):
+        return
+
+    cell_ranges = [xl_range(*merge) for merge in merges.tolist()]
+    rows, cols, positions = merge_cells(*merges.T)
+    cells = list(zip(rows.tolist(), cols.tolist()))
+
+    merged = dict(zip(cells, [cell_ranges[position] for position in positions.tolist()]))
+    if (len(merged) < len(cells)
+            or not worksheet.merged_cells.keys().isdisjoint(merged)
+            or not worksheet.table_cells.keys().isdisjoint(merged)):
+        _raise_overlap(worksheet, merges.tolist(), cell_ranges)
+
+    worksheet.merged_cells.update(merged)
+    worksheet.merge.extend(merges.tolist())
+
+
+def merge_cells(first_rows, first_cols, last_rows, last_cols):
+    """Координаты всех ячеек объединений и номер объединения каждой ячейки; первая ячейка объединения - первая"""
+    widths = last_cols - first_cols + 1
+    areas = (last_rows - first_rows + 1) * widths
+
+    positions = np.repeat(np.arange(0, len(areas)), areas)
+    offsets = np.arange(0, areas.sum()) - np.repeat(np.cumsum(areas) - areas, areas)
+
+    rows = first_rows[positions] + offsets // widths[positions]
+    cols = first_cols[positions] + offsets % widths[positions]
+
+    return rows, cols, positions
+
+
+def _raise_overlap(worksheet, merges, cell_ranges):
+    """OverlappingRange с тем же сообщением, что и у merge_range для первого пересекающегося объединения"""
+    merged_cells = dict(worksheet.merged_cells)
+    table_cells = worksheet.table_cells
+
+    for (first_row, first_col, last_row, last_col), cell_range in zip(merges, cell_ranges):
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                previous_range = merged_cells.get((row, col))
+                if previous_range:
+                    raise OverlappingRange("Merge range '%s' overlaps previous merge range '%s'."
+                                           % (cell_range, previous_range))
+
+                previous_range = table_cells.get((row, col))
+                if previous_range:
+                    raise OverlappingRange("Merge range '%s' overlaps previous table range '%s'."
+                                           % (cell_range, previous_range))
+
+                merged_cells[(row, col)] = cell_range
+
+
+def store_cells(worksheet, rows, cols, values, cell_format):
+    """Записывает значения в ячейки листа, как worksheet.write, одной операцией над таблицей ячеек worksheet.
+
+    Напрямую сохраняются только строки, которые write записал бы как обычные строки (не формулы, ссылки
+    и числа); остальные значения, а также листы в режиме constant_memory и объекты, отличные от Worksheet,
+    записываются через write.
+    """
+    if not _stores_cells(worksheet) or str in worksheet.write_handlers:
+        for row, col, value in zip(rows, cols, values):
+            worksheet.write(row, col, value, cell_format)
+        return
+
+    stored_rows, stored_cols = [], []
+    table = worksheet.table
+    shared_string_index = worksheet.str_table._get_shared_string_index
+
+    for row, col, value in zip(rows, cols, values):
+        if (value.__class__ is str and row < MAX_ROWS and col < MAX_COLS
+                and _plain_string(worksheet, value)):
+            table[row][col] = CellStringTuple(shared_string_index(value), cell_format)
+            stored_rows.append(row)
+            stored_cols.append(col)
+        else:
+            worksheet.write(row, col, value, cell_format)
+
+    _store_dimensions(worksheet, stored_rows, stored_cols)
+
+
+def store_blanks(worksheet, rows, cols, cell_format):
+    """Записывает пустые ячейки с форматом cell_format, как worksheet.write_blank"""
+    if cell_format is None:
+        # пустые ячейки без формата xlsxwriter не записывает
+        return
+
+    if not _stores_cells(worksheet):
+        for row, col in zip(rows, cols):
+            worksheet.write_blank(row, col, None, cell_format)
+        return
+
+    blank = CellBlankTuple(cell_format)
+    table = worksheet.table
+    for row, col in zip(rows, cols):
+        table[row][col] = blank
+
+    _store_dimensions(worksheet, rows, cols)
+
+
+def _stores_cells(worksheet):
+    """Ячейки листа можно сохранять напрямую в worksheet.table"""
+    return isinstance(worksheet, Worksheet) and not worksheet.constant_memory
+
+
+def _plain_string(worksheet, value):
+    """Строку write записывает как обычную строку (см. Worksheet._write_token_as_string)"""
+    return (
+        value != '' and len(value) <= worksheet.xls_strmax
+        and not (worksheet.strings_to_formulas and value.startswith('='))
+        and not (value.startswith('{=') and value.endswith('}'))
+        and not (worksheet.strings_to_urls and ':' in value)
+        and not worksheet.strings_to_numbers
+    )
+
+
+def _store_dimensions(worksheet, rows, cols):
+    if len(rows):
+        check_dimensions(worksheet, min(rows), min(cols))
+        check_dimensions(worksheet, max(rows), max(cols))
@@ -0,0 +1,54 @@
+import weakref
+
+_registries = weakref.WeakKeyDictionary()
+
+
+class FormatRegistry:
+    """Общие для workbook объекты Format: одинаковые свойства дают один и тот же Format.
+
+    hits и misses показывают, сколько раз формат был переиспользован и сколько раз создан.
+    """
+
+    def __init__(self, workbook):
+        self._workbook = workbook
+        self._formats = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._formats)
+
+    def get(self, properties):
+        key = _freeze(properties or {})
+
+        xl_format = self._formats.get(key)
+        if xl_format is not None:
+            self.hits += 1
+            return xl_format
+
+        self.misses += 1
+        xl_format = self._workbook.add_format(dict(properties or {}))
+        self._formats[key] = xl_format
+
+        return xl_format
+
+
+def get_format_registry(workbook) -> FormatRegistry:
+    """Возвращает реестр форматов workbook, создавая его при первом обращении"""
+    registry = _registries.get(workbook)
+    if registry is None:
+        registry = _registries[workbook] = FormatRegistry(workbook)
+
+    return registry
+
+
+def _freeze(value):
+    """Приводит свойства формата к хешируемому виду независимо от порядка ключей"""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+
+    return value
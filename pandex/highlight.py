@@ -0,0 +1,154 @@
+import abc
+
+import numpy as np
+import pandas as pd
+
+from .formats import get_format_registry
+
+
+class HighlightRule(abc.ABC):
+    """Правило выделения ячеек данных таблицы, записываемое условным форматированием Excel.
+
+    Правило занимает несколько диапазонов worksheet.conditional_format по границам данных таблицы
+    (одна запись на диапазон), а не формат каждой ячейки, поэтому стоимость не зависит от количества строк.
+
+    columns - название колонки или список названий колонок, к которым применяется правило, None - все колонки данных.
+    Для таблиц с многоуровневым заголовком кортеж - название одной колонки, а не список названий.
+    per_column=True - отдельный диапазон на каждую колонку (например, своя шкала цветов для каждой колонки),
+    иначе соседние колонки объединяются в один диапазон.
+    """
+
+    per_column = False
+
+    def __init__(self, columns=None, per_column=None):
+        if columns is not None and not pd.api.types.is_list_like(columns):
+            # одно название колонки (строка - тоже одно название, а не список символов)
+            columns = [columns]
+
+        self.columns = columns
+
+        if per_column is not None:
+            self.per_column = per_column
+
+    @abc.abstractmethod
+    def options(self, workbook):
+        """Параметры worksheet.conditional_format"""
+
+    def apply(self, workbook, worksheet, bounds, columns):
+        """Записывает правило в диапазоны колонок данных; bounds - границы данных, columns - колонки DataFrame.
+
+        Возвращает количество записанных диапазонов.
+        """
+        first_row, first_col, last_row, _ = bounds
+        options = self.options(workbook)
+
+        ranges = self._ranges(columns)
+        for first, last in ranges:
+            worksheet.conditional_format(first_row, first_col + first, last_row, first_col + last, dict(options))
+
+        return len(ranges)
+
+    def _labels(self, columns):
+        """Названия колонок правила"""
+        if isinstance(self.columns, tuple) and isinstance(columns, pd.MultiIndex):
+            return [self.columns]
+
+        return list(self.columns)
+
+    def _ranges(self, columns):
+        """Пары (первая, последняя) позиций колонок данных, на которые распространяется правило"""
+        if self.columns is None:
+            selected = np.arange(0, len(columns))
+        else:
+            selected = np.flatnonzero(columns.isin(self._labels(columns)))
+
+        if self.per_column or not len(selected):
+            return [(position, position) for position in selected.tolist()]
+
+        # соседние колонки объединяются в один диапазон
+        breaks = np.flatnonzero(np.diff(selected) != 1) + 1
+        starts = np.concatenate([[0], breaks])
+        ends = np.concatenate([breaks, [len(selected)]]) - 1
+
+        return list(zip(selected[starts].tolist(), selected[ends].tolist()))
+
+
+class Threshold(HighlightRule):
+    """Формат ячеек, значения которых удовлетворяют условию criteria ('>', '>=', '<', '<=', '==', '!=', 'between').
+
+    cell_format - свойства формата или цвет заливки, например Threshold('<', 0, ModeColor.NEG.value).
+    Для 'between' value - пара (минимум, максимум).
+    """
+
+    def __init__(self, criteria, value, cell_format, columns=None, per_column=None):
+        super().__init__(columns, per_column)
+
+        self.criteria = criteria
+        self.value = value
+        self.cell_format = cell_format
+
+    def options(self, workbook):
+        options = {'type': 'cell', 'criteria': self.criteria, 'format': _get_format(workbook, self.cell_format)}
+
+        if self.criteria in ('between', 'not between'):
+            options['minimum'], options['maximum'] = self.value
+        else:
+            options['value'] = self.value
+
+        return options
+
+
+class TopN(HighlightRule):
+    """Формат count наибольших (bottom=True - наименьших) значений, percent=True - count процентов значений"""
+
+    def __init__(self, count, cell_format, bottom=False, percent=False, columns=None, per_column=None):
+        super().__init__(columns, per_column)
+
+        self.count = count
+        self.cell_format = cell_format
+        self.bottom = bottom
+        self.percent = percent
+
+    def options(self, workbook):
+        options = {
+            'type': 'bottom' if self.bottom else 'top',
+            'value': self.count,
+            'format': _get_format(workbook, self.cell_format),
+        }
+
+        if self.percent:
+            options['criteria'] = '%'
+
+        return options
+
+
+class ColorScale(HighlightRule):
+    """Цветовая шкала от min_color до max_color (через mid_color, если он задан), по умолчанию своя для каждой колонки"""
+
+    per_column = True
+
+    def __init__(self, min_color, max_color, mid_color=None, columns=None, per_column=None):
+        super().__init__(columns, per_column)
+
+        self.min_color = min_color
+        self.max_color = max_color
+        self.mid_color = mid_color
+
+    def options(self, workbook):
+        if self.mid_color is None:
+            return {'type': '2_color_scale', 'min_color': self.min_color, 'max_color': self.max_color}
+
+        return {
+            'type': '3_color_scale',
+            'min_color': self.min_color,
+            'mid_color': self.mid_color,
+            'max_color': self.max_color,
+        }
+
+
+def _get_format(workbook, cell_format):
+    """Format правила из свойств формата или цвета заливки"""
+    if isinstance(cell_format, str):
+        cell_format = {'bg_color': cell_format}
+
+    return get_format_registry(workbook).get(cell_format)
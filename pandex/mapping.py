@@ -0,0 +1,103 @@
+import numpy as np
+
+
+class CellLine:
+    """Координаты ячеек, лежащих в одной строке (horizontal) или в одной колонке листа.
+
+    Хранит только общую координату и позиции по второй оси: range для сплошного блока
+    или массив int32 для ячеек с промежутками (многоуровневые заголовки и индексы).
+    """
+
+    def __init__(self, fixed, positions, horizontal=True):
+        self._fixed = fixed
+        self._positions = positions
+        self._horizontal = horizontal
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return CellLine(self._fixed, self._positions[item], self._horizontal)
+
+        position = int(self._positions[item])
+        if self._horizontal:
+            return [self._fixed, position]
+
+        return [position, self._fixed]
+
+    def __iter__(self):
+        for i in range(0, len(self)):
+            yield self[i]
+
+    def bounds(self):
+        """Возвращает [first_row, first_col, last_row, last_col] линии"""
+        return self[0] + self[-1]
+
+    def concat(self, line):
+        """Линия, продолженная ячейками line с той же общей координатой"""
+        first, second = self._positions, line._positions
+
+        # сплошные блоки, идущие друг за другом, остаются range
+        if isinstance(first, range) and isinstance(second, range) and (not first or first.stop == second.start):
+            joined = range(first.start if first else second.start, second.stop)
+        else:
+            joined = positions(np.concatenate([np.asarray(first), np.asarray(second)]))
+
+        return CellLine(self._fixed, joined, self._horizontal)
+
+    def tolist(self):
+        return list(self)
+
+
+class CellGrid:
+    """Координаты сплошного прямоугольного блока ячеек: начало и размер"""
+
+    def __init__(self, row, col, rows_count, cols_count):
+        self._row = row
+        self._col = col
+
+        self._rows_count = rows_count
+        self._cols_count = cols_count
+
+    @property
+    def shape(self):
+        return self._rows_count, self._cols_count
+
+    def __len__(self):
+        return self._rows_count
+
+    def __getitem__(self, row):
+        if row < 0:
+            row += self._rows_count
+
+        if not 0 <= row < self._rows_count:
+            raise IndexError('Row %s is out of mapping with %s rows' % (row, self._rows_count))
+
+        return CellLine(self._row + row, range(self._col, self._col + self._cols_count))
+
+    def __iter__(self):
+        for i in range(0, self._rows_count):
+            yield self[i]
+
+    def column(self, col):
+        """Возвращает координаты ячеек одной колонки блока"""
+        if col < 0:
+            col += self._cols_count
+
+        if not 0 <= col < self._cols_count:
+            raise IndexError('Column %s is out of mapping with %s columns' % (col, self._cols_count))
+
+        return CellLine(self._col + col, range(self._row, self._row + self._rows_count), horizontal=False)
+
+    def bounds(self):
+        """Возвращает [first_row, first_col, last_row, last_col] блока"""
+        return [self._row, self._col, self._row + self._rows_count - 1, self._col + self._cols_count - 1]
+
+    def tolist(self):
+        return [line.tolist() for line in self]
+
+
+def positions(values):
+    """Упаковывает позиции ячеек с промежутками в компактный массив"""
+    return np.asarray(values, dtype=np.int32)
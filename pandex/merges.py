@@ -0,0 +1,127 @@
+import numpy as np
+from xlsxwriter.exceptions import OverlappingRange
+from xlsxwriter.utility import xl_range
+
+from .compat import MAX_COLS, MAX_ROWS, merge_cells, register_merges, store_blanks, store_cells
+
+
+class MergePlan:
+    """Ячейки и объединения ячеек (first_row, first_col, last_row, last_col, value), рассчитанные заранее.
+
+    Координаты хранятся массивами NumPy по блокам (например, по уровню заголовка на блок).
+    Пересечения ячеек плана между собой проверяются до записи одним проходом по всему плану,
+    поэтому некорректный план не оставляет на листе частично записанных ячеек.
+    Объединения регистрируются в листе одной операцией с проверкой пересечений с его объединениями и таблицами,
+    как в merge_range, а ячейки сохраняются в таблицу ячеек worksheet без разбора аргументов каждого вызова
+    write (см. pandex.compat.register_merges, store_cells, store_blanks).
+    """
+
+    def __init__(self):
+        self._blocks = []
+        self._compiled = None
+
+    def __len__(self):
+        return sum(len(block[4]) for block in self._blocks)
+
+    def add(self, first_rows, first_cols, last_rows, last_cols, values):
+        """Добавляет блок ячеек; координаты - массивы или числа, общие для всех ячеек блока"""
+        values = list(values)
+        coordinates = [
+            np.broadcast_to(np.asarray(coordinate, dtype=np.int64), len(values))
+            for coordinate in (first_rows, first_cols, last_rows, last_cols)
+        ]
+
+        self._blocks.append((*coordinates, values))
+        self._compiled = None
+
+    def head(self, count):
+        """План из первых count ячеек"""
+        plan = MergePlan()
+
+        first_rows, first_cols, last_rows, last_cols, values = self._compile()
+        plan.add(first_rows[:count], first_cols[:count], last_rows[:count], last_cols[:count], values[:count])
+
+        return plan
+
+    def spans(self):
+        """Ячейки плана кортежами (first_row, first_col, last_row, last_col, value)"""
+        first_rows, first_cols, last_rows, last_cols, values = self._compile()
+
+        return list(zip(first_rows.tolist(), first_cols.tolist(), last_rows.tolist(), last_cols.tolist(), values))
+
+    def counters(self):
+        """Количество ячеек, занятых планом, и количество объединений из нескольких ячеек"""
+        areas = self._areas()
+        return int(areas.sum()), int((areas > 1).sum())
+
+    def validate(self):
+        """Проверяет, что ячейки плана не пересекаются.
+
+        Покрытие считается разностным массивом по прямоугольнику, охватывающему план:
+        углы каждой ячейки отмечаются +1/-1, накопленные суммы по строкам и колонкам дают количество
+        ячеек плана, покрывающих каждую ячейку листа.
+        """
+        first_rows, first_cols, last_rows, last_cols, _ = self._compile()
+        if not len(first_rows):
+            return
+
+        row, col = first_rows.min(), first_cols.min()
+        top, left = first_rows - row, first_cols - col
+        bottom, right = last_rows - row + 1, last_cols - col + 1
+
+        coverage = np.zeros((bottom.max() + 1, right.max() + 1), dtype=np.int32)
+        np.add.at(coverage, (top, left), 1)
+        np.add.at(coverage, (top, right), -1)
+        np.add.at(coverage, (bottom, left), -1)
+        np.add.at(coverage, (bottom, right), 1)
+
+        overlapped = np.argwhere(coverage.cumsum(axis=0).cumsum(axis=1) > 1)
+        if len(overlapped):
+            overlap_row, overlap_col = (overlapped[0] + [row, col]).tolist()
+            ranges = [
+                xl_range(*span[:4]) for span in self.spans()
+                if span[0] <= overlap_row <= span[2] and span[1] <= overlap_col <= span[3]
+            ]
+            raise OverlappingRange("Merge range '%s' overlaps previous merge range '%s'." % (ranges[1], ranges[0]))
+
+    def write(self, worksheet, cell_format):
+        """Проверяет и записывает план в worksheet"""
+        self.validate()
+
+        first_rows, first_cols, last_rows, last_cols, values = self._compile()
+        multiple = self._areas() > 1
+
+        # объединения, выходящие за пределы листа, пропускаются целиком (merge_range для них возвращает -1)
+        inside = (last_rows < MAX_ROWS) & (last_cols < MAX_COLS)
+        merged = multiple & inside
+
+        merges = np.column_stack([first_rows, first_cols, last_rows, last_cols])[merged]
+        register_merges(worksheet, merges)
+
+        # первая ячейка каждого объединения содержит значение, остальные - пустые с тем же форматом
+        written = np.flatnonzero(~multiple | inside)
+        store_cells(worksheet, first_rows[written].tolist(), first_cols[written].tolist(),
+                    [values[i] for i in written.tolist()], cell_format)
+
+        # ячейки каждого объединения идут подряд, начиная с первой
+        rows, cols, positions = merge_cells(*merges.T)
+        blank = np.diff(positions, prepend=-1) == 0
+        store_blanks(worksheet, rows[blank].tolist(), cols[blank].tolist(), cell_format)
+
+    def _compile(self):
+        """Координаты и значения всех блоков одними массивами"""
+        if self._compiled is None:
+            if self._blocks:
+                columns = list(zip(*self._blocks))
+                self._compiled = (*(np.concatenate(column) for column in columns[:4]),
+                                  [value for values in columns[4] for value in values])
+            else:
+                empty = np.empty(0, dtype=np.int64)
+                self._compiled = (empty, empty, empty, empty, [])
+
+        return self._compiled
+
+    def _areas(self):
+        first_rows, first_cols, last_rows, last_cols, _ = self._compile()
+        return (last_rows - first_rows + 1) * (last_cols - first_cols + 1)
+
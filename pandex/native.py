@@ -0,0 +1,248 @@
+import datetime
+import math
+import numbers
+import re
+import tempfile
+
+from xlsxwriter.utility import xl_col_to_name
+
+from .compat import check_dimensions, convert_date_time, escape_control_characters, inside_sheet, register_merges, \
+    xf_index
+
+XML_ESCAPES = re.compile('[&<>]')
+CONTROL_CHARACTERS = re.compile('[\x00-\x08\x0b-\x1f]|_x[0-9a-fA-F]{4}_')
+
+# Количество строк, экранированный XML которых кешируется
+STRINGS_CACHE_SIZE = 100000
+
+
+class NativeWriter:
+    """Записывает строки листа сразу в XML (<row>/<c>), минуя объекты ячеек xlsxwriter.
+
+    Повторяет подмножество методов worksheet, которое используется при потоковой записи таблиц
+    (write, write_number, write_string, write_boolean, write_blank, merge_range), и требует записи строк
+    по возрастанию. Строки пишутся как inline-строки, экранированный XML повторяющихся значений кешируется.
+    Форматы ячеек берутся из workbook листа, форматы строк и колонок (set_row/set_column) к ячейкам не применяются.
+
+    Колонки данных (pandex.columns.Column) рендерятся в XML целиком через render_column
+    и записываются построчно готовыми фрагментами через write_cells.
+
+    Объединения сразу регистрируются в worksheet листа (merge, merged_cells) с проверкой пересечений,
+    как в merge_range.
+    """
+    renders_columns = True
+
+    def __init__(self, worksheet):
+        self._worksheet = worksheet
+
+        self._fh = tempfile.TemporaryFile(mode='w+', encoding='utf-8')
+
+        self._row = None
+        self._cells = {}
+
+        self._columns = {}
+        self._strings = {}
+        self._styles = {}
+
+        self.dim_rowmin = None
+        self.dim_rowmax = None
+        self.dim_colmin = None
+        self.dim_colmax = None
+
+    def write(self, row, col, value, cell_format=None):
+        if value is None or value == '':
+            self.write_blank(row, col, value, cell_format)
+        elif isinstance(value, bool):
+            self.write_boolean(row, col, value, cell_format)
+        elif isinstance(value, numbers.Real):
+            if math.isfinite(value):
+                self.write_number(row, col, value, cell_format)
+            else:
+                self.write_blank(row, col, None, cell_format)
+        elif isinstance(value, (datetime.datetime, datetime.date, datetime.time, datetime.timedelta)):
+            self.write_number(row, col, convert_date_time(self._worksheet, value), cell_format)
+        else:
+            self.write_string(row, col, str(value), cell_format)
+
+    def write_number(self, row, col, number, cell_format=None):
+        self._set_cell(row, col, '<c r="%s"%s><v>%.16G</v></c>' % (
+            self._reference(row, col), self._style(cell_format), number))
+
+    def write_string(self, row, col, string, cell_format=None):
+        self._set_cell(row, col, '<c r="%s"%s t="inlineStr">%s</c>' % (
+            self._reference(row, col), self._style(cell_format), self._string(string)))
+
+    def write_boolean(self, row, col, boolean, cell_format=None):
+        self._set_cell(row, col, '<c r="%s"%s t="b"><v>%d</v></c>' % (
+            self._reference(row, col), self._style(cell_format), 1 if boolean else 0))
+
+    def write_blank(self, row, col, blank=None, cell_format=None):
+        # пустая ячейка без формата не записывается, как и в xlsxwriter
+        if cell_format is None:
+            return
+
+        self._set_cell(row, col, '<c r="%s"%s/>' % (self._reference(row, col), self._style(cell_format)))
+
+    def render_column(self, column, row, col, cell_format=None, blanks=True):
+        """XML ячеек колонки, начиная с ячейки (row, col); None для колонок, требующих записи по значениям.
+
+        Пустые ячейки рендерятся как None (не записываются), если у них нет формата или blanks=False.
+        """
+        name = self._column_name(col)
+        style = self._style(cell_format)
+
+        if column.method == 'write_number':
+            template = '<c r="%s%%d"%s><v>%%.16G</v></c>' % (name, style)
+            render = float
+        elif column.method == 'write_string':
+            template = '<c r="%s%%d"%s t="inlineStr">%%s</c>' % (name, style)
+            render = self._string
+        elif column.method == 'write_boolean':
+            template = '<c r="%s%%d"%s t="b"><v>%%d</v></c>' % (name, style)
+            render = int
+        else:
+            return None
+
+        values = column.values
+        if column.codes is not None:
+            # значения интернированной колонки рендерятся один раз на категорию
+            rendered = [render(value) for value in column.categories]
+            render = rendered.__getitem__
+            values = column.codes.tolist()
+
+        if column.filled is None:
+            return [template % (row + i, render(value)) for i, value in enumerate(values, 1)]
+
+        # пустые ячейки записываются без значения, если у них есть формат, иначе пропускаются
+        blank = '<c r="%s%%d"%s/>' % (name, style) if cell_format is not None and blanks else None
+        cells = [
+            template % (row + i, render(value)) if filled else (blank % (row + i) if blank else None)
+            for i, (value, filled) in enumerate(zip(values, column.filled.tolist()), 1)
+        ]
+
+        return cells
+
+    def write_cells(self, row, col, cells):
+        """Записывает в строку row готовые XML ячеек, начиная с колонки col; None пропускается"""
+        self._set_cell(row, col + len(cells) - 1, None)
+        self._set_cell(row, col, None)
+
+        row_cells = self._cells
+        for position, xml in enumerate(cells, col):
+            if xml is not None:
+                row_cells[position] = xml
+            else:
+                row_cells.pop(position, None)
+
+    @property
+    def date_1904(self):
+        return self._worksheet.date_1904
+
+    @property
+    def merge(self):
+        return self._worksheet.merge
+
+    @property
+    def merged_cells(self):
+        return self._worksheet.merged_cells
+
+    @property
+    def table_cells(self):
+        return self._worksheet.table_cells
+
+    def merge_range(self, first_row, first_col, last_row, last_col, data, cell_format=None):
+        if first_row != last_row:
+            raise ValueError('Only merges within one row can be written directly')
+
+        # объединения за пределами листа не записываются, merge_range для них возвращает -1
+        if not inside_sheet(last_row, last_col):
+            return -1
+
+        register_merges(self._worksheet, [[first_row, first_col, last_row, last_col]])
+
+        self.write(first_row, first_col, data, cell_format)
+        for col in range(first_col + 1, last_col + 1):
+            self.write_blank(first_row, col, None, cell_format)
+
+        return 0
+
+    def close(self):
+        """Дописывает последнюю строку и переносит данные в RenderedWorksheet листа"""
+        self._write_row()
+
+        self._fh.seek(0)
+
+        worksheet = self._worksheet
+        worksheet.rendered_sheet_data = self._fh
+
+        if self.dim_rowmin is not None:
+            check_dimensions(worksheet, self.dim_rowmin, self.dim_colmin)
+            check_dimensions(worksheet, self.dim_rowmax, self.dim_colmax)
+
+    def _set_cell(self, row, col, xml):
+        if row != self._row:
+            if self._row is not None and row < self._row:
+                raise ValueError('Row %s is written after row %s' % (row, self._row))
+
+            self._write_row()
+            self._row = row
+
+            if self.dim_rowmin is None:
+                self.dim_rowmin = row
+            self.dim_rowmax = row
+
+        if self.dim_colmin is None or col < self.dim_colmin:
+            self.dim_colmin = col
+        if self.dim_colmax is None or col > self.dim_colmax:
+            self.dim_colmax = col
+
+        if xml is not None:
+            self._cells[col] = xml
+
+    def _write_row(self):
+        if not self._cells:
+            return
+
+        cells = self._cells
+        self._fh.write('<row r="%d">%s</row>' % (self._row + 1, ''.join([cells[col] for col in sorted(cells)])))
+        self._cells = {}
+
+    def _column_name(self, col):
+        name = self._columns.get(col)
+        if name is None:
+            name = self._columns[col] = xl_col_to_name(col)
+
+        return name
+
+    def _reference(self, row, col):
+        return '%s%d' % (self._column_name(col), row + 1)
+
+    def _style(self, cell_format):
+        if cell_format is None:
+            return ''
+
+        style = self._styles.get(id(cell_format))
+        if style is None:
+            index = xf_index(cell_format)
+            style = self._styles[id(cell_format)] = ' s="%d"' % index if index else ''
+
+        return style
+
+    def _string(self, string):
+        xml = self._strings.get(string)
+        if xml is not None:
+            return xml
+
+        escaped = string
+        if CONTROL_CHARACTERS.search(escaped):
+            escaped = escape_control_characters(escaped)
+        if XML_ESCAPES.search(escaped):
+            escaped = escaped.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+        preserve = ' xml:space="preserve"' if escaped and (escaped[0].isspace() or escaped[-1].isspace()) else ''
+
+        if len(self._strings) >= STRINGS_CACHE_SIZE:
+            self._strings.clear()
+
+        xml = self._strings[string] = '<is><t%s>%s</t></is>' % (preserve, escaped)
+        return xml
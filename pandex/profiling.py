@@ -0,0 +1,138 @@
+import contextvars
+import functools
+import time
+import tracemalloc
+from collections import OrderedDict
+from contextlib import contextmanager
+
+_active = contextvars.ContextVar('pandex_profiler', default=None)
+
+
+class PhaseRecord:
+    """Замер одной фазы записи: длительность, количество ячеек и объединений, прирост памяти"""
+
+    def __init__(self, name, element=None):
+        self.name = name
+        self.element = element
+
+        self.duration = 0.0
+        self.cells = 0
+        self.merges = 0
+
+        # прирост памяти, отслеживаемой tracemalloc (только при trace_memory=True)
+        self.allocated = None
+
+    def as_dict(self):
+        return {
+            'name': self.name,
+            'element': self.element,
+            'duration': self.duration,
+            'cells': self.cells,
+            'merges': self.merges,
+            'allocated': self.allocated,
+        }
+
+
+class Profiler:
+    """Собирает замеры фаз записи (Table.write, Group.add, графики) внутри блока with.
+
+    with Profiler() as profiler:
+        ...
+        with profiler.phase('workbook.close'):
+            workbook.close()
+
+    profiler.report()  # {'table.data': {'calls': 1, 'duration': 0.12, 'cells': 100000, ...}, ...}
+
+    callback(record) вызывается по окончании каждой фазы, trace_memory=True включает подсчет памяти через tracemalloc.
+    """
+
+    def __init__(self, callback=None, trace_memory=False):
+        self.records = []
+
+        self._callback = callback
+        self._trace_memory = trace_memory
+        self._started_tracing = False
+        self._token = None
+
+    def __enter__(self):
+        if self._trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+        self._token = _active.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _active.reset(self._token)
+
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def phase(self, name, element=None):
+        record = PhaseRecord(name, element)
+
+        memory_before = tracemalloc.get_traced_memory()[0] if self._trace_memory else None
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.duration = time.perf_counter() - started
+            if memory_before is not None:
+                record.allocated = tracemalloc.get_traced_memory()[0] - memory_before
+
+            self.records.append(record)
+            if self._callback is not None:
+                self._callback(record)
+
+    def report(self, by_element=False):
+        """Суммарные показатели по названиям фаз, при by_element=True - по парам (название фазы, элемент)"""
+        report = OrderedDict()
+        for record in self.records:
+            key = (record.name, record.element) if by_element else record.name
+            totals = report.setdefault(key, {
+                'calls': 0, 'duration': 0.0, 'cells': 0, 'merges': 0, 'allocated': None
+            })
+
+            totals['calls'] += 1
+            totals['duration'] += record.duration
+            totals['cells'] += record.cells
+            totals['merges'] += record.merges
+
+            if record.allocated is not None:
+                totals['allocated'] = (totals['allocated'] or 0) + record.allocated
+
+        return report
+
+
+@contextmanager
+def _disabled_phase():
+    yield PhaseRecord(None)
+
+
+def phase(name, element=None):
+    """Фаза активного профилировщика; без профилировщика замеры не выполняются"""
+    profiler = _active.get()
+    if profiler is None:
+        return _disabled_phase()
+
+    return profiler.phase(name, element)
+
+
+def profiled(name):
+    """Декоратор метода: выполнение метода замеряется как фаза name"""
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            # без профилировщика метод вызывается напрямую: Group.add вызывается на каждый элемент листа
+            if _active.get() is None:
+                return method(self, *args, **kwargs)
+
+            with phase(name, type(self).__name__):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -1,6 +1,9 @@
-import copy
+import heapq
+from collections import namedtuple
 from enum import Enum
 
+from .profiling import profiled
+
 
 class Side(Enum):
     RIGHT = 1
@@ -8,28 +11,20 @@ class Side(Enum):
 
 
 class Cursor:
-    def __init__(self, row=0, col=0):
-        self._row = row
-        self._col = col
-
-    @property
-    def row(self):
-        return self._row
+    """Позиция на листе; элементы сдвигают курсор на свой размер при записи"""
 
-    @row.setter
-    def row(self, value):
-        self._row = value
+    # разметка листов с тысячами элементов создает курсор на каждый элемент
+    __slots__ = ('row', 'col')
 
-    @property
-    def col(self):
-        return self._col
+    def __init__(self, row=0, col=0):
+        self.row = row
+        self.col = col
 
-    @col.setter
-    def col(self, value):
-        self._col = value
+    def copy(self):
+        return Cursor(self.row, self.col)
 
     def __str__(self):
-        return 'Cursor(row={row}, col={col})'.format(row=self._row, col=self._col)
+        return 'Cursor(row={row}, col={col})'.format(row=self.row, col=self.col)
 
 
 class Group(object):
@@ -37,8 +32,9 @@ class Group(object):
         self._sheet = sheet
 
         self._cursor_start = cursor
-        self._cursor_end = copy.deepcopy(cursor)
+        self._cursor_end = cursor.copy()
 
+    @profiled('group.add')
     def add(self, obj, side: Side = Side.RIGHT, margin_rows: int = 0, margin_cols: int = 0):
         if side == Side.RIGHT:
             self._add_right(obj, margin_rows, margin_cols)
@@ -67,7 +63,7 @@ class Group(object):
         self._write_object(obj_cursor, obj)
 
     def _write_object(self, obj_cursor, element):
-        element.write(self._sheet.workbook, self._sheet.worksheet, obj_cursor)
+        self._sheet.write_element(element, obj_cursor)
         self._update_cursor_end(obj_cursor)
 
     def _update_cursor_end(self, obj_cursor):
@@ -75,13 +71,22 @@ class Group(object):
         self._sheet.update_cursor(self._cursor_end)
 
 
-class Sheet(object):
-    def __init__(self, workbook, name):
-        self.workbook = workbook
-        self.worksheet = workbook.add_worksheet(name)
+class Size(namedtuple('Size', ['rows', 'cols'])):
+    """Размер элемента листа в строках и колонках"""
 
+
+class Layout(object):
+    """Разметка листа без записи: элементы располагаются по размерам из measure().
+
+    Позволяет заранее рассчитать расположение всех таблиц и графиков (и общий размер листа),
+    а затем записать их в лист через render().
+    """
+
+    def __init__(self):
         self._cursor = Cursor()
 
+        self._placements = []
+
     def create_shape(self, side: Side = Side.RIGHT, margin_rows: int = 0, margin_cols: int = 0):  # table = XLTable
         if side == Side.RIGHT:
             return self._add_right(margin_rows, margin_cols)
@@ -98,6 +103,25 @@ class Sheet(object):
     def cursor(self):
         return self._cursor
 
+    @property
+    def placements(self):
+        """Список (cursor, element) в порядке добавления"""
+        return self._placements
+
+    def write_element(self, element, cursor: Cursor):
+        self._placements.append((cursor.copy(), element))
+
+        size = element.measure()
+        cursor.row += size.rows
+        cursor.col += size.cols
+
+    def render(self, sheet):
+        """Записывает размеченные элементы в лист"""
+        for cursor, element in self._placements:
+            element_cursor = cursor.copy()
+            sheet.write_element(element, element_cursor)
+            sheet.update_cursor(element_cursor)
+
     def _add_right(self, margin_rows, margin_cols):
         cursor = Cursor(
             row=0 + margin_rows,
@@ -113,3 +137,123 @@ class Sheet(object):
         )
 
         return Group(self, cursor)
+
+
+class Sheet(Layout):
+    def __init__(self, workbook, name, streaming: bool = False, native: bool = False,
+                 record_placements: bool = False):
+        """
+        В потоковом режиме (streaming=True) таблицы при добавлении в группу только размечаются,
+        а их ячейки записываются строго по строкам при вызове flush(), в том числе для таблиц,
+        стоящих рядом друг с другом. Это позволяет использовать опцию xlsxwriter constant_memory.
+        flush() вызывается один раз, после того как разметка листа закончена, и до workbook.close();
+        workbook.close() для листа с незаписанными таблицами вызывает RuntimeError.
+
+        native=True включает потоковый режим, в котором строки таблиц записываются сразу в XML листа
+        (см. pandex.native.NativeWriter), минуя объекты ячеек xlsxwriter. Графики и настройки колонок
+        по-прежнему записываются через xlsxwriter.
+
+        record_placements=True сохраняет расположение добавленных элементов (placements), например
+        для ключей кеша render_workbook. По умолчанию лист не хранит ссылки на записанные элементы,
+        и их данные освобождаются сразу после записи.
+        """
+        super().__init__()
+
+        self.workbook = workbook
+
+        if streaming or native:
+            from .workbook import RenderedWorksheet
+
+            self.worksheet = workbook.add_worksheet(name, worksheet_class=RenderedWorksheet)
+        else:
+            self.worksheet = workbook.add_worksheet(name)
+
+        self._streaming = streaming or native
+        self._native = native
+        self._pending = []
+        self._record_placements = record_placements
+
+    @property
+    def streaming(self):
+        return self._streaming
+
+    @property
+    def placements(self):
+        """Список (cursor, element) в порядке добавления; требует record_placements=True"""
+        if not self._record_placements:
+            raise RuntimeError('Sheet %r does not record placements, create it with record_placements=True'
+                               % self.worksheet.name)
+
+        return self._placements
+
+    def write_element(self, element, cursor: Cursor):
+        if self._record_placements:
+            self._placements.append((cursor.copy(), element))
+
+        if self._streaming and hasattr(element, 'iter_rows'):
+            element.prepare(self.workbook, self.worksheet, cursor)
+            self._pending.append(element)
+            self.worksheet.unflushed = True
+        else:
+            element.write(self.workbook, self.worksheet, cursor)
+
+    @profiled('sheet.flush')
+    def flush(self):
+        """Записывает размеченные в потоковом режиме таблицы строка за строкой"""
+        for _ in self.iter_flush():
+            pass
+
+    def iter_flush(self):
+        """Генератор записи размеченных таблиц: каждый шаг записывает одну строку листа и возвращает ее номер.
+
+        Позволяет записывать лист частями, например с переключением на другие задачи между частями.
+        """
+        if self._native:
+            from .native import NativeWriter
+
+            writer = NativeWriter(self.worksheet)
+        else:
+            writer = self.worksheet
+
+        row_writers = [element.iter_rows(writer) for element in self._pending]
+        self._pending = []
+
+        # номер строки объявляется генератором до ее записи, поэтому он возвращается после следующего шага
+        written = None
+        for row in merge_rows(row_writers):
+            if written is not None:
+                yield written
+            written = row
+
+        if self._native:
+            writer.close()
+
+        self.worksheet.unflushed = False
+
+        if written is not None:
+            yield written
+
+
+def merge_rows(row_writers):
+    """Объединяет генераторы построчной записи так, чтобы строки записывались строго по возрастанию.
+
+    Каждый генератор объявляет номер строки, которую запишет при следующем шаге;
+    на каждом шаге продвигается генератор с наименьшим номером строки.
+    """
+    heap = []
+    for order, row_writer in enumerate(row_writers):
+        row = next(row_writer, None)
+        if row is not None:
+            heap.append((row, order, row_writer))
+
+    heapq.heapify(heap)
+
+    while heap:
+        row, order, row_writer = heap[0]
+        yield row
+
+        next_row = next(row_writer, None)
+        if next_row is None:
+            heapq.heappop(heap)
+        else:
+            heapq.heapreplace(heap, (next_row, order, row_writer))
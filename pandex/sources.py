@@ -0,0 +1,150 @@
+import abc
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+class ColumnarFrame(abc.ABC):
+    """Данные таблицы, хранящиеся по колонкам вне pandas (Arrow, memmap NumPy), с интерфейсом DataFrame,
+    который использует Table: index, columns, dtypes, items() и iloc по строкам.
+
+    Колонки читаются в pandas только при записи: целиком по одной колонке (Table.write)
+    или блоками строк (потоковая запись), поэтому весь набор данных в pandas не загружается.
+    """
+
+    def __init__(self, names, dtypes, rows_count, index=None):
+        self.columns = pd.Index(names)
+        self.dtypes = pd.Series(list(dtypes), index=self.columns, dtype=object)
+
+        self.index = index if index is not None else pd.RangeIndex(rows_count)
+        if len(self.index) != rows_count:
+            raise ValueError('Index has %s values, data has %s rows' % (len(self.index), rows_count))
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def shape(self):
+        return len(self.index), len(self.columns)
+
+    @property
+    def size(self):
+        return len(self.index) * len(self.columns)
+
+    @property
+    def empty(self):
+        return not self.size
+
+    @property
+    def iloc(self):
+        return _RowsIndexer(self)
+
+    def items(self):
+        for position, name in enumerate(self.columns):
+            yield name, self._read(position, slice(0, len(self.index)), self.index)
+
+    def rows(self, rows):
+        """DataFrame строк rows (срез или массив позиций)"""
+        index = self.index[rows]
+        return pd.DataFrame(
+            {position: self._read(position, rows, index) for position in range(0, len(self.columns))},
+            index=index
+        ).set_axis(self.columns, axis=1)
+
+    @abc.abstractmethod
+    def _read(self, position, rows, index):
+        """Series значений колонки position в строках rows (срез или массив позиций)"""
+
+
+class ArrayFrame(ColumnarFrame):
+    """Колонки - одномерные массивы NumPy, в том числе np.memmap и np.load(..., mmap_mode='r').
+
+    Срезы строк читаются из массивов без копирования.
+    """
+
+    def __init__(self, arrays, index=None):
+        self._arrays = [np.asarray(array) for array in arrays.values()]
+
+        lengths = {len(array) for array in self._arrays}
+        if len(lengths) > 1:
+            raise ValueError('Arrays have different lengths: %s' % sorted(lengths))
+
+        super().__init__(list(arrays.keys()), [array.dtype for array in self._arrays],
+                         lengths.pop() if lengths else 0, index)
+
+    def _read(self, position, rows, index):
+        return pd.Series(self._arrays[position][rows], index=index, copy=False)
+
+
+class ArrowFrame(ColumnarFrame):
+    """Колонки pyarrow.Table или RecordBatch (например, из pyarrow.parquet или pyarrow.feather с memory_map=True).
+
+    Срезы колонок Arrow не копируются, в pandas конвертируется только читаемая часть строк.
+    index_columns - колонки, из которых строится индекс таблицы (читаются целиком), остальные становятся данными.
+    """
+
+    def __init__(self, table, index_columns=None):
+        if pyarrow is None:
+            raise ImportError('ArrowFrame requires pyarrow')
+
+        if isinstance(table, (list, tuple)):
+            table = pyarrow.Table.from_batches(table)
+
+        index = None
+        if index_columns:
+            levels = [table.column(name).to_pandas() for name in index_columns]
+            if len(levels) == 1:
+                index = pd.Index(levels[0], name=index_columns[0])
+            else:
+                index = pd.MultiIndex.from_arrays(levels, names=index_columns)
+
+            table = table.drop_columns(index_columns) if hasattr(table, 'drop_columns') else table.drop(index_columns)
+
+        self._table = table
+
+        super().__init__(table.schema.names, [_arrow_dtype(field.type) for field in table.schema],
+                         table.num_rows, index)
+
+    def _read(self, position, rows, index):
+        column = self._table.column(position)
+
+        if isinstance(rows, slice):
+            start, stop, _ = rows.indices(len(column))
+            column = column.slice(start, max(stop - start, 0))
+        else:
+            column = column.take(pyarrow.array(np.asarray(rows, dtype=np.int64)))
+
+        series = column.to_pandas()
+        series.index = index
+        return series
+
+
+def _arrow_dtype(arrow_type):
+    """dtype колонки pandas, в которую конвертируется колонка Arrow типа arrow_type (to_pandas)"""
+    types = pyarrow.types
+
+    if types.is_dictionary(arrow_type):
+        return pd.CategoricalDtype()
+
+    if types.is_timestamp(arrow_type) and arrow_type.tz is not None:
+        return pd.DatetimeTZDtype(arrow_type.unit, arrow_type.tz)
+
+    if (types.is_boolean(arrow_type) or types.is_integer(arrow_type) or types.is_floating(arrow_type)
+            or types.is_timestamp(arrow_type) or types.is_duration(arrow_type)):
+        return np.dtype(arrow_type.to_pandas_dtype())
+
+    # строки, даты (datetime.date), decimal, вложенные типы и т.п. конвертируются в колонки объектов
+    return np.dtype(object)
+
+
+class _RowsIndexer:
+    def __init__(self, frame):
+        self._frame = frame
+
+    def __getitem__(self, rows):
+        return self._frame.rows(rows)
@@ -0,0 +1,265 @@
+import importlib
+import json
+import os
+
+import pandas as pd
+import xlsxwriter
+
+from .chart import COLUMN_TEMPLATE, LINE_TEMPLATE, ChartFactory, PieChart, Unit
+from .highlight import ColorScale, Threshold, TopN
+from .sheet import Sheet, Side
+from .table import Table
+
+# Правила выделения по значению type в описании таблицы
+HIGHLIGHT_RULES = {
+    'threshold': Threshold,
+    'top': TopN,
+    'color_scale': ColorScale,
+}
+
+CHART_TEMPLATES = {
+    'line': LINE_TEMPLATE,
+    'column': COLUMN_TEMPLATE,
+}
+
+# Функции чтения файлов данных по значению format (по умолчанию - по расширению файла)
+READERS = {
+    'parquet': pd.read_parquet,
+    'csv': pd.read_csv,
+    'feather': pd.read_feather,
+    'json': pd.read_json,
+}
+
+EXTENSIONS = {
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.csv': 'csv',
+    '.feather': 'feather',
+    '.json': 'json',
+}
+
+
+class ReportSpec:
+    """Декларативное описание отчета: листы, группы элементов, таблицы из файлов и графики по ним.
+
+    {
+        "output": "report.xlsx",
+        "options": {"nan_inf_to_errors": true},
+        "sheets": [{
+            "name": "Line",
+            "streaming": false,
+            "shapes": [{
+                "side": "right", "margin_rows": 0, "margin_cols": 0,
+                "elements": [
+                    {"type": "table", "id": "sales", "source": {"path": "sales.parquet", "index": ["region"]},
+                     "side": "bottom", "autosize": true},
+                    {"type": "line_chart", "name": "Sales", "table": "sales", "rows": [0, 1], "side": "bottom"}
+                ]
+            }]
+        }]
+    }
+
+    Элементы:
+    - table: source (path, format, index, columns, options - аргументы функции чтения) или data
+      (DataFrame в формате orient='split'), а также name, columns_format, excel_table, autosize, sparse,
+      sparse_columns_format, highlight ([{"type": "threshold", ...}]) и class ("module:Table") для дочерних классов Table;
+    - line_chart (rows, skip_columns), column_chart (columns, unit), pie_chart (target_row, unit) - графики по таблице
+      с указанным id; template - "line" или "column", unit - "percent" или "piece".
+
+    Пути к файлам данных и output считаются относительно каталога файла описания.
+    Модуль класса таблицы ("module:Table") импортируется обычным import, поэтому он должен находиться
+    в текущем каталоге или в PYTHONPATH, а не рядом с файлом описания.
+    """
+
+    def __init__(self, data, base_dir=None):
+        self.data = data
+        self.base_dir = base_dir or os.getcwd()
+
+        self.output = self._path(data.get('output', 'report.xlsx'))
+        self.options = data.get('options', {})
+        self.sheets = data.get('sheets', [])
+
+    @classmethod
+    def load(cls, path):
+        """Описание отчета из файла JSON или YAML (требует PyYAML)"""
+        with open(path, encoding='utf-8') as fh:
+            if path.endswith(('.yaml', '.yml')):
+                try:
+                    import yaml
+                except ImportError:
+                    raise ImportError('YAML report specs require PyYAML')
+
+                data = yaml.safe_load(fh)
+            else:
+                data = json.load(fh)
+
+        spec = cls(data, os.path.dirname(os.path.abspath(path)))
+        if 'output' not in data:
+            spec.output = os.path.splitext(os.path.abspath(path))[0] + '.xlsx'
+
+        return spec
+
+    def render(self, output=None):
+        """Записывает отчет в output (по умолчанию - в файл из описания) и возвращает путь к нему"""
+        output = output or self.output
+
+        workbook = xlsxwriter.Workbook(output, self.options)
+        builder = _ReportBuilder(self)
+
+        for sheet_data in self.sheets:
+            builder.build_sheet(workbook, sheet_data)
+
+        workbook.close()
+
+        return output
+
+    def _path(self, path):
+        return os.path.join(self.base_dir, path)
+
+
+class _ReportBuilder:
+    """Создает элементы листов отчета; таблицы доступны графикам по id, файлы данных читаются один раз"""
+
+    def __init__(self, spec: ReportSpec):
+        self._spec = spec
+
+        self._tables = {}
+        self._frames = {}
+        self._charts = ChartFactory()
+
+    def build_sheet(self, workbook, data):
+        streaming = data.get('streaming', False)
+        native = data.get('native', False)
+
+        sheet = Sheet(workbook, data['name'], streaming=streaming, native=native)
+
+        for shape in data.get('shapes', []):
+            group = sheet.create_shape(**_placement(shape))
+
+            for element in shape.get('elements', []):
+                group.add(self.build_element(element), **_placement(element))
+
+        if streaming or native:
+            sheet.flush()
+
+        return sheet
+
+    def build_element(self, data):
+        element_type = data.get('type', 'table')
+
+        if element_type == 'table':
+            return self.build_table(data)
+
+        table = self._tables.get(data.get('table'))
+        if table is None:
+            raise ValueError('Chart %r refers to unknown table %r' % (data.get('name'), data.get('table')))
+
+        name = data.get('name', '')
+        if element_type == 'line_chart':
+            template = CHART_TEMPLATES[data.get('template', 'line')]
+            return self._charts.rows_chart(name, table, data['rows'], template, data.get('skip_columns', 0))
+
+        if element_type == 'column_chart':
+            template = CHART_TEMPLATES[data['template']] if 'template' in data else None
+            unit = Unit[data.get('unit', 'percent').upper()]
+            return self._charts.columns_chart(name, table, data.get('columns'), template, unit)
+
+        if element_type == 'pie_chart':
+            return PieChart(name, table, data.get('target_row', 0), Unit[data.get('unit', 'percent').upper()])
+
+        raise ValueError('Unknown element type: %s' % element_type)
+
+    def build_table(self, data):
+        table_class = _import_class(data['class']) if 'class' in data else Table
+
+        kwargs = {
+            key: data[key]
+            for key in ('name', 'columns_format', 'excel_table', 'autosize', 'sparse', 'sparse_columns_format')
+            if key in data
+        }
+
+        if 'highlight' in data:
+            kwargs['highlight'] = [_highlight_rule(rule) for rule in data['highlight']]
+
+        table = table_class(self.load_frame(data), **kwargs)
+
+        if 'id' in data:
+            self._tables[data['id']] = table
+
+        return table
+
+    def load_frame(self, data):
+        """DataFrame таблицы из встроенных данных или файла источника"""
+        if 'data' in data:
+            return pd.DataFrame(**data['data'])
+
+        source = data['source']
+        if isinstance(source, str):
+            source = {'path': source}
+
+        key = json.dumps(source, sort_keys=True)
+        df = self._frames.get(key)
+        if df is None:
+            df = self._frames[key] = self._read(source)
+
+        return df
+
+    def _read(self, source):
+        path = self._spec._path(source['path'])
+
+        file_format = source.get('format') or EXTENSIONS.get(os.path.splitext(path)[1].lower())
+        if file_format not in READERS:
+            raise ValueError('Unknown data format of %s' % path)
+
+        df = READERS[file_format](path, **source.get('options', {}))
+
+        if source.get('index'):
+            df = df.set_index(source['index'])
+
+        if source.get('columns'):
+            df = df[source['columns']]
+
+        return df
+
+
+def render_spec(path, output_dir=None):
+    """Рендерит отчет по файлу описания; output_dir заменяет каталог файла отчета"""
+    spec = ReportSpec.load(path)
+    return spec.render(_output(spec, output_dir))
+
+
+def spec_output(path, output_dir=None):
+    """Путь к файлу отчета, который render_spec запишет по файлу описания"""
+    return _output(ReportSpec.load(path), output_dir)
+
+
+def _output(spec, output_dir):
+    if output_dir is None:
+        return spec.output
+
+    return os.path.join(output_dir, os.path.basename(spec.output))
+
+
+def _placement(data):
+    """Аргументы create_shape и Group.add: сторона и отступы"""
+    return {
+        'side': Side[data.get('side', 'right').upper()],
+        'margin_rows': data.get('margin_rows', 0),
+        'margin_cols': data.get('margin_cols', 0),
+    }
+
+
+def _highlight_rule(data):
+    data = dict(data)
+    rule_type = data.pop('type')
+
+    if rule_type not in HIGHLIGHT_RULES:
+        raise ValueError('Unknown highlight rule: %s' % rule_type)
+
+    return HIGHLIGHT_RULES[rule_type](**data)
+
+
+def _import_class(path):
+    """Класс по пути вида "package.module:Class" """
+    module_name, _, name = path.partition(':')
+    return getattr(importlib.import_module(module_name), name)
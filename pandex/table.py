@@ -1,7 +1,101 @@
-from itertools import groupby
+import hashlib
+import itertools
+import pickle
 
+import numpy as np
 import pandas as pd
 
+from .autosize import table_widths
+from .columns import Column, dtype_kind, interned_column, is_string_values, prepare_column
+from .compat import date_1904, inside_sheet, register_merges
+from .formats import get_format_registry
+from .mapping import CellGrid, CellLine, positions
+from .merges import MergePlan
+from .profiling import phase, profiled
+from .sheet import Size, merge_rows
+
+# Количество строк данных, конвертируемых за раз при построчной (потоковой) записи
+STREAM_BLOCK_ROWS = 10000
+
+
+def level_runs(index: pd.MultiIndex):
+    """Разбивает каждый уровень MultiIndex на серии одинаковых подряд идущих значений.
+
+    Серия уровня заканчивается там, где меняется значение этого уровня или любого из родительских,
+    поэтому точки смены накапливаются от уровня к уровню. Расчет идет по кодам MultiIndex средствами NumPy.
+    Возвращает для каждого уровня (starts, ends, labels): позиции начала и конца серий и их значения.
+    """
+    codes = np.asarray(index.codes)
+    count = codes.shape[1]
+
+    runs = []
+    changes = np.zeros(max(count - 1, 0), dtype=bool)
+    for level in range(0, index.nlevels):
+        level_codes = codes[level]
+        changes |= level_codes[1:] != level_codes[:-1]
+
+        starts = np.concatenate([[0], np.flatnonzero(changes) + 1]) if count else np.empty(0, dtype=np.int64)
+        ends = np.concatenate([starts[1:] - 1, [count - 1]]) if count else starts
+
+        # код -1 (пропущенное значение) указывает на добавленный в конец NaN
+        level_values = np.append(np.asarray(index.levels[level], dtype=object), np.nan)
+        labels = level_values[level_codes[starts]]
+
+        runs.append((starts, ends, labels.tolist()))
+
+    return runs
+
+
+def label_column(values):
+    """Колонка подписей: значения записываются строками, пустые подписи - пустыми ячейками"""
+    labels = [str(value) for value in values]
+    filled = np.array([label != '' for label in labels], dtype=bool)
+
+    return Column('write_string', labels, None if filled.all() else filled)
+
+
+def merged_labels(starts, ends, labels):
+    """Подписи серий уровня: подписи объединений записываются строками, отдельные ячейки - как есть"""
+    return [str(label) if merged else label for label, merged in zip(labels, (starts != ends).tolist())]
+
+
+def write_span(worksheet, span, cell_format):
+    """Записывает ячейку или объединение ячеек (first_row, first_col, last_row, last_col, value)"""
+    first_row, first_col, last_row, last_col, value = span
+
+    if first_row == last_row and first_col == last_col:
+        worksheet.write(first_row, first_col, value, cell_format)
+    else:
+        worksheet.merge_range(first_row, first_col, last_row, last_col, value, cell_format)
+
+
+def write_span_row(worksheet, span, row, cell_format):
+    """Записывает часть ячейки или объединения, попадающую в строку row.
+
+    В режиме constant_memory xlsxwriter записывает строки строго по порядку,
+    а merge_range заполняет пустыми ячейками сразу все строки объединения.
+    Поэтому вертикальное объединение регистрируется в листе без записи ячеек (как и в merge_range,
+    с проверкой пересечений), а его ячейки записываются по мере перехода к очередной строке.
+    """
+    first_row, first_col, last_row, last_col, value = span
+
+    if first_row == last_row:
+        write_span(worksheet, span, cell_format)
+        return
+
+    if row == first_row:
+        # объединения за пределами листа не записываются, как и в merge_range
+        if inside_sheet(last_row, last_col):
+            register_merges(worksheet, [[first_row, first_col, last_row, last_col]])
+
+        worksheet.write(row, first_col, value, cell_format)
+        blank_cols = range(first_col + 1, last_col + 1)
+    else:
+        blank_cols = range(first_col, last_col + 1)
+
+    for col in blank_cols:
+        worksheet.write_blank(row, col, None, cell_format)
+
 
 class TableHeader:
     def __init__(self, index, columns):
@@ -13,7 +107,7 @@ class TableHeader:
         # Например, для
         # location     Moscow                          Krasnoyarsk
         # stats        Population     Young       Old  Population     Young       Old
-        # mapping будет иметь вид
+        # mapping будет иметь вид (CellLine для каждого уровня)
         # [
         #   [[0, 1], [0, 4]
         # ], [
@@ -21,47 +115,85 @@ class TableHeader:
         # ]
         self._cell_mapping = []
 
+        # ячейки и объединения заголовка: названия индексов, затем уровни колонок
+        self._plan = MergePlan()
+        self._spans = None
+
+        self._row = None
+        self._rows_count = 0
+
     @property
     def cell_mapping(self):
         return self._cell_mapping
 
-    def write(self, worksheet, cursor, cell_format):
+    @property
+    def spans(self):
+        """Ячейки и объединения заголовка: (first_row, first_col, last_row, last_col, value)"""
+        if self._spans is None:
+            self._spans = self._plan.spans()
+
+        return self._spans
+
+    def plan(self, cursor):
+        """Рассчитывает ячейки и mapping заголовка без записи в worksheet"""
+        self._row = cursor.row
+
         if isinstance(self._columns, pd.MultiIndex):
-            self._write_multi_header(worksheet, cursor, cell_format)
+            self._plan_multi_header(cursor)
         else:
-            self._write_flat_header(worksheet, cursor, cell_format)
+            self._plan_flat_header(cursor)
+
+        self._rows_count = cursor.row - self._row
+
+    def write(self, worksheet, cursor, cell_format, columns=True):
+        """columns=False - для одноуровневого заголовка записываются только названия индексов"""
+        self.plan(cursor)
+
+        plan = self._plan if columns else self._plan.head(len(self._index.names))
+        plan.write(worksheet, cell_format)
+
+    def counters(self):
+        """Количество ячеек и объединений заголовка"""
+        return self._plan.counters()
+
+    def iter_rows(self, worksheet, cell_format):
+        """Генератор построчной записи: объявляет номер очередной строки и записывает ее при следующем шаге"""
+        for row in range(self._row, self._row + self._rows_count):
+            yield row
 
-    def _write_flat_header(self, worksheet, cursor, cell_format):
-        """Записывает одноуровневые заголовок"""
+            for span in self.spans:
+                if span[0] <= row <= span[2]:
+                    write_span_row(worksheet, span, row, cell_format)
+
+    def _plan_flat_header(self, cursor):
+        """Рассчитывает одноуровневые заголовок"""
 
         # Записываются сначала заголовки индексов
         col_index = cursor.col
-        for name in self._index.names:
-            worksheet.write(cursor.row, col_index, name, cell_format)
-            col_index += 1
+        names_cols = np.arange(col_index, col_index + len(self._index.names))
+        self._plan.add(cursor.row, names_cols, cursor.row, names_cols, self._index.names)
+        col_index += len(self._index.names)
 
         # Затем заголовки данных
-        self._cell_mapping.append([])
-        for name in list(self._columns):
-            worksheet.write(cursor.row, col_index, u'%s' % name, cell_format)
-            self._cell_mapping[0].append([cursor.row, col_index])
-            col_index += 1
+        self._cell_mapping = [CellLine(cursor.row, range(col_index, col_index + len(self._columns)))]
+        columns_cols = np.arange(col_index, col_index + len(self._columns))
+        self._plan.add(cursor.row, columns_cols, cursor.row, columns_cols, [u'%s' % name for name in self._columns])
 
         # К исходному курсору прибавляется одна строка
         cursor.row += 1
 
-    def _write_multi_header(self, worksheet, cursor, cell_format):
-        """Записывает многоуровневые заголовок"""
+    def _plan_multi_header(self, cursor):
+        """Рассчитывает многоуровневые заголовок"""
         levels_count = len(self._columns.levels)
 
-        self._cell_mapping = [[] for _ in range(0, levels_count)]
+        self._cell_mapping = []
 
         row_index = cursor.row
         col_index = cursor.col
 
-        for name in self._index.names:
-            worksheet.merge_range(row_index, col_index, row_index + (levels_count - 1), col_index, name, cell_format)
-            col_index += 1
+        names_cols = np.arange(col_index, col_index + len(self._index.names))
+        self._plan.add(row_index, names_cols, row_index + (levels_count - 1), names_cols, self._index.names)
+        col_index += len(self._index.names)
 
         # Многоуровневые заголовки (pd.MultiIndex) можно представить как коллекцию комбинаций возможных уровней:
         #
@@ -70,34 +202,20 @@ class TableHeader:
         #              ['Population', 'Young', 'Old']],
         #             names=['location', 'stats'])
         #
-        # header.get_values()
-        # [('Moscow', 'Population') ('Moscow', 'Young') ('Moscow', 'Old')
-        #  ('Krasnoyarsk', 'Population') ('Krasnoyarsk', 'Young')
-        #  ('Krasnoyarsk', 'Old')]
+        # header.codes
+        # [[0 0 0 1 1 1]
+        #  [0 1 2 0 1 2]]
         #
-        # Индексы каждой комбинации отражают уровень вложенности заголовка.
-        # Из нашего примера ('Moscow', 'Population') ('Moscow', 'Young'):
+        # Каждая строка codes отражает уровень вложенности заголовка:
         # Moscow соответствует уровню 0, Population и Young - уровню 1.
         #
-        # Итерации с группировкой позволяют посчитать сколько подуровней соответствует каждому родительскому уровню,
+        # Серии одинаковых подряд идущих кодов (с учетом родительских уровней) позволяют посчитать
+        # сколько подуровней соответствует каждому родительскому уровню,
         # что дает возможность выполнить объединение ячеек с заголовком в таблице excel
-        values = self._columns.get_values()
-        for level in range(0, levels_count):
-            current_col_index = col_index
-            for level_tree, group in groupby(values, lambda col: col[:level + 1]):
-                group_count = len(list(group))
-                current_row_col_index_end = current_col_index + (group_count - 1)
+        for starts, ends, labels in level_runs(self._columns):
+            self._plan.add(row_index, starts + col_index, row_index, ends + col_index, merged_labels(starts, ends, labels))
 
-                level_name = level_tree[level]
-                if current_col_index == current_row_col_index_end:
-                    worksheet.write(row_index, current_col_index, level_name, cell_format)
-                else:
-                    worksheet.merge_range(row_index, current_col_index, row_index, current_row_col_index_end,
-                                          str(level_name), cell_format)
-
-                self._cell_mapping[level].append([row_index, current_col_index])
-
-                current_col_index = current_row_col_index_end + 1
+            self._cell_mapping.append(CellLine(row_index, positions(starts + col_index)))
 
             # К индексу строки прибавляется одна строка на каждый уровень
             row_index += 1
@@ -111,52 +229,102 @@ class TableIndex:
 
         self._cell_mapping = []
 
+        # для многоуровневого индекса - ячейки и объединения каждого уровня
+        self._flat = False
+        self._levels = []
+
+        self._row = None
+        self._col = None
+
     @property
     def cell_mapping(self):
         return self._cell_mapping
 
-    def write(self, worksheet, cursor, cell_format):
+    def plan(self, cursor):
+        """Рассчитывает ячейки и mapping индекса без записи в worksheet"""
+        self._row = cursor.row
+        self._col = cursor.col
+
         if isinstance(self._index, pd.MultiIndex):
-            self.__write_multi_index(worksheet, cursor, cell_format)
+            self.__plan_multi_index(cursor)
         else:
-            self.__write_flat_index(worksheet, cursor, cell_format)
+            self.__plan_flat_index(cursor)
 
-    def __write_flat_index(self, worksheet, cursor, cell_format):
-        row_index = cursor.row
+    def write(self, worksheet, cursor, cell_format):
+        self.plan(cursor)
 
-        self._cell_mapping.append([])
-        for name in self._index:
-            worksheet.write(row_index, cursor.col, str(name), cell_format)
-            self._cell_mapping[0].append([row_index, cursor.col])
-            row_index += 1
+        if self._flat:
+            self._labels(0, len(self._index)).write(worksheet, self._row, self._col, cell_format)
+
+        for level in self._levels:
+            level.write(worksheet, cell_format)
+
+    def counters(self):
+        """Количество ячеек и объединений индекса"""
+        cells, merges = (len(self._index), 0) if self._flat else (0, 0)
+        for level in self._levels:
+            level_cells, level_merges = level.counters()
+            cells += level_cells
+            merges += level_merges
+
+        return cells, merges
+
+    def iter_rows(self, worksheet, cell_format):
+        """Генератор построчной записи: объявляет номер очередной строки и записывает ее при следующем шаге"""
+        # для каждого уровня хранится номер текущего объединения
+        levels = [level.spans() for level in self._levels]
+        current = [0] * len(levels)
+
+        labels = None
+        for i in range(0, len(self._index)):
+            row = self._row + i
+            yield row
+
+            if self._flat:
+                # подписи одноуровневого индекса готовятся блоками, как и данные
+                if i % STREAM_BLOCK_ROWS == 0:
+                    labels = self._labels(i, i + STREAM_BLOCK_ROWS)
+
+                labels.write_cell(worksheet, row, self._col, i % STREAM_BLOCK_ROWS, cell_format)
+
+            for level, spans in enumerate(levels):
+                span = spans[current[level]]
+                write_span_row(worksheet, span, row, cell_format)
+
+                if row == span[2]:
+                    current[level] += 1
+
+    def _labels(self, start, stop):
+        """Колонка подписей одноуровневого индекса для строк с start по stop"""
+        labels = self._index[start:stop]
+        if pd.api.types.is_object_dtype(labels.dtype) and not is_string_values(labels):
+            # в индексе смешанных типов factorize считает равными True и 1, такие подписи не интернируются
+            return label_column(labels)
+
+        # подписи повторяющихся значений индекса конвертируются в строку один раз
+        codes, uniques = pd.factorize(labels, use_na_sentinel=False)
+        return interned_column(codes, uniques, label_column)
+
+    def __plan_flat_index(self, cursor):
+        self._flat = True
+        self._cell_mapping = [CellLine(cursor.col, range(cursor.row, cursor.row + len(self._index)), horizontal=False)]
 
         cursor.col += 1
 
-    def __write_multi_index(self, worksheet, cursor, cell_format):
+    def __plan_multi_index(self, cursor):
         levels_count = len(self._index.levels)
 
-        self._cell_mapping = [[] for _ in range(0, levels_count)]  # create shape levels
+        self._cell_mapping = []
 
         row_index = cursor.row
         col_index = cursor.col
 
-        values = self._index.get_values()
-        for level in range(0, levels_count):
-            current_row_index = row_index
-            for level_tree, group in groupby(values, lambda col: col[:level + 1]):
-                group_count = len(list(group))
-                current_row_index_end = current_row_index + (group_count - 1)
+        for starts, ends, labels in level_runs(self._index):
+            level = MergePlan()
+            level.add(starts + row_index, col_index, ends + row_index, col_index, merged_labels(starts, ends, labels))
 
-                level_name = level_tree[level]
-                if current_row_index == current_row_index_end:
-                    worksheet.write(current_row_index, col_index, level_name, cell_format)
-                else:
-                    worksheet.merge_range(current_row_index, col_index, current_row_index_end, col_index,
-                                          str(level_name), cell_format)
-
-                self._cell_mapping[level].append([current_row_index, col_index])
-
-                current_row_index = current_row_index_end + 1
+            self._levels.append(level)
+            self._cell_mapping.append(CellLine(col_index, positions(starts + row_index), horizontal=False))
 
             col_index += 1
 
@@ -164,33 +332,115 @@ class TableIndex:
 
 
 class TableData:
-    def __init__(self, df):
+    def __init__(self, df, columns_format=None, sparse=False):
         self._df = df
 
+        # форматы колонок по позициям, None - используется общий формат данных
+        self._columns_format = columns_format
+
+        # пустые ячейки (NaN, None, NaT) не записываются
+        self._sparse = sparse
+
         self._cell_mapping = []
 
+        self._row = None
+        self._col = None
+
     @property
     def cell_mapping(self):
         return self._cell_mapping
 
+    def plan(self, cursor):
+        """Рассчитывает mapping данных без записи в worksheet"""
+        self._row = cursor.row
+        self._col = cursor.col
+
+        rows_count = len(self._df.index)
+        cols_count = len(self._df.columns)
+
+        self._cell_mapping = CellGrid(cursor.row, cursor.col, rows_count, cols_count)
+
+        cursor.row += rows_count
+        cursor.col += cols_count
+
     def write(self, worksheet, cursor, cell_format):
-        row_index = cursor.row
+        self.plan(cursor)
 
-        for row in self._df.itertuples():
-            current_col_index = cursor.col
-            mapping_row = []
-            for col in row[1:]:  # row[1:] data without indexes
-                worksheet.write(row_index, current_col_index, col, cell_format)
-                mapping_row.append([row_index, current_col_index])
+        # Данные записываются по колонкам: тип каждой колонки определяется один раз,
+        # а значения конвертируются целиком средствами NumPy
+        dates_1904 = date_1904(worksheet)
+        for position, (_, series) in enumerate(self._df.items()):
+            column = prepare_column(series, dates_1904)
+            column.write(worksheet, self._row, self._col + position, self._column_format(position, cell_format),
+                         blanks=not self._sparse)
 
-                current_col_index += 1
+    def iter_rows(self, worksheet, cell_format):
+        """Генератор построчной записи: объявляет номер очередной строки и записывает ее при следующем шаге.
 
-            self._cell_mapping.append(mapping_row)
+        Колонки конвертируются блоками по STREAM_BLOCK_ROWS строк, чтобы память не зависела от размера таблицы.
+        """
+        dates_1904 = date_1904(worksheet)
+        for block_start in range(0, len(self._df.index), STREAM_BLOCK_ROWS):
+            block = self._df.iloc[block_start:block_start + STREAM_BLOCK_ROWS]
+            columns = [prepare_column(series, dates_1904) for _, series in block.items()]
+            formats = [self._column_format(position, cell_format) for position in range(0, len(columns))]
 
-            row_index += 1
+            if getattr(type(worksheet), 'renders_columns', False):
+                # Writer, умеющий рендерить колонки целиком (pandex.native.NativeWriter)
+                rendered = [
+                    worksheet.render_column(column, self._row + block_start, self._col + position, formats[position],
+                                            blanks=not self._sparse)
+                    for position, column in enumerate(columns)
+                ]
+
+                if all(cells is not None for cells in rendered):
+                    for i, row_cells in enumerate(zip(*rendered)):
+                        row = self._row + block_start + i
+                        yield row
+
+                        worksheet.write_cells(row, self._col, row_cells)
+
+                    continue
+
+            for i in range(0, len(block.index)):
+                row = self._row + block_start + i
+                yield row
+
+                for position, column in enumerate(columns):
+                    column.write_cell(worksheet, row, self._col + position, i, formats[position], blanks=not self._sparse)
+
+    def counters(self):
+        """Количество ячеек данных и объединений (объединений в данных нет)"""
+        return self._df.size, 0
+
+    def _column_format(self, position, cell_format):
+        if self._columns_format is None or self._columns_format[position] is None:
+            return cell_format
 
-        cursor.row = row_index
-        cursor.col += len(self._df.columns)
+        return self._columns_format[position]
+
+
+class RowRecorder:
+    """Запоминает вызовы методов worksheet, чтобы выполнить их позже в порядке строк.
+
+    Используется при потоковой записи для пользовательских хуков вроде write_table_title:
+    первым аргументом каждого вызова должен быть номер строки.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        def record(row, *args, **kwargs):
+            self.calls.append((row, name, args, kwargs))
+
+        return record
+
+    def iter_rows(self, worksheet):
+        """Генератор построчной записи: объявляет номер очередной строки и записывает ее при следующем шаге"""
+        for row, name, args, kwargs in sorted(self.calls, key=lambda c: c[0]):
+            yield row
+            getattr(worksheet, name)(row, *args, **kwargs)
 
 
 class Table:
@@ -198,20 +448,84 @@ class Table:
     index_class = TableIndex
     data_class = TableData
 
+    # количество строк, которые занимает заголовок, записываемый write_table_title
+    title_rows = 0
+
     cells_format = {
         'index': {'align': 'left', 'valign': 'top', 'border': 1},
         'header': {'align': 'center', 'valign': 'vcenter', 'fg_color': '#D7E4BC', 'border': 6},
         'data': {'align': 'center', 'border': 1}
     }
 
-    def __init__(self, df, name=None):
+    # Форматы отдельных колонок данных, дополняющие cells_format['data'].
+    # Ключ - название колонки или вид dtype (float, int, bool, datetime, timedelta, category, object),
+    # название колонки имеет приоритет. Например: {'share': {'num_format': '0.0%'}, 'datetime': {'num_format': 'dd.mm.yyyy'}}
+    columns_format = {}
+
+    # Параметры worksheet.add_table, например {'style': 'Table Style Medium 9'}: таблица с одноуровневыми колонками
+    # записывается как таблица Excel со стилем и фильтрами, а ячейки данных - без формата cells_format['data'].
+    # MultiIndex в колонках, повторяющиеся названия колонок, пустые таблицы и потоковая запись
+    # записываются обычным способом. None - таблица Excel не создается.
+    excel_table = None
+
+    # Ширина колонок индекса и данных по содержимому ячеек и заголовка (оценивается по выборке строк),
+    # set_columns_width вызывается после и может ее переопределить
+    autosize = False
+
+    # Пустые ячейки данных (NaN, None, NaT) не записываются: для разреженных таблиц это сокращает
+    # количество ячеек в worksheet и размер файла. Без записи у пустых ячеек нет формата (рамок),
+    # sparse_columns_format = True назначает формат данных колонкам листа целиком через set_column.
+    sparse = False
+    sparse_columns_format = False
+
+    # Правила выделения ячеек данных (pandex.highlight: Threshold, TopN, ColorScale),
+    # записываются условным форматированием по диапазонам колонок, а не форматом каждой ячейки
+    highlight = ()
+
+    def __init__(self, df, name=None, columns_format=None, excel_table=None, autosize=None, sparse=None,
+                 sparse_columns_format=None, highlight=None):
         self._df = df
         self._name = name
 
+        if columns_format is not None:
+            self.columns_format = columns_format
+
+        if excel_table is not None:
+            self.excel_table = excel_table
+
+        if autosize is not None:
+            self.autosize = autosize
+
+        if sparse is not None:
+            self.sparse = sparse
+
+        if sparse_columns_format is not None:
+            self.sparse_columns_format = sparse_columns_format
+
+        if highlight is not None:
+            self.highlight = highlight
+
         self._header: TableHeader = None
         self._index: TableIndex = None
         self._data: TableData = None
 
+        self._format = None
+        self._title: RowRecorder = None
+
+    @classmethod
+    def from_arrow(cls, table, index_columns=None, **kwargs):
+        """Таблица из pyarrow.Table, RecordBatch или списка RecordBatch, читаемых по частям при записи"""
+        from .sources import ArrowFrame
+
+        return cls(ArrowFrame(table, index_columns), **kwargs)
+
+    @classmethod
+    def from_arrays(cls, arrays, index=None, **kwargs):
+        """Таблица из словаря {название колонки: одномерный массив NumPy}, в том числе memory-mapped"""
+        from .sources import ArrayFrame
+
+        return cls(ArrayFrame(arrays, index), **kwargs)
+
     @property
     def header(self):
         return self._header
@@ -224,24 +538,121 @@ class Table:
     def data(self):
         return self._data
 
+    def measure(self):
+        """Размер таблицы на листе, рассчитанный по размерам DataFrame без записи"""
+        return Size(
+            rows=self.title_rows + self._df.columns.nlevels + len(self._df.index),
+            cols=self._df.index.nlevels + len(self._df.columns)
+        )
+
     def write(self, workbook, worksheet, cursor):
-        xl_format = self._get_format(workbook)
+        element = self._name or type(self).__name__
+
+        excel_table = self._uses_excel_table()
+        first_col = cursor.col
+
+        with phase('table.format', element):
+            xl_format = self._get_format(workbook)
+            columns_format = self._get_columns_format(workbook, base={} if excel_table else None)
+
+        with phase('table.title', element):
+            self.write_table_title(cursor, worksheet, xl_format['header'])
+
+        with phase('table.header', element) as record:
+            self._header = self.header_class(self._df.index, self._df.columns)
+            # названия колонок таблицы Excel записывает add_table
+            self._header.write(worksheet, cursor, xl_format['header'], columns=not excel_table)
+            record.cells, record.merges = self._header.counters()
+
+        with phase('table.index', element) as record:
+            self._index = self.index_class(self._df.index)
+            self._index.write(worksheet, cursor, xl_format['index'])
+            record.cells, record.merges = self._index.counters()
+
+        with phase('table.data', element) as record:
+            self._data = self.data_class(self._df, columns_format=columns_format, sparse=self.sparse)
+            self._data.write(worksheet, cursor, None if excel_table else xl_format['data'])
+            record.cells, record.merges = self._data.counters()
+
+            if excel_table:
+                self._write_excel_table(worksheet, columns_format)
 
-        self.write_table_title(cursor, worksheet, xl_format['header'])
+        with phase('table.highlight', element):
+            self._write_highlight(workbook, worksheet)
+
+        with phase('table.columns_width', element):
+            self._set_columns(worksheet, first_col,
+                              self._sparse_formats(None if excel_table else xl_format['data'], columns_format))
+
+            self.set_columns_width(worksheet)
+
+        return cursor
+
+    @profiled('table.prepare')
+    def prepare(self, workbook, worksheet, cursor):
+        """Рассчитывает расположение таблицы без записи ячеек, для последующей записи через iter_rows"""
+        first_col = cursor.col
+
+        self._format = self._get_format(workbook)
+
+        self._title = RowRecorder()
+        self.write_table_title(cursor, self._title, self._format['header'])
 
         self._header = self.header_class(self._df.index, self._df.columns)
-        self._header.write(worksheet, cursor, xl_format['header'])
+        self._header.plan(cursor)
 
         self._index = self.index_class(self._df.index)
-        self._index.write(worksheet, cursor, xl_format['index'])
+        self._index.plan(cursor)
+
+        columns_format = self._get_columns_format(workbook)
+
+        self._data = self.data_class(self._df, columns_format=columns_format, sparse=self.sparse)
+        self._data.plan(cursor)
 
-        self._data = self.data_class(self._df)
-        self._data.write(worksheet, cursor, xl_format['data'])
+        # условное форматирование не зависит от ячеек и записывается вместе с разметкой
+        self._write_highlight(workbook, worksheet)
+
+        self._set_columns(worksheet, first_col, self._sparse_formats(self._format['data'], columns_format))
 
         self.set_columns_width(worksheet)
 
         return cursor
 
+    def iter_rows(self, worksheet):
+        """Генератор построчной записи подготовленной таблицы (см. prepare)"""
+        return merge_rows([
+            self._title.iter_rows(worksheet),
+            self._header.iter_rows(worksheet, self._format['header']),
+            self._index.iter_rows(worksheet, self._format['index']),
+            self._data.iter_rows(worksheet, self._format['data']),
+        ])
+
+    def cache_key(self):
+        """Ключ содержимого таблицы для pandex.cache.RenderCache: хеш данных, индекса, колонок и настроек класса.
+
+        None - таблица не кешируется. Дочерние классы, запись которых зависит от других атрибутов
+        (например, write_table_title), должны добавлять их в ключ.
+        """
+        df = self._df
+
+        try:
+            data_hash = pd.util.hash_pandas_object(df, index=True).to_numpy()
+            columns_hash = pd.util.hash_pandas_object(df.columns.to_frame(index=False), index=False).to_numpy()
+        except TypeError:
+            # нехешируемые значения (списки, словари) в ячейках
+            return None
+
+        key = hashlib.sha256()
+        key.update(pickle.dumps((
+            type(self).__module__, type(self).__qualname__, self._name, self.title_rows,
+            self.cells_format, self.columns_format, self.sparse, self.sparse_columns_format, self.highlight,
+            [str(dtype) for dtype in df.dtypes], list(df.index.names), list(df.columns.names), df.shape
+        )))
+        key.update(data_hash.tobytes())
+        key.update(columns_hash.tobytes())
+
+        return key.hexdigest()
+
     def set_columns_width(self, worksheet):
         """Определяется в дочерник классах для настройки ширины конкретных колонок"""
         pass
@@ -251,8 +662,101 @@ class Table:
         pass
 
     def _get_format(self, workbook):
+        registry = get_format_registry(workbook)
+
         return {
-            'header': workbook.add_format(self.cells_format['header']),
-            'index': workbook.add_format(self.cells_format['index']),
-            'data': workbook.add_format(self.cells_format['data'])
+            'header': registry.get(self.cells_format['header']),
+            'index': registry.get(self.cells_format['index']),
+            'data': registry.get(self.cells_format['data'])
         }
+
+    def _get_columns_format(self, workbook, base=None):
+        """Форматы колонок данных по позициям: каждый формат определяется один раз на колонку.
+
+        base - свойства, которые дополняют форматы колонок, по умолчанию cells_format['data'].
+        """
+        if not self.columns_format:
+            return None
+
+        if base is None:
+            base = self.cells_format['data']
+
+        registry = get_format_registry(workbook)
+
+        columns_format = []
+        for name, dtype in self._df.dtypes.items():
+            properties = self.columns_format.get(name)
+            if properties is None:
+                properties = self.columns_format.get(dtype_kind(dtype))
+
+            if properties is None:
+                columns_format.append(None)
+            else:
+                columns_format.append(registry.get(dict(base, **properties)))
+
+        return columns_format
+
+    def _sparse_formats(self, data_format, columns_format):
+        """Форматы колонок данных для set_column в разреженном режиме; None - колонкам формат не назначается"""
+        if not (self.sparse and self.sparse_columns_format):
+            return None
+
+        if columns_format is None:
+            return [data_format] * len(self._df.columns)
+
+        return [data_format if cell_format is None else cell_format for cell_format in columns_format]
+
+    def _set_columns(self, worksheet, first_col, formats=None, df=None):
+        """Ширина колонок (при autosize) и форматы колонок данных одним вызовом set_column на колонку.
+
+        Ширина оценивается по содержимому индекса, заголовка и данных df (по умолчанию - данных таблицы).
+        """
+        if not self.autosize and formats is None:
+            return
+
+        widths = [None] * (self._df.index.nlevels + len(self._df.columns))
+        if self.autosize:
+            widths = table_widths(self._df if df is None else df, self._header.spans, first_col).tolist()
+
+        formats = [None] * self._df.index.nlevels + (formats or [None] * len(self._df.columns))
+
+        for col, width, cell_format in zip(itertools.count(first_col), widths, formats):
+            if cell_format is not None:
+                worksheet.set_column(col, col, width, cell_format)
+            elif width is not None:
+                worksheet.set_column(col, col, width)
+
+    def _write_highlight(self, workbook, worksheet):
+        """Записывает правила выделения по границам данных таблицы"""
+        if not self.highlight:
+            return
+
+        bounds = self._data.cell_mapping.bounds()
+        if bounds[0] > bounds[2] or bounds[1] > bounds[3]:
+            # пустая таблица
+            return
+
+        for rule in self.highlight:
+            rule.apply(workbook, worksheet, bounds, self._df.columns)
+
+    def _uses_excel_table(self):
+        if self.excel_table is None or isinstance(self._df.columns, pd.MultiIndex) or self._df.empty:
+            return False
+
+        # Excel требует уникальных без учета регистра названий колонок таблицы
+        names = [str(name).lower() for name in self._df.columns]
+        return len(set(names)) == len(names)
+
+    def _write_excel_table(self, worksheet, columns_format):
+        """Создает таблицу Excel над заголовком и данными; ячейки данных уже записаны без общего формата"""
+        first_row, first_col, last_row, last_col = self._data.cell_mapping.bounds()
+
+        columns = []
+        for position, name in enumerate(self._df.columns):
+            column = {'header': str(name)}
+            if columns_format is not None and columns_format[position] is not None:
+                column['format'] = columns_format[position]
+
+            columns.append(column)
+
+        worksheet.add_table(first_row - 1, first_col, last_row, last_col, dict(self.excel_table, columns=columns))
@@ -0,0 +1,69 @@
+import asyncio
+import io
+import zipfile
+from unittest import IsolatedAsyncioTestCase
+
+import numpy as np
+import pandas as pd
+
+from pandex import Table, LineChart, Side
+from pandex.aio import AsyncWorkbook
+
+
+class BufferWriter:
+    """Writer с корутиной write, как aiohttp.web.StreamResponse"""
+
+    def __init__(self):
+        self.buffer = io.BytesIO()
+        self.writes = 0
+
+    async def write(self, data):
+        self.buffer.write(data)
+        self.writes += 1
+
+
+class AsyncWorkbookTestCase(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.df = pd.DataFrame(np.random.randn(30, 3), index=['r%d' % i for i in range(0, 30)], columns=['a', 'b', 'c'])
+
+    async def test_report(self):
+        report = AsyncWorkbook()
+
+        sheet = report.add_sheet('Report', streaming=True)
+        group = sheet.create_shape()
+
+        table = Table(self.df)
+        await group.add(table)
+        await group.add(Table(self.df), side=Side.BOTTOM)
+
+        await sheet.flush(step_rows=7)
+
+        await report.add_sheet('Chart').create_shape().add(LineChart('Chart', table, [0]))
+        await report.close()
+
+        writer = BufferWriter()
+        await report.write_to(writer, chunk_size=1024)
+
+        self.assertGreater(writer.writes, 1)
+        with zipfile.ZipFile(writer.buffer) as package:
+            sheet_xml = package.read('xl/worksheets/sheet1.xml').decode()
+
+        self.assertIn('<dimension ref="A1:D62"/>', sheet_xml)
+        self.assertIn('xl/charts/chart1.xml', package.namelist())
+
+    async def test_cancel(self):
+        report = AsyncWorkbook()
+        sheet = report.add_sheet('Report', streaming=True)
+
+        group = sheet.create_shape()
+        await group.add(Table(pd.DataFrame(np.random.randn(20000, 3))))
+
+        task = asyncio.ensure_future(sheet.flush(step_rows=100))
+        await asyncio.sleep(0)
+        task.cancel()
+
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+
+        with self.assertRaises(RuntimeError):
+            await group.add(Table(self.df))
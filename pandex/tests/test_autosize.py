@@ -0,0 +1,47 @@
+from unittest import TestCase
+from unittest.mock import Mock
+
+import numpy as np
+import pandas as pd
+
+from pandex import Table
+from pandex.autosize import number_lengths, spans_lengths, text_length
+from pandex.sheet import Cursor
+
+
+class AutosizeTestCase(TestCase):
+    def test_number_lengths(self):
+        values = np.array([
+            [1.0, -12.5, 0.125, np.nan],
+            [100.0, 3.0, 1 / 3, np.inf],
+        ])
+
+        self.assertListEqual([3, 5, 11, 1], number_lengths(values).tolist())
+
+    def test_text_length(self):
+        self.assertEqual(6, text_length(pd.Series(['ab', None, 'abcdef'])))
+        self.assertEqual(3, text_length(pd.Series(pd.Categorical(['abc', 'a'], categories=['abc', 'a', 'unused']))))
+        self.assertEqual(10, text_length(pd.Series(pd.to_datetime(['2020-01-01', None]))))
+        self.assertEqual(0, text_length(pd.Series([None, None], dtype=object)))
+
+    def test_spans_lengths(self):
+        spans = [(0, 1, 0, 3, 'x' * 12), (1, 1, 1, 1, 'abcdef'), (0, 0, 1, 0, None)]
+
+        self.assertListEqual([0, 6, 4, 4], spans_lengths(spans, 0, 4).tolist())
+
+    def test_table(self):
+        columns = pd.MultiIndex.from_tuples([('Population of the city', 'a'), ('Population of the city', 'b')])
+        df = pd.DataFrame([[1, 'x'], [22, 'yyyyyyyyyyyy']], index=['r', 'long row name'], columns=columns)
+
+        worksheet = Mock(merged_cells={}, table_cells={})
+        Table(df, autosize=True).write(Mock(), worksheet, Cursor(0, 1))
+
+        self.assertListEqual(
+            [(1, 1, 15.0), (2, 2, 13.0), (3, 3, 14.0)],
+            [c.args for c in worksheet.set_column.mock_calls]
+        )
+
+        worksheet = Mock(merged_cells={}, table_cells={})
+        Table(df).write(Mock(), worksheet, Cursor())
+
+        self.assertFalse(worksheet.set_column.called)
@@ -0,0 +1,130 @@
+import io
+import os
+import tempfile
+import zipfile
+from unittest import TestCase
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+import xlsxwriter
+
+from pandex import ChartFactory, Sheet, Table
+from pandex.cache import RenderCache, sheet_key
+from pandex.sheet import Size
+from pandex.workbook import RenderedSheet, SheetSpec, render_workbook
+
+
+class Note:
+    """Элемент, записывающий ячейку через xlsxwriter"""
+
+    def measure(self):
+        return Size(rows=1, cols=1)
+
+    def write(self, workbook, worksheet, cursor):
+        worksheet.write(cursor.row, cursor.col, 'note')
+
+
+class RenderCacheTestCase(TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.directory = self._directory.name
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_get_put(self):
+        cache = RenderCache(os.path.join(self.directory, 'cache'))
+
+        self.assertIsNone(cache.get('a'))
+
+        cache.put('a', RenderedSheet(b'<row r="1"/>', [[0, 0, 1, 0]], [(0, 0)], {1: {'bold': True}}, ([], (1, 1))))
+        rendered = cache.get('a')
+
+        self.assertEqual(b'<row r="1"/>', rendered.sheet_data)
+        self.assertEqual({1: {'bold': True}}, rendered.formats)
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+
+    def test_evict(self):
+        cache = RenderCache(self.directory, max_bytes=10000)
+
+        for position, key in enumerate(['a', 'b', 'c']):
+            cache.put(key, RenderedSheet(b'x' * 1000, [], [], {}, ([], (0, 0))))
+            os.utime(os.path.join(self.directory, key + '.sheet'), (position, position))
+
+        # 'a' использован последним и не вытесняется
+        os.utime(os.path.join(self.directory, 'a.sheet'), (10, 10))
+
+        cache.max_bytes = 2500
+        cache.evict()
+
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('c'))
+
+    def test_render_workbook(self):
+        frames = {
+            'First': pd.DataFrame(np.arange(9).reshape(3, 3), columns=['a', 'b', 'c']),
+            'Second': pd.DataFrame(np.arange(4.).reshape(2, 2), columns=['a', 'b']),
+        }
+
+        def build(sheet):
+            sheet.create_shape().add(Table(frames[sheet.worksheet.name]))
+
+        specs = [SheetSpec('First', build), SheetSpec('Second', build)]
+        cache = RenderCache(os.path.join(self.directory, 'cache'))
+
+        def render():
+            filename = os.path.join(self.directory, 'test.xlsx')
+            render_workbook(filename, specs, processes=1, cache=cache)
+
+            with zipfile.ZipFile(filename) as package:
+                return {name: package.read(name) for name in package.namelist() if name.startswith('xl/worksheets')}
+
+        first = render()
+        self.assertEqual((0, 2), (cache.hits, cache.misses))
+
+        self.assertEqual(first, render())
+        self.assertEqual((2, 2), (cache.hits, cache.misses))
+
+        frames['Second'] = frames['Second'] * 2
+        changed = render()
+        self.assertEqual((3, 3), (cache.hits, cache.misses))
+        self.assertEqual(first['xl/worksheets/sheet1.xml'], changed['xl/worksheets/sheet1.xml'])
+        self.assertIn(b'<v>6</v>', changed['xl/worksheets/sheet2.xml'])
+
+    def test_incompatible_entry(self):
+        cache = RenderCache(self.directory)
+
+        # листы, сохраненные прежними версиями классов
+        entries = {'a': b'cpandex.workbook\nMissingSheet\n.', 'b': b'cpandex_old.workbook\nRenderedSheet\n.'}
+        for key, data in entries.items():
+            with open(os.path.join(self.directory, key + '.sheet'), 'wb') as fh:
+                fh.write(data)
+
+        self.assertIsNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual((0, 2), (cache.hits, cache.misses))
+
+    def test_sheet_key(self):
+        df = pd.DataFrame(np.arange(9).reshape(3, 3), columns=['a', 'b', 'c'])
+        workbook = xlsxwriter.Workbook(io.BytesIO())
+
+        def key(*elements):
+            sheet = Sheet(workbook, None, streaming=True, record_placements=True)
+            for element in elements:
+                sheet.create_shape().add(element)
+
+            return sheet_key(sheet)
+
+        table = Table(df)
+        factory = ChartFactory()
+        self.assertEqual(key(table), key(table, factory.columns_chart('Chart', table)))
+
+        # элементы без cache_key записывают ячейки, которые не входят в ключ
+        self.assertIsNone(key(table, Note()))
+
+        current = key(table)
+        with patch('pandex.cache.__version__', '0.0.0'):
+            self.assertNotEqual(current, key(table))
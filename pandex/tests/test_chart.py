@@ -0,0 +1,92 @@
+from unittest import TestCase
+from unittest.mock import Mock
+
+import numpy as np
+import pandas as pd
+
+from pandex import Sheet, Table, Side, LineChart, ChartFactory, ChartTemplate
+from pandex.chart import Unit
+from pandex.profiling import Profiler
+
+
+class ChartFactoryTestCase(TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame(np.random.randn(3, 4), index=['1', '2', '3'], columns=['a', 'b', 'c', 'd'])
+
+        self.workbook = Mock()
+        self.workbook.add_worksheet.return_value.get_name.return_value = 'Test'
+
+        self.sheet = Sheet(self.workbook, 'Test')
+        self.table = Table(self.df)
+        self.sheet.create_shape().add(self.table)
+
+    def _series(self):
+        return [c.args[0] for c in self.workbook.add_chart.return_value.add_series.mock_calls]
+
+    def test_rows_chart(self):
+        group = self.sheet.create_shape(side=Side.BOTTOM)
+        group.add(LineChart('Line', self.table, [0, 2], skip_columns=1))
+        expected = self._series()
+
+        self.workbook.add_chart.reset_mock()
+        group.add(ChartFactory().rows_chart('Line', self.table, [0, 2], skip_columns=1))
+
+        self.assertListEqual(expected, self._series())
+        self.assertEqual(
+            {'name': ['Test', 3, 0], 'categories': ['Test', 0, 2, 0, 4], 'values': ['Test', 3, 2, 3, 4]},
+            self._series()[1]
+        )
+
+    def test_columns_chart(self):
+        template = ChartTemplate('bar', rows=10, cols=3, colors=['red', 'blue'])
+
+        group = self.sheet.create_shape(side=Side.BOTTOM)
+        group.add(ChartFactory().columns_chart('Bars', self.table, [0, -1], template=template))
+
+        self.workbook.add_chart.assert_called_once_with({'type': 'bar'})
+        self.assertEqual([
+            {'name': ['Test', 0, 1], 'categories': ['Test', 1, 0, 3, 0], 'values': ['Test', 1, 1, 3, 1],
+             'fill': {'color': 'red'}},
+            {'name': ['Test', 0, 4], 'categories': ['Test', 1, 0, 3, 0], 'values': ['Test', 1, 4, 3, 4],
+             'fill': {'color': 'blue'}},
+        ], self._series())
+        self.assertEqual(10, group.get_cursors()[1].row - 4)
+
+    def test_columns_chart_unit(self):
+        group = self.sheet.create_shape(side=Side.BOTTOM)
+        factory = ChartFactory()
+
+        # оформление по умолчанию повторяет ColumnChart
+        for unit, subtype in ((Unit.PERCENT, 'percent_stacked'), (Unit.PIECE, 'stacked')):
+            self.workbook.add_chart.reset_mock()
+            group.add(factory.columns_chart('Bars', self.table, unit=unit), side=Side.BOTTOM)
+
+            self.workbook.add_chart.assert_called_once_with({'type': 'column', 'subtype': subtype})
+            self.workbook.add_chart.return_value.show_hidden_data.assert_called_once_with()
+
+    def test_rewritten_table(self):
+        factory = ChartFactory()
+        group = self.sheet.create_shape(side=Side.BOTTOM)
+        group.add(factory.rows_chart('Before', self.table, [0]), side=Side.BOTTOM)
+
+        # та же таблица записана ниже: новые графики ссылаются на ее новые ячейки
+        group.add(self.table, side=Side.BOTTOM)
+        self.workbook.add_chart.reset_mock()
+        group.add(factory.rows_chart('After', self.table, [0]), side=Side.BOTTOM)
+
+        self.assertEqual(['Test', 19, 1, 19, 4], self._series()[0]['values'])
+
+    def test_shared_references(self):
+        factory = ChartFactory()
+        group = self.sheet.create_shape(side=Side.BOTTOM)
+
+        with Profiler() as profiler:
+            for i in range(0, 3):
+                group.add(factory.rows_chart('Chart %s' % i, self.table, [0, 1]), side=Side.BOTTOM)
+
+        references = factory.references(self.table, 'Test')
+        self.assertIs(references.row_series(0), references.row_series(0))
+
+        report = profiler.report(by_element=True)
+        self.assertEqual(2, report[('chart.write', 'Chart 1')]['cells'])
+        self.assertEqual(3, len([key for key in report if key[0] == 'chart.write']))
@@ -0,0 +1,104 @@
+from unittest import TestCase
+from unittest.mock import Mock
+
+import numpy as np
+import pandas as pd
+
+from pandex import ChartFactory, ChunkedTable, LineChart, Sheet, Side, Table
+from pandex.sheet import Cursor
+
+
+class ChunkedTableTestCase(TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame(
+            np.arange(21.).reshape(7, 3),
+            index=['r%d' % i for i in range(0, 7)],
+            columns=['a', 'b', 'c']
+        )
+
+        self.workbook = Mock()
+
+    def _chunks(self, df, size=3):
+        return (df.iloc[start:start + size] for start in range(0, len(df.index), size))
+
+    def test_write(self):
+        worksheet = Mock(merged_cells={}, table_cells={})
+        table = ChunkedTable(self._chunks(self.df))
+        cursor = table.write(self.workbook, worksheet, Cursor(1, 2))
+
+        expected_worksheet = Mock(merged_cells={}, table_cells={})
+        expected = Table(self.df)
+        expected.write(self.workbook, expected_worksheet, Cursor(1, 2))
+
+        self.assertListEqual(sorted(map(str, expected_worksheet.method_calls)), sorted(map(str, worksheet.method_calls)))
+
+        self.assertEqual(9, cursor.row)
+        self.assertEqual(6, cursor.col)
+        self.assertEqual([2, 3, 8, 5], table.data.cell_mapping.bounds())
+        self.assertEqual(expected.index.cell_mapping[0].tolist(), table.index.cell_mapping[0].tolist())
+        self.assertEqual(expected.header.cell_mapping[0].tolist(), table.header.cell_mapping[0].tolist())
+
+    def test_multi_index(self):
+        df = self.df.set_index(pd.MultiIndex.from_arrays([list('aaaabbb'), self.df.index]))
+
+        table = ChunkedTable(self._chunks(df))
+        table.write(self.workbook, Mock(merged_cells={}, table_cells={}), Cursor())
+
+        # объединение первого уровня разделено границей чанков
+        self.assertListEqual([[1, 0], [4, 0], [5, 0], [7, 0]], table.index.cell_mapping[0].tolist())
+        self.assertEqual(7, len(table.index.cell_mapping[1]))
+
+    def test_rows(self):
+        with self.assertRaises(ValueError):
+            ChunkedTable(self._chunks(self.df)).measure()
+
+        self.assertEqual((8, 4), ChunkedTable(self._chunks(self.df), rows=7).measure())
+
+        with self.assertRaises(ValueError):
+            ChunkedTable(self._chunks(self.df), rows=5).write(self.workbook, Mock(merged_cells={}, table_cells={}), Cursor())
+
+        with self.assertRaises(ValueError):
+            ChunkedTable(iter([self.df, self.df[['a', 'b']]])).write(self.workbook, Mock(merged_cells={}, table_cells={}), Cursor())
+
+    def test_streaming(self):
+        sheet = Sheet(self.workbook, 'Test', streaming=True)
+
+        group = sheet.create_shape()
+        table = ChunkedTable(self._chunks(self.df), rows=7)
+        group.add(table)
+        group.add(Table(self.df), side=Side.BOTTOM)
+
+        # mapping данных известен до чтения чанков
+        self.assertEqual([1, 1, 7, 3], table.data.cell_mapping.bounds())
+        self.assertEqual(16, sheet.cursor.row)
+
+        sheet.flush()
+
+        worksheet = self.workbook.add_worksheet.return_value
+        rows = [c[1][0] for c in worksheet.method_calls if c[0].startswith('write')]
+        self.assertEqual(2 * 32, len(rows))
+        self.assertListEqual(sorted(rows), rows)
+        self.assertEqual(7, len(table.index.cell_mapping[0]))
+
+    def _chart_series(self, table, streaming):
+        workbook = Mock()
+        workbook.add_worksheet.return_value = Mock(merged_cells={}, table_cells={})
+        workbook.add_worksheet.return_value.get_name.return_value = 'Test'
+
+        sheet = Sheet(workbook, 'Test', streaming=streaming)
+        group = sheet.create_shape()
+        group.add(table)
+        group.add(LineChart('Line', table, [0, -1]), side=Side.BOTTOM)
+        group.add(ChartFactory().rows_chart('Rows', table, [1]), side=Side.BOTTOM)
+        sheet.flush()
+
+        return [c[1] for c in workbook.add_chart.return_value.add_series.mock_calls]
+
+    def test_streaming_chart(self):
+        # графики, добавленные до flush, ссылаются на индекс и данные всех чанков
+        expected = self._chart_series(Table(self.df), streaming=False)
+        self.assertEqual(expected, self._chart_series(ChunkedTable(self._chunks(self.df), rows=7), streaming=True))
+
+        df = self.df.set_index(pd.MultiIndex.from_arrays([list('aaaabbb'), self.df.index]))
+        with self.assertRaises(ValueError):
+            self._chart_series(ChunkedTable(self._chunks(df), rows=7), streaming=True)
@@ -0,0 +1,103 @@
+from datetime import datetime
+from unittest import TestCase
+from unittest.mock import Mock, call
+
+import numpy as np
+import pandas as pd
+
+from pandex.columns import prepare_column
+
+
+class ColumnTestCase(TestCase):
+    def setUp(self):
+        self.worksheet = Mock()
+        self.cell_format = Mock()
+
+    def test_float_column(self):
+        column = prepare_column(pd.Series([1.5, np.nan, np.inf, 2.0]))
+        column.write(self.worksheet, 1, 2, self.cell_format)
+
+        self.worksheet.write_number.assert_has_calls([
+            call(1, 2, 1.5, self.cell_format),
+            call(4, 2, 2.0, self.cell_format),
+        ])
+        self.worksheet.write_blank.assert_has_calls([
+            call(2, 2, None, self.cell_format),
+            call(3, 2, None, self.cell_format),
+        ])
+
+    def test_int_column(self):
+        column = prepare_column(pd.Series([1, 2, 3]))
+
+        self.assertEqual('write_number', column.method)
+        self.assertListEqual([1, 2, 3], column.values)
+        self.assertIsNone(column.filled)
+
+    def test_string_column(self):
+        column = prepare_column(pd.Series(['a', None, 'c'], dtype=object))
+        column.write(self.worksheet, 0, 0, self.cell_format)
+
+        self.worksheet.write_string.assert_has_calls([
+            call(0, 0, 'a', self.cell_format),
+            call(2, 0, 'c', self.cell_format),
+        ])
+        self.worksheet.write_blank.assert_called_once_with(1, 0, None, self.cell_format)
+
+    def test_bool_column(self):
+        column = prepare_column(pd.Series([True, False]))
+
+        self.assertEqual('write_boolean', column.method)
+        self.assertListEqual([True, False], column.values)
+
+    def test_datetime_column(self):
+        column = prepare_column(pd.Series([datetime(1900, 1, 1), datetime(2020, 1, 1, 12), None]))
+
+        self.assertEqual('write_number', column.method)
+        self.assertEqual(1, column.values[0])
+        self.assertEqual(43831.5, column.values[1])
+        self.assertListEqual([True, True, False], column.filled.tolist())
+
+    def test_datetime_column_1904(self):
+        series = pd.Series([datetime(2020, 1, 1, 12), None])
+
+        column = prepare_column(series, date_1904=True)
+        self.assertEqual(42369.5, column.values[0])
+
+        column = prepare_column(series.astype('category'), date_1904=True)
+        self.assertEqual(42369.5, column.values[0])
+
+    def test_mixed_column(self):
+        column = prepare_column(pd.Series(['a', 1, datetime(2020, 1, 1)], dtype=object))
+
+        self.assertEqual('write', column.method)
+
+    def test_categorical_column(self):
+        column = prepare_column(pd.Series(pd.Categorical(['b', None, 'a', 'b'])))
+
+        self.assertEqual('write_string', column.method)
+        self.assertListEqual(['a', 'b'], column.categories)
+        self.assertListEqual([1, -1, 0, 1], column.codes.tolist())
+        self.assertListEqual(['b', None, 'a', 'b'], column.values)
+        self.assertListEqual([True, False, True, True], column.filled.tolist())
+        self.assertIs(column.values[0], column.values[3])
+
+    def test_low_cardinality_column(self):
+        column = prepare_column(pd.Series(['x', 'y'] * 1000, dtype=object))
+
+        self.assertEqual('write_string', column.method)
+        self.assertListEqual(['x', 'y'], column.categories)
+        self.assertIsNone(column.filled)
+
+        column = prepare_column(pd.Series(['v%d' % i for i in range(0, 2000)], dtype=object))
+
+        self.assertIsNone(column.codes)
+
+    def test_mixed_bool_number_column(self):
+        # factorize считает True, 1 и 1.0 одним значением: такие колонки не интернируются
+        values = [True, 1, 1.0, 'x', False, 0] * 200
+        column = prepare_column(pd.Series(values, dtype=object))
+
+        self.assertIsNone(column.codes)
+        self.assertEqual('write', column.method)
+        self.assertListEqual(values[:6], column.values[:6])
+        self.assertListEqual([bool, int, float, str, bool, int], [type(value) for value in column.values[:6]])
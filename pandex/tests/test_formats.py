@@ -0,0 +1,42 @@
+from unittest import TestCase
+from unittest.mock import Mock
+
+import numpy as np
+import pandas as pd
+
+from pandex.formats import FormatRegistry, get_format_registry
+from pandex.sheet import Cursor
+from pandex.table import Table
+
+
+class FormatRegistryTestCase(TestCase):
+    def setUp(self):
+        self.workbook = Mock()
+        self.workbook.add_format.side_effect = lambda properties: Mock()
+
+    def test_reuse(self):
+        registry = FormatRegistry(self.workbook)
+
+        first = registry.get({'border': 1, 'align': 'center'})
+        second = registry.get({'align': 'center', 'border': 1})
+        other = registry.get({'border': 2})
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+        self.assertEqual(1, registry.hits)
+        self.assertEqual(2, registry.misses)
+        self.assertEqual(2, self.workbook.add_format.call_count)
+
+    def test_tables_share_formats(self):
+        df = pd.DataFrame(np.random.randn(2, 2), columns=['a', 'b'])
+
+        class RedTable(Table):
+            cells_format = dict(Table.cells_format, data={'bg_color': 'red'})
+
+        for table in (Table(df), Table(df), RedTable(df)):
+            table.write(self.workbook, Mock(), Cursor())
+
+        registry = get_format_registry(self.workbook)
+        self.assertEqual(4, registry.misses)
+        self.assertEqual(5, registry.hits)
+        self.assertEqual(4, self.workbook.add_format.call_count)
@@ -64,3 +64,15 @@ class GroupTestCase(TestCase):
 
         self.assertEqual(8, group_cursor_end.row)
         self.assertEqual(4, group_cursor_end.col)
+
+    def test_cursors_are_independent(self):
+        sheet = Sheet(self.workbook, 'Test', record_placements=True)
+
+        group = sheet.create_shape(margin_rows=1)
+        group.add(Table(self.df), side=Side.BOTTOM)
+
+        group_cursor_start, group_cursor_end = group.get_cursors()
+
+        self.assertEqual((1, 0), (group_cursor_start.row, group_cursor_start.col))
+        self.assertEqual((5, 4), (group_cursor_end.row, group_cursor_end.col))
+        self.assertEqual((1, 0), (sheet.placements[0][0].row, sheet.placements[0][0].col))
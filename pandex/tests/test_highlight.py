@@ -0,0 +1,84 @@
+from unittest import TestCase
+from unittest.mock import Mock
+
+import numpy as np
+import pandas as pd
+
+from pandex import Table, ChunkedTable, Threshold, TopN, ColorScale
+from pandex.highlight import HighlightRule
+from pandex.sheet import Cursor
+
+
+class HighlightTestCase(TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame(np.random.randn(4, 4), index=list('abcd'), columns=['a', 'b', 'c', 'd'])
+
+        self.workbook = Mock()
+        self.workbook.add_format.side_effect = lambda properties: properties
+
+    def _ranges(self, worksheet):
+        return [(c[1][:4], c[1][4]) for c in worksheet.conditional_format.mock_calls]
+
+    def test_rules(self):
+        worksheet = Mock()
+
+        Table(self.df, highlight=[
+            Threshold('<', 0, '#CB3C39'),
+            Threshold('between', (0, 1), {'bold': True}, columns=['a', 'b', 'd']),
+            TopN(10, '#92D050', percent=True, columns=['c']),
+            ColorScale('#FFFFFF', '#31859C', columns=['a', 'b']),
+        ]).write(self.workbook, worksheet, Cursor(1, 1))
+
+        self.assertListEqual([
+            ((2, 2, 5, 5), {'type': 'cell', 'criteria': '<', 'value': 0, 'format': {'bg_color': '#CB3C39'}}),
+            ((2, 2, 5, 3), {'type': 'cell', 'criteria': 'between', 'minimum': 0, 'maximum': 1,
+                            'format': {'bold': True}}),
+            ((2, 5, 5, 5), {'type': 'cell', 'criteria': 'between', 'minimum': 0, 'maximum': 1,
+                            'format': {'bold': True}}),
+            ((2, 4, 5, 4), {'type': 'top', 'value': 10, 'format': {'bg_color': '#92D050'}, 'criteria': '%'}),
+            ((2, 2, 5, 2), {'type': '2_color_scale', 'min_color': '#FFFFFF', 'max_color': '#31859C'}),
+            ((2, 3, 5, 3), {'type': '2_color_scale', 'min_color': '#FFFFFF', 'max_color': '#31859C'}),
+        ], self._ranges(worksheet))
+
+        # ячейки данных записываются без дополнительных форматов
+        self.assertEqual({str(Table.cells_format['data'])}, {str(c[1][3]) for c in worksheet.write_number.mock_calls})
+
+    def test_chunked_table(self):
+        worksheet = Mock()
+
+        table = ChunkedTable([self.df, self.df], rows=8, highlight=[Threshold('>', 1, '#92D050')])
+        table.prepare(self.workbook, worksheet, Cursor())
+
+        self.assertListEqual([(1, 1, 8, 4)], [r for r, _ in self._ranges(worksheet)])
+
+    def test_empty_table(self):
+        worksheet = Mock()
+
+        Table(self.df.iloc[:0], highlight=[Threshold('>', 1, '#92D050')]).write(self.workbook, worksheet, Cursor())
+
+        self.assertFalse(worksheet.conditional_format.called)
+
+    def test_single_column(self):
+        df = self.df.set_axis(['sales', 's', 'a', 'l'], axis=1)
+        worksheet = Mock()
+
+        Table(df, highlight=[Threshold('>', 1, '#92D050', columns='sales'), TopN(1, '#92D050', columns=2)]).write(
+            self.workbook, worksheet, Cursor()
+        )
+
+        self.assertListEqual([(1, 1, 4, 1)], [r for r, _ in self._ranges(worksheet)])
+
+        with self.assertRaises(TypeError):
+            HighlightRule()
+
+    def test_multi_index_column(self):
+        df = self.df.set_axis(pd.MultiIndex.from_product([['a', 'b'], ['x', 'y']]), axis=1)
+        worksheet = Mock(merged_cells={}, table_cells={})
+
+        Table(df, highlight=[
+            Threshold('>', 1, '#92D050', columns=('a', 'x')),
+            Threshold('<', 0, '#CB3C39', columns=[('a', 'y'), ('b', 'y')]),
+        ]).write(self.workbook, worksheet, Cursor())
+
+        # кортеж - название одной колонки многоуровневого заголовка
+        self.assertListEqual([(2, 1, 5, 1), (2, 2, 5, 2), (2, 4, 5, 4)], [r for r, _ in self._ranges(worksheet)])
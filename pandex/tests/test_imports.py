@@ -0,0 +1,47 @@
+import subprocess
+import sys
+from unittest import TestCase
+
+import pandex
+
+
+class LazyImportTestCase(TestCase):
+    def _modules(self, statement):
+        """Загруженные модули после импорта в новом процессе"""
+        code = '%s\nimport sys\nprint(" ".join(sys.modules))' % statement
+        output = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True).stdout
+
+        return set(output.split())
+
+    def test_layout_without_pandas(self):
+        modules = self._modules('from pandex import Sheet, Side, Layout, ChartFactory')
+
+        self.assertIn('pandex.sheet', modules)
+        self.assertNotIn('pandas', modules)
+        self.assertNotIn('pandex.table', modules)
+
+    def test_table(self):
+        modules = self._modules('from pandex import Table')
+
+        self.assertIn('pandas', modules)
+
+    def test_exports(self):
+        self.assertIs(pandex.Table, pandex.table.Table)
+        self.assertLessEqual(set(pandex.__all__), set(dir(pandex)))
+
+        with self.assertRaises(AttributeError):
+            pandex.Missing
+
+    def test_xlsxwriter_internals(self):
+        # атрибут, который xlsxwriter создает в Worksheet.__init__
+        code = '\n'.join([
+            'from xlsxwriter.worksheet import Worksheet',
+            'init = Worksheet.__init__',
+            'Worksheet.__init__ = lambda self: (init(self), delattr(self, "merged_cells"))[0]',
+            'import pandex.compat',
+        ])
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+
+        self.assertNotEqual(0, result.returncode)
+        self.assertIn('ImportError', result.stderr)
+        self.assertIn('Worksheet.merged_cells', result.stderr)
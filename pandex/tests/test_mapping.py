@@ -0,0 +1,36 @@
+from unittest import TestCase
+
+from pandex.mapping import CellGrid, CellLine, positions
+
+
+class CellLineTestCase(TestCase):
+    def test_horizontal(self):
+        line = CellLine(2, positions([1, 4]))
+
+        self.assertEqual([2, 1], line[0])
+        self.assertEqual([2, 4], line[-1])
+        self.assertEqual(2, len(line))
+        self.assertEqual([2, 1, 2, 4], line.bounds())
+
+    def test_vertical(self):
+        line = CellLine(3, range(5, 8), horizontal=False)
+
+        self.assertListEqual([[5, 3], [6, 3], [7, 3]], line.tolist())
+        self.assertListEqual([[6, 3], [7, 3]], line[1:].tolist())
+
+
+class CellGridTestCase(TestCase):
+    def test_grid(self):
+        grid = CellGrid(1, 2, 1000000, 3)
+
+        self.assertEqual((1000000, 3), grid.shape)
+        self.assertEqual([1, 2], grid[0][0])
+        self.assertEqual([1000000, 4], grid[-1][-1])
+        self.assertEqual([1, 2, 1000000, 4], grid.bounds())
+        self.assertListEqual([[1, 3], [1000000, 3]], grid.column(1)[::999999].tolist())
+
+    def test_out_of_range(self):
+        grid = CellGrid(0, 0, 2, 2)
+
+        with self.assertRaises(IndexError):
+            grid[2]
@@ -0,0 +1,99 @@
+import io
+import zipfile
+from unittest import TestCase
+from unittest.mock import Mock
+
+import xlsxwriter
+from xlsxwriter.exceptions import OverlappingRange
+
+from pandex.merges import MergePlan, MAX_COLS
+from pandex.table import write_span
+
+
+class MergePlanTestCase(TestCase):
+    def setUp(self):
+        self.worksheet = Mock()
+        self.worksheet.merge = []
+        self.worksheet.merged_cells = {}
+        self.worksheet.table_cells = {}
+
+        self.cell_format = Mock()
+
+    def test_write(self):
+        plan = MergePlan()
+        plan.add(0, [0, 1, 3], 0, [0, 2, 3], ['a', 'b', 'c'])
+        plan.add([1, 1], [0, 1], [2, 1], [0, 1], ['d', 'e'])
+        plan.write(self.worksheet, self.cell_format)
+
+        self.assertListEqual([[0, 1, 0, 2], [1, 0, 2, 0]], self.worksheet.merge)
+        self.assertListEqual(
+            [(0, 0, 'a'), (0, 1, 'b'), (0, 3, 'c'), (1, 0, 'd'), (1, 1, 'e')],
+            [c[1][:3] for c in self.worksheet.write.mock_calls]
+        )
+        self.assertListEqual([(0, 2), (2, 0)], [c[1][:2] for c in self.worksheet.write_blank.mock_calls])
+        self.assertEqual((7, 2), plan.counters())
+
+    def test_overlap(self):
+        plan = MergePlan()
+        plan.add(0, 0, 2, 0, ['a'])
+        plan.add(2, 0, 2, 3, ['b'])
+
+        with self.assertRaises(OverlappingRange):
+            plan.write(self.worksheet, self.cell_format)
+
+        self.assertFalse(self.worksheet.write.called)
+
+    def test_sheet_merges(self):
+        self.worksheet.merged_cells[(0, 2)] = 'C1:D1'
+
+        plan = MergePlan()
+        plan.add(0, 1, 0, 2, ['a'])
+
+        # объединение пересекается с объединением, уже записанным в лист
+        with self.assertRaises(OverlappingRange):
+            plan.write(self.worksheet, self.cell_format)
+
+        self.assertFalse(self.worksheet.write.called)
+        self.assertListEqual([], self.worksheet.merge)
+
+    def test_out_of_bounds(self):
+        plan = MergePlan()
+        plan.add(0, [MAX_COLS - 2, MAX_COLS - 1], 0, [MAX_COLS - 2, MAX_COLS], ['a', 'b'])
+        plan.write(self.worksheet, self.cell_format)
+
+        # объединение за пределами листа пропускается, как в merge_range
+        self.assertListEqual([(0, MAX_COLS - 2, 'a')], [c[1][:3] for c in self.worksheet.write.mock_calls])
+        self.assertListEqual([], self.worksheet.merge)
+
+    def test_head(self):
+        plan = MergePlan()
+        plan.add(0, [0, 1], 1, [0, 1], ['a', 'b'])
+        plan.add(0, 2, 0, 3, ['c'])
+
+        self.assertListEqual([(0, 0, 1, 0, 'a')], plan.head(1).spans())
+        self.assertEqual(3, len(plan))
+
+    def test_worksheet(self):
+        values = ['a', '=1+1', 'http://example.com', '', 5, None, 'b' * 40000, 'c']
+
+        plan = MergePlan()
+        plan.add(0, list(range(0, 8)), 0, list(range(0, 8)), values)
+        plan.add(1, [0, 3], 2, [2, 3], ['merged', 'd'])
+        plan.add(0, MAX_COLS, 0, MAX_COLS, ['outside'])
+
+        def sheet_xml(write):
+            output = io.BytesIO()
+            workbook = xlsxwriter.Workbook(output)
+            worksheet = workbook.add_worksheet()
+            write(worksheet, workbook.add_format({'border': 1}))
+            workbook.close()
+
+            with zipfile.ZipFile(output) as package:
+                return package.read('xl/worksheets/sheet1.xml'), package.read('xl/sharedStrings.xml')
+
+        def write_spans(worksheet, cell_format):
+            for span in plan.spans():
+                write_span(worksheet, span, cell_format)
+
+        # план записывает те же ячейки, строки и объединения, что и write/merge_range
+        self.assertEqual(sheet_xml(write_spans), sheet_xml(plan.write))
@@ -0,0 +1,132 @@
+import io
+import zipfile
+from unittest import TestCase
+from unittest.mock import Mock
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+from xlsxwriter.exceptions import OverlappingRange
+
+from pandex import Sheet, Table
+from pandex.columns import prepare_column
+from pandex.native import NativeWriter
+
+
+class NativeWriterTestCase(TestCase):
+    def setUp(self):
+        self.worksheet = Mock()
+        self.worksheet.merge = []
+        self.worksheet.merged_cells = {}
+        self.worksheet.table_cells = {}
+
+        self.cell_format = Mock()
+        self.cell_format._get_xf_index.return_value = 3
+
+    def _xml(self, writer):
+        writer.close()
+        return self.worksheet.rendered_sheet_data.read()
+
+    def test_cells(self):
+        writer = NativeWriter(self.worksheet)
+        writer.write(0, 1, 'a & b', self.cell_format)
+        writer.write_number(0, 0, 1.5)
+        writer.write_boolean(1, 0, True, self.cell_format)
+        writer.write_blank(1, 1, None)
+        writer.merge_range(2, 0, 2, 1, ' x', self.cell_format)
+
+        self.assertEqual(
+            '<row r="1"><c r="A1"><v>1.5</v></c><c r="B1" s="3" t="inlineStr"><is><t>a &amp; b</t></is></c></row>'
+            '<row r="2"><c r="A2" s="3" t="b"><v>1</v></c></row>'
+            '<row r="3"><c r="A3" s="3" t="inlineStr"><is><t xml:space="preserve"> x</t></is></c>'
+            '<c r="B3" s="3"/></row>',
+            self._xml(writer)
+        )
+        self.assertListEqual([[2, 0, 2, 1]], self.worksheet.merge)
+
+    def test_render_column(self):
+        writer = NativeWriter(self.worksheet)
+
+        cells = writer.render_column(prepare_column(pd.Series([1.0, np.nan, 3.0])), 4, 2, self.cell_format)
+
+        self.assertListEqual(
+            ['<c r="C5" s="3"><v>1</v></c>', '<c r="C6" s="3"/>', '<c r="C7" s="3"><v>3</v></c>'],
+            cells
+        )
+
+    def test_render_sparse_column(self):
+        writer = NativeWriter(self.worksheet)
+
+        cells = writer.render_column(prepare_column(pd.Series([1.0, np.nan])), 0, 0, self.cell_format, blanks=False)
+
+        self.assertListEqual(['<c r="A1" s="3"><v>1</v></c>', None], cells)
+
+    def test_render_interned_column(self):
+        writer = NativeWriter(self.worksheet)
+
+        cells = writer.render_column(prepare_column(pd.Series(pd.Categorical(['a<', None, 'a<']))), 0, 0)
+
+        self.assertListEqual([
+            '<c r="A1" t="inlineStr"><is><t>a&lt;</t></is></c>',
+            None,
+            '<c r="A3" t="inlineStr"><is><t>a&lt;</t></is></c>',
+        ], cells)
+
+    def test_rows_order(self):
+        writer = NativeWriter(self.worksheet)
+        writer.write(1, 0, 1)
+
+        with self.assertRaises(ValueError):
+            writer.write(0, 0, 1)
+
+
+class NativeSheetTestCase(TestCase):
+    def test_sheet(self):
+        df = pd.DataFrame(
+            [[1, 'x'], [2, 'y']],
+            index=pd.MultiIndex.from_tuples([('a', 'b'), ('a', 'c')]),
+            columns=['n', 's']
+        )
+
+        output = io.BytesIO()
+        workbook = xlsxwriter.Workbook(output)
+
+        sheet = Sheet(workbook, 'Native', native=True)
+        group = sheet.create_shape()
+        group.add(Table(df))
+        group.add(Table(df))
+        sheet.flush()
+
+        workbook.close()
+
+        with zipfile.ZipFile(output) as package:
+            xml = package.read('xl/worksheets/sheet1.xml').decode()
+
+        self.assertIn('<dimension ref="A1:H3"/>', xml)
+        self.assertIn('<c r="C2" s="1"><v>1</v></c>', xml)
+        self.assertIn('<c r="H3" s="1" t="inlineStr"><is><t>y</t></is></c>', xml)
+        self.assertIn('<mergeCells count="2"><mergeCell ref="A2:A3"/><mergeCell ref="E2:E3"/></mergeCells>', xml)
+
+    def test_merges_overlap(self):
+        wide = pd.DataFrame([[1, 2]], columns=pd.MultiIndex.from_tuples([('x', 'y'), ('x', 'z')]))
+
+        workbook = xlsxwriter.Workbook(io.BytesIO())
+        sheet = Sheet(workbook, 'Native', native=True)
+        sheet.create_shape().add(Table(wide))
+        sheet.flush()
+
+        # объединения заголовка зарегистрированы в листе, пересекающееся объединение отклоняется
+        self.assertIn((0, 2), sheet.worksheet.merged_cells)
+        with self.assertRaises(OverlappingRange):
+            sheet.worksheet.merge_range(0, 2, 0, 3, 'overlap')
+
+    def test_xlsxwriter_cells(self):
+        workbook = xlsxwriter.Workbook(io.BytesIO())
+        sheet = Sheet(workbook, 'Native', native=True)
+        sheet.create_shape().add(Table(pd.DataFrame([[1]])))
+        sheet.flush()
+
+        # ячейка, записанная в обход NativeWriter, не попала бы в отрисованные строки
+        sheet.worksheet.write(10, 0, 'note')
+        with self.assertRaises(RuntimeError):
+            workbook.close()
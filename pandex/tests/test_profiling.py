@@ -0,0 +1,47 @@
+from unittest import TestCase
+from unittest.mock import Mock
+
+import numpy as np
+import pandas as pd
+
+from pandex import Sheet, Table, LineChart
+from pandex.profiling import Profiler
+
+
+class ProfilerTestCase(TestCase):
+    def setUp(self):
+        columns = pd.MultiIndex.from_product([['a', 'b'], ['c', 'd']])
+        self.df = pd.DataFrame(np.random.randn(3, 4), index=['1', '2', '3'], columns=columns)
+
+        self.workbook = Mock()
+        self.workbook.add_worksheet.return_value = Mock(merged_cells={}, table_cells={})
+
+    def _write(self):
+        sheet = Sheet(self.workbook, 'Test')
+        group = sheet.create_shape()
+
+        table = Table(self.df)
+        group.add(table)
+        group.add(LineChart('Chart', table, [0]))
+
+    def test_report(self):
+        records = []
+        with Profiler(callback=records.append, trace_memory=True) as profiler:
+            self._write()
+
+        report = profiler.report()
+
+        self.assertEqual(2, report['group.add']['calls'])
+        self.assertEqual(1, report['chart.write']['calls'])
+        self.assertEqual(12, report['table.data']['cells'])
+        self.assertEqual(3, report['table.index']['cells'])
+        self.assertEqual(10, report['table.header']['cells'])
+        self.assertEqual(3, report['table.header']['merges'])
+        self.assertIsNotNone(report['table.data']['allocated'])
+        self.assertEqual(len(profiler.records), len(records))
+
+    def test_disabled(self):
+        profiler = Profiler()
+        self._write()
+
+        self.assertListEqual([], profiler.records)
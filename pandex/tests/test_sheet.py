@@ -1,10 +1,13 @@
+import io
+import zipfile
 from unittest import TestCase
 from unittest.mock import Mock
 
 import numpy as np
 import pandas as pd
+import xlsxwriter
 
-from pandex import Sheet, Table
+from pandex import Sheet, Table, Layout, LineChart
 from pandex.sheet import Side
 
 
@@ -56,3 +59,113 @@ class SheetTestCase(TestCase):
 
         self.assertEqual(8, sheet.cursor.row)
         self.assertEqual(8, sheet.cursor.col)
+
+    def test_streaming_rows_order(self):
+        sheet = Sheet(self.workbook, 'Test', streaming=True)
+
+        group = sheet.create_shape()
+        group.add(Table(self.df))
+        group.add(Table(self.df))
+        group.add(Table(self.df), side=Side.BOTTOM)
+
+        worksheet = self.workbook.add_worksheet.return_value
+        self.assertFalse(worksheet.write.called)
+        self.assertEqual(8, sheet.cursor.row)
+        self.assertEqual(8, sheet.cursor.col)
+
+        sheet.flush()
+
+        rows = [c[1][0] for c in worksheet.method_calls if c[0].startswith('write')]
+        self.assertEqual(3 * 16, len(rows))
+        self.assertListEqual(sorted(rows), rows)
+
+    def test_placements(self):
+        sheet = Sheet(self.workbook, 'Test')
+        sheet.create_shape().add(Table(self.df))
+
+        # по умолчанию лист не хранит записанные элементы
+        with self.assertRaises(RuntimeError):
+            sheet.placements
+
+        sheet = Sheet(self.workbook, 'Test', record_placements=True)
+        table = Table(self.df)
+        sheet.create_shape(margin_rows=1).add(table)
+
+        self.assertListEqual([(1, 0, table)], [(c.row, c.col, element) for c, element in sheet.placements])
+
+    def test_date_1904(self):
+        df = pd.DataFrame({'date': pd.to_datetime(['2020-01-01'])}, index=['1'])
+
+        for options in ({'streaming': False}, {'streaming': True}, {'native': True}):
+            output = io.BytesIO()
+            workbook = xlsxwriter.Workbook(output, {'date_1904': True})
+            sheet = Sheet(workbook, 'Test', **options)
+            sheet.create_shape().add(Table(df))
+            sheet.flush()
+            workbook.close()
+
+            with zipfile.ZipFile(output) as package:
+                self.assertIn('<v>42369</v>', package.read('xl/worksheets/sheet1.xml').decode(), options)
+
+    def test_streaming_not_flushed(self):
+        df = self.df.set_index(pd.MultiIndex.from_product([['x'], ['1', '2', '3']]))
+
+        workbook = xlsxwriter.Workbook(io.BytesIO(), {'constant_memory': True})
+        sheet = Sheet(workbook, 'Test', streaming=True)
+        sheet.create_shape().add(Table(df))
+
+        with self.assertRaises(RuntimeError):
+            workbook.close()
+
+        workbook = xlsxwriter.Workbook(io.BytesIO(), {'constant_memory': True})
+        sheet = Sheet(workbook, 'Test', streaming=True)
+        sheet.create_shape().add(Table(df))
+        sheet.flush()
+        workbook.close()
+
+        # вертикальное объединение индекса зарегистрировано в листе
+        self.assertListEqual([[1, 0, 3, 0]], sheet.worksheet.merge)
+        self.assertEqual('A2:A4', sheet.worksheet.merged_cells[(2, 0)])
+
+
+class LayoutTestCase(TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame(
+            np.random.randn(3, 3),
+            index=['1', '2', '3'],
+            columns=['a', 'b', 'c']
+        )
+
+        self.workbook = Mock()
+
+    def _fill(self, sheet):
+        first_group = sheet.create_shape()
+        first_group.add(Table(self.df))
+        first_group.add(Table(self.df), side=Side.BOTTOM, margin_rows=2)
+
+        second_group = sheet.create_shape(margin_cols=1)
+        table = Table(self.df)
+        second_group.add(table)
+        second_group.add(LineChart('Chart', table, [0]), side=Side.BOTTOM)
+
+    def test_layout_matches_sheet(self):
+        layout = Layout()
+        self._fill(layout)
+
+        sheet = Sheet(self.workbook, 'Test')
+        self._fill(sheet)
+
+        self.assertEqual((sheet.cursor.row, sheet.cursor.col), (layout.cursor.row, layout.cursor.col))
+        self.assertListEqual(
+            [(0, 0), (6, 0), (0, 5), (4, 5)],
+            [(cursor.row, cursor.col) for cursor, _ in layout.placements]
+        )
+
+    def test_render(self):
+        layout = Layout()
+        self._fill(layout)
+
+        sheet = Sheet(self.workbook, 'Test')
+        layout.render(sheet)
+
+        self.assertEqual((18, 12), (sheet.cursor.row, sheet.cursor.col))
@@ -0,0 +1,84 @@
+import os
+import tempfile
+from unittest import TestCase, skipUnless
+from unittest.mock import Mock
+
+import numpy as np
+import pandas as pd
+
+from pandex import Sheet, Table
+from pandex.columns import dtype_kind
+from pandex.sheet import Cursor
+from pandex.sources import ArrayFrame, ColumnarFrame, pyarrow
+
+
+class SourcesTestCase(TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'key': ['a', 'b', 'c', 'd'],
+            'value': [1.5, np.nan, 3.0, 4.0],
+            'text': ['x', None, 'y', 'z'],
+        })
+
+    def _calls(self, table, streaming=False):
+        workbook = Mock()
+        workbook.add_format.side_effect = lambda properties: properties
+
+        sheet = Sheet(workbook, 'Test', streaming=streaming)
+        sheet.create_shape().add(table)
+        sheet.flush()
+
+        return workbook.add_worksheet.return_value.method_calls
+
+    def test_array_frame(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'value.npy')
+            np.save(path, self.df['value'].to_numpy())
+
+            arrays = {'value': np.load(path, mmap_mode='r')}
+            frame = ArrayFrame(arrays, index=pd.Index(self.df['key'], name='key'))
+
+            self.assertEqual((4, 1), frame.shape)
+            self.assertListEqual([3.0, 4.0], frame.iloc[2:4]['value'].tolist())
+
+            expected = Table(self.df.set_index('key')[['value']])
+            for streaming in (False, True):
+                table = Table.from_arrays(arrays, index=frame.index)
+                self.assertEqual(self._calls(expected, streaming), self._calls(table, streaming))
+
+    def test_array_lengths(self):
+        with self.assertRaises(ValueError):
+            ArrayFrame({'a': np.arange(3), 'b': np.arange(4)})
+
+    @skipUnless(pyarrow, 'pyarrow is not installed')
+    def test_arrow_frame(self):
+        arrow_table = pyarrow.Table.from_pandas(self.df, preserve_index=False)
+        expected = self.df.set_index('key')
+
+        for source in (arrow_table, arrow_table.to_batches(max_chunksize=3)):
+            for streaming in (False, True):
+                table = Table.from_arrow(source, index_columns=['key'])
+                self.assertEqual(self._calls(Table(expected), streaming), self._calls(table, streaming))
+
+        table = Table.from_arrow(arrow_table)
+        table.write(Mock(), Mock(), Cursor())
+        self.assertEqual([1, 1, 4, 3], table.data.cell_mapping.bounds())
+
+    @skipUnless(pyarrow, 'pyarrow is not installed')
+    def test_arrow_dtypes(self):
+        df = pd.DataFrame({
+            'time': pd.to_datetime(['2020-01-01', '2020-01-02', None, '2020-01-04']).tz_localize('Europe/Moscow'),
+            'kind': pd.Categorical(['a', 'b', 'a', None]),
+            'value': self.df['value'],
+        })
+        columns_format = {'datetime': {'num_format': 'dd.mm.yyyy'}, 'category': {'bold': True}}
+
+        table = Table.from_arrow(pyarrow.Table.from_pandas(df, preserve_index=False), columns_format=columns_format)
+        self.assertListEqual(['datetime', 'category', 'float'], [dtype_kind(dtype) for dtype in table._df.dtypes])
+
+        for streaming in (False, True):
+            expected = Table(df, columns_format=columns_format)
+            self.assertEqual(self._calls(expected, streaming), self._calls(table, streaming))
+
+        with self.assertRaises(TypeError):
+            ColumnarFrame(['a'], [np.dtype(object)], 0)
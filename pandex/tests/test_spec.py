@@ -0,0 +1,107 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import zipfile
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from pandex.__main__ import main
+from pandex.spec import ReportSpec
+
+DF = pd.DataFrame(np.arange(9).reshape(3, 3), index=['x', 'y', 'z'], columns=['a', 'b', 'c'])
+
+SPEC = {
+    'output': 'report.xlsx',
+    'sheets': [{
+        'name': 'Report',
+        'shapes': [{
+            'elements': [
+                {'type': 'table', 'id': 'inline', 'data': json.loads(DF.to_json(orient='split')),
+                 'highlight': [{'type': 'threshold', 'criteria': '>', 'value': 4, 'cell_format': '#92D050'}]},
+                {'type': 'table', 'id': 'csv', 'source': {'path': 'data.csv', 'index': ['key']}, 'side': 'bottom',
+                 'margin_rows': 1},
+                {'type': 'line_chart', 'name': 'Chart', 'table': 'csv', 'rows': [0, 1]},
+            ]
+        }]
+    }, {
+        'name': 'Streaming',
+        'native': True,
+        'shapes': [{'elements': [{'type': 'table', 'source': 'data.csv'}]}]
+    }]
+}
+
+
+class ReportSpecTestCase(TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.directory = self._directory.name
+
+        DF.rename_axis('key').to_csv(os.path.join(self.directory, 'data.csv'))
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def _write_spec(self, name, spec=SPEC):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as fh:
+            json.dump(spec, fh)
+
+        return path
+
+    def test_render(self):
+        output = ReportSpec.load(self._write_spec('report.json')).render()
+
+        self.assertEqual(os.path.join(self.directory, 'report.xlsx'), output)
+        with zipfile.ZipFile(output) as package:
+            names = package.namelist()
+            first_sheet = package.read('xl/worksheets/sheet1.xml').decode()
+
+        self.assertIn('xl/worksheets/sheet2.xml', names)
+        self.assertIn('xl/charts/chart1.xml', names)
+        self.assertIn('<conditionalFormatting sqref="B2:D4">', first_sheet)
+
+    def test_unknown_table(self):
+        spec = {'sheets': [{'name': 'S', 'shapes': [{'elements': [{'type': 'line_chart', 'table': 'x', 'rows': [0]}]}]}]}
+
+        with self.assertRaises(ValueError):
+            ReportSpec(spec, self.directory).render(os.path.join(self.directory, 'x.xlsx'))
+
+    def test_cli(self):
+        self._write_spec('first.json')
+        self._write_spec('second.json', dict(SPEC, output='second.xlsx'))
+        broken = self._write_spec('broken.json', {'output': 'broken.xlsx', 'sheets': [{'name': 'S', 'shapes': [
+            {'elements': [{'type': 'table', 'source': 'missing.csv'}]}
+        ]}]})
+        output_dir = os.path.join(self.directory, 'out')
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            status = main([self.directory, '--processes', '2', '--output-dir', output_dir])
+
+        self.assertEqual(1, status)
+        self.assertListEqual(['report.xlsx', 'second.xlsx'], sorted(os.listdir(output_dir)))
+        self.assertIn(broken, stderr.getvalue())
+        self.assertIn('3 reports, 1 failed', stdout.getvalue())
+
+    def test_cli_duplicate_outputs(self):
+        first = self._write_spec('first.json')
+        os.mkdir(os.path.join(self.directory, 'other'))
+        DF.rename_axis('key').to_csv(os.path.join(self.directory, 'other', 'data.csv'))
+        second = self._write_spec(os.path.join('other', 'second.json'))
+        output_dir = os.path.join(self.directory, 'out')
+
+        stderr = io.StringIO()
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(stderr):
+            status = main([first, second, '--processes', '1', '--output-dir', output_dir])
+
+        # оба описания пишут report.xlsx в output_dir: отчеты не рендерятся
+        self.assertEqual(1, status)
+        self.assertFalse(os.path.exists(output_dir))
+        self.assertIn(os.path.join(output_dir, 'report.xlsx'), stderr.getvalue())
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(0, main([first, second, '--processes', '1']))
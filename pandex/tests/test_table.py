@@ -1,11 +1,14 @@
+import io
 from unittest import TestCase
 from unittest.mock import Mock
 
 import numpy as np
 import pandas as pd
+import xlsxwriter
+from xlsxwriter.exceptions import OverlappingRange
 
 from pandex.sheet import Cursor
-from pandex.table import TableHeader, TableIndex, TableData, Table
+from pandex.table import TableHeader, TableIndex, TableData, Table, level_runs
 
 
 class TableHeaderTestCase(TestCase):
@@ -24,7 +27,7 @@ class TableHeaderTestCase(TestCase):
             columns=header
         )
 
-        self.worksheet = Mock()
+        self.worksheet = Mock(merged_cells={}, table_cells={})
         self.cell_format = Mock()
 
     def test_multi_headers(self):
@@ -35,12 +38,30 @@ class TableHeaderTestCase(TestCase):
 
         self.assertListEqual(
             [[[0, 1], [0, 4]], [[1, 1], [1, 2], [1, 3], [1, 4], [1, 5], [1, 6]]],
-            header._cell_mapping
+            [line.tolist() for line in header.cell_mapping]
         )
 
         self.assertEqual(2, cursor.row)
         self.assertEqual(0, cursor.col)
 
+    def test_sheet_merges(self):
+        workbook = xlsxwriter.Workbook(io.BytesIO())
+        worksheet = workbook.add_worksheet()
+
+        Table(self.df).write(workbook, worksheet, Cursor(0, 0))
+        Table(self.df).write(workbook, worksheet, Cursor(0, 10))
+
+        # объединения заголовков зарегистрированы в листе и проверяются merge_range
+        self.assertEqual('L1:N1', worksheet.merged_cells[(0, 12)])
+        with self.assertRaises(OverlappingRange):
+            worksheet.merge_range(0, 12, 0, 15, 'overlap')
+
+        # следующая таблица пересекается с заголовком предыдущей
+        with self.assertRaises(OverlappingRange):
+            Table(self.df).write(workbook, worksheet, Cursor(0, 5))
+
+        workbook.close()
+
 
 class TableIndexTestCase(TestCase):
     def setUp(self):
@@ -58,7 +79,7 @@ class TableIndexTestCase(TestCase):
             columns=['a', 'b', 'c', 'd', 'e']
         )
 
-        self.worksheet = Mock()
+        self.worksheet = Mock(merged_cells={}, table_cells={})
         self.cell_format = Mock()
 
     def test_multi_index(self):
@@ -69,13 +90,42 @@ class TableIndexTestCase(TestCase):
 
         self.assertListEqual(
             [[[0, 0], [3, 0]], [[0, 1], [1, 1], [2, 1], [3, 1], [4, 1], [5, 1]]],
-            index._cell_mapping
+            [line.tolist() for line in index.cell_mapping]
         )
 
         self.assertEqual(0, cursor.row)
         self.assertEqual(2, cursor.col)
 
 
+class LevelRunsTestCase(TestCase):
+    def test_runs(self):
+        index = pd.MultiIndex.from_arrays([
+            ['a', 'a', 'b', 'a', None, None],
+            ['x', 'x', 'x', 'x', 'y', 'y'],
+        ])
+
+        (starts, ends, labels), (sub_starts, sub_ends, sub_labels) = level_runs(index)
+
+        self.assertListEqual([0, 2, 3, 4], starts.tolist())
+        self.assertListEqual([1, 2, 3, 5], ends.tolist())
+        self.assertListEqual(['a', 'b', 'a'], labels[:3])
+        self.assertTrue(np.isnan(labels[3]))
+
+        self.assertListEqual([0, 2, 3, 4], sub_starts.tolist())
+        self.assertListEqual(['x', 'x', 'x', 'y'], sub_labels)
+
+
+class TableIndexLabelsTestCase(TestCase):
+    def test_mixed_labels(self):
+        worksheet = Mock(merged_cells={}, table_cells={})
+
+        index = TableIndex(pd.Index([True, 1, 'x', False, 0], dtype=object))
+        index.write(worksheet, Cursor(), None)
+
+        # True и 1 не объединяются factorize в одну подпись
+        self.assertListEqual(['True', '1', 'x', 'False', '0'], [c[1][2] for c in worksheet.write_string.mock_calls])
+
+
 class TableDataTestCase(TestCase):
     def setUp(self):
         self.df = pd.DataFrame(
@@ -84,7 +134,7 @@ class TableDataTestCase(TestCase):
             columns=['a', 'b', 'c']
         )
 
-        self.worksheet = Mock()
+        self.worksheet = Mock(merged_cells={}, table_cells={})
         self.cell_format = Mock()
 
     def test_data(self):
@@ -95,7 +145,7 @@ class TableDataTestCase(TestCase):
 
         self.assertListEqual(
             [[[0, 0], [0, 1], [0, 2]], [[1, 0], [1, 1], [1, 2]], [[2, 0], [2, 1], [2, 2]]],
-            data._cell_mapping
+            data.cell_mapping.tolist()
         )
 
         self.assertEqual(3, cursor.row)
@@ -111,7 +161,7 @@ class TableTestCase(TestCase):
         )
 
         self.workbook = Mock()
-        self.worksheet = Mock()
+        self.worksheet = Mock(merged_cells={}, table_cells={})
         self.cell_format = Mock()
 
     def test_table(self):
@@ -122,3 +172,87 @@ class TableTestCase(TestCase):
 
         self.assertEqual(4, cursor.row)
         self.assertEqual(4, cursor.col)
+
+    def test_measure(self):
+        index = pd.MultiIndex.from_product([['x', 'y'], ['1', '2']])
+        columns = pd.MultiIndex.from_product([['a', 'b'], ['c', 'd', 'e']])
+        df = pd.DataFrame(np.random.randn(4, 6), index=index, columns=columns)
+
+        for table in (Table(self.df), Table(df)):
+            cursor = Cursor(2, 3)
+            table.write(self.workbook, self.worksheet, cursor)
+
+            size = table.measure()
+            self.assertEqual((cursor.row - 2, cursor.col - 3), (size.rows, size.cols))
+
+    def test_columns_format(self):
+        df = pd.DataFrame({
+            'share': [0.1, 0.2],
+            'count': [1, 2],
+            'date': pd.to_datetime(['2020-01-01', '2020-01-02']),
+        })
+        workbook = Mock()
+        workbook.add_format.side_effect = lambda properties: properties
+        worksheet = Mock(merged_cells={}, table_cells={})
+
+        table = Table(df, columns_format={
+            'share': {'num_format': '0.0%'},
+            'datetime': {'num_format': 'dd.mm.yyyy'},
+        })
+        table.write(workbook, worksheet, Cursor())
+
+        data_format = Table.cells_format['data']
+        formats = {c[1][1]: c[1][3] for c in worksheet.write_number.mock_calls}
+        self.assertEqual(dict(data_format, num_format='0.0%'), formats[1])
+        self.assertEqual(data_format, formats[2])
+        self.assertEqual(dict(data_format, num_format='dd.mm.yyyy'), formats[3])
+
+    def test_excel_table(self):
+        workbook = Mock()
+        workbook.add_format.side_effect = lambda properties: properties
+        worksheet = Mock(merged_cells={}, table_cells={})
+
+        table = Table(self.df, excel_table={'style': 'Table Style Medium 9'}, columns_format={'b': {'num_format': '0.0'}})
+        table.write(workbook, worksheet, Cursor(1, 1))
+
+        worksheet.add_table.assert_called_once_with(1, 2, 4, 4, {
+            'style': 'Table Style Medium 9',
+            'columns': [{'header': 'a'}, {'header': 'b', 'format': {'num_format': '0.0'}}, {'header': 'c'}],
+        })
+
+        # названия колонок записывает add_table, данные пишутся без общего формата
+        self.assertListEqual([(1, 1, None)], [c[1][:3] for c in worksheet.write.mock_calls])
+        self.assertListEqual([None, {'num_format': '0.0'}, None],
+                             [c[1][3] for c in worksheet.write_number.mock_calls[::3]])
+        self.assertEqual([2, 2, 4, 4], table.data.cell_mapping.bounds())
+        self.assertListEqual([[1, 2], [1, 3], [1, 4]], table.header.cell_mapping[0].tolist())
+
+    def test_excel_table_fallback(self):
+        columns = pd.MultiIndex.from_product([['a'], ['c', 'd', 'e']])
+        df = pd.DataFrame(np.random.randn(3, 3), index=['1', '2', '3'], columns=columns)
+
+        for df in (df, self.df.set_axis(['a', 'A', 'b'], axis=1)):
+            worksheet = Mock(merged_cells={}, table_cells={})
+            Table(df, excel_table={}).write(self.workbook, worksheet, Cursor())
+
+            self.assertFalse(worksheet.add_table.called)
+
+    def test_sparse(self):
+        df = pd.DataFrame({'a': [1.0, np.nan, 3.0], 'b': [None, 'x', None]}, index=['1', '2', '3'])
+        workbook = Mock()
+        workbook.add_format.side_effect = lambda properties: properties
+        worksheet = Mock(merged_cells={}, table_cells={})
+
+        table = Table(df, sparse=True, sparse_columns_format=True, columns_format={'a': {'num_format': '0.0'}})
+        table.write(workbook, worksheet, Cursor())
+
+        # пустые ячейки не записываются, формат данных назначается колонкам
+        self.assertFalse(worksheet.write_blank.called)
+        self.assertListEqual([(1, 1), (3, 1)], [c[1][:2] for c in worksheet.write_number.mock_calls])
+        self.assertListEqual([(2, 2, 'x')], [c[1][:3] for c in worksheet.write_string.mock_calls[3:]])
+        self.assertListEqual(
+            [(1, 1, None, dict(Table.cells_format['data'], num_format='0.0')),
+             (2, 2, None, Table.cells_format['data'])],
+            [c[1] for c in worksheet.set_column.mock_calls]
+        )
+        self.assertEqual([1, 1, 3, 2], table.data.cell_mapping.bounds())
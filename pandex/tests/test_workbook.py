@@ -0,0 +1,93 @@
+import os
+import tempfile
+import zipfile
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from pandex import Table, LineChart
+from pandex.workbook import SheetSpec, render_workbook
+
+DF = pd.DataFrame(
+    np.arange(9).reshape(3, 3),
+    index=['1', '2', '3'],
+    columns=['a', 'b', 'c']
+)
+
+
+class PercentTable(Table):
+    cells_format = dict(Table.cells_format, data={'num_format': '0%'})
+
+
+def build_table(sheet):
+    group = sheet.create_shape()
+    group.add(Table(DF))
+
+
+def build_chart(sheet):
+    group = sheet.create_shape()
+    table = PercentTable(DF)
+    group.add(table)
+    group.add(LineChart('Chart', table, [0]))
+
+
+def build_note(sheet):
+    sheet.worksheet.write(10, 0, 'note')
+
+
+class GrowingTable:
+    """build, размечающая при каждом вызове таблицу на строку больше"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, sheet):
+        self.calls += 1
+        sheet.create_shape().add(Table(DF.iloc[[0] * self.calls]))
+
+
+class RenderWorkbookTestCase(TestCase):
+    def _render(self, processes):
+        specs = [SheetSpec('First', build_table), SheetSpec('Second', build_chart)]
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'test.xlsx')
+            render_workbook(filename, specs, processes=processes)
+
+            with zipfile.ZipFile(filename) as package:
+                return {name: package.read(name).decode() for name in package.namelist() if name.startswith('xl/')}
+
+    def test_render_serial(self):
+        package = self._render(processes=1)
+
+        first = package['xl/worksheets/sheet1.xml']
+        self.assertIn('<dimension ref="A1:D4"/>', first)
+        self.assertIn('<c r="D4" s="3"><v>8</v></c>', first)
+
+        second = package['xl/worksheets/sheet2.xml']
+        self.assertIn('<c r="D4" s="4"><v>8</v></c>', second)
+        self.assertIn('<drawing r:id="rId1"/>', second)
+        self.assertIn('xl/charts/chart1.xml', package)
+
+    def test_render_parallel(self):
+        self.assertEqual(self._render(processes=1), self._render(processes=2))
+
+    def test_build_not_idempotent(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'test.xlsx')
+
+            with self.assertRaisesRegex(ValueError, 'idempotent'):
+                render_workbook(filename, [SheetSpec('First', GrowingTable())], processes=1)
+
+    def test_xlsxwriter_cells(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'test.xlsx')
+            render_workbook(filename, [SheetSpec('First', build_note)], processes=1)
+
+            with zipfile.ZipFile(filename) as package:
+                sheet = package.read('xl/worksheets/sheet1.xml').decode()
+
+        # ячейки, записанные build через xlsxwriter, переносятся из процесса пула один раз
+        self.assertEqual(1, sheet.count('<c r="A11"'))
+        self.assertIn('<t>note</t>', sheet)
@@ -0,0 +1,238 @@
+import io
+import multiprocessing
+import re
+import zipfile
+
+import xlsxwriter
+from xlsxwriter.worksheet import Worksheet
+
+from .cache import sheet_key
+from .compat import check_dimensions, clear_cells, has_cells, register_merges, sheet_dimensions, sheet_merges, \
+    workbook_formats, write_sheet_data, xf_index
+from .formats import get_format_registry
+from .sheet import Sheet
+
+SHEET_DATA_PATTERN = re.compile(rb'<sheetData>(.*)</sheetData>', re.DOTALL)
+STYLE_PATTERN = re.compile(rb'(<(?:c|row) [^>]*?s=")(\d+)(")')
+
+# Листы, которые рендерят процессы пула. При запуске через fork список наследуется
+# дочерними процессами без копирования DataFrame (copy-on-write), при spawn - передается один раз на процесс.
+_specs = []
+_options = None
+
+
+class SheetSpec:
+    """Описание листа: имя и функция build(sheet), размечающая лист таблицами и графиками.
+
+    build вызывается дважды: в процессе пула для записи ячеек и в основном процессе
+    для графиков, ширины колонок и прочих элементов вне данных листа. Поэтому build должна быть
+    чистой и идемпотентной: не иметь побочных эффектов кроме разметки листа и при каждом вызове
+    размечать одни и те же элементы по тем же местам с теми же данными (без случайных значений,
+    текущего времени, счетчиков вызовов и т.п.).
+
+    Расположение элементов, размеченных в процессе пула и в основном процессе, сравнивается при сборке
+    листа (см. sheet_layout), и при расхождении render_workbook вызывает ValueError. Изменение данных
+    таблиц при неизменных размерах эта проверка не обнаруживает.
+    """
+
+    def __init__(self, name, build):
+        self.name = name
+        self.build = build
+
+
+class RenderedSheet:
+    """Результат рендеринга листа в процессе пула: XML строк листа, объединения, размеры и форматы ячеек,
+    а также расположение элементов листа (sheet_layout), по которому он отрисован
+    """
+
+    def __init__(self, sheet_data, merges, dimensions, formats, layout):
+        self.sheet_data = sheet_data
+        self.merges = merges
+        self.dimensions = dimensions
+
+        # {xf_index в процессе пула: свойства формата}
+        self.formats = formats
+
+        self.layout = layout
+
+
+class RenderedWorksheet(Worksheet):
+    """Worksheet, строки которого (<sheetData>) отрисованы заранее и вставляются в файл как есть.
+
+    rendered_sheet_data - строка XML или открытый текстовый файл с ним. Отрисованные строки заменяют
+    ячейки worksheet целиком, поэтому лист с отрисованными строками и ячейками, записанными через xlsxwriter,
+    не собирается (RuntimeError).
+    unflushed - в листе есть размеченные таблицы, ячейки которых еще не записаны (см. Sheet.flush).
+    """
+
+    def __init__(self):
+        super().__init__()
+
+        self.rendered_sheet_data = None
+        self.unflushed = False
+
+    def _assemble_xml_file(self):
+        if self.unflushed:
+            raise RuntimeError('Sheet %r has tables that were not written: call Sheet.flush() before workbook.close()'
+                               % self.name)
+
+        super()._assemble_xml_file()
+
+    def _write_sheet_data(self):
+        if self.rendered_sheet_data is None:
+            return super()._write_sheet_data()
+
+        if has_cells(self):
+            raise RuntimeError('Sheet %r has cells written through xlsxwriter besides the rendered rows, '
+                               'they would be lost: write them with elements that have iter_rows' % self.name)
+
+        if isinstance(self.rendered_sheet_data, str):
+            write_sheet_data(self, [self.rendered_sheet_data])
+        else:
+            # данные строк во временном файле копируются частями
+            write_sheet_data(self, iter(lambda: self.rendered_sheet_data.read(65536), ''))
+
+            self.rendered_sheet_data.close()
+
+    def _write_optimized_sheet_data(self):
+        if self.rendered_sheet_data is None:
+            return super()._write_optimized_sheet_data()
+
+        self._write_sheet_data()
+
+    def apply(self, workbook, rendered: RenderedSheet):
+        """Переносит отрисованный лист, пересчитывая индексы форматов ячеек на форматы workbook.
+
+        Объединения регистрируются с проверкой пересечений с объединениями и таблицами листа.
+        """
+        xf_indices = {}
+        for rendered_xf_index, properties in rendered.formats.items():
+            # индекс формата в workbook назначается при первом использовании
+            workbook_xf_index = xf_index(get_format_registry(workbook).get(properties))
+            if workbook_xf_index != rendered_xf_index:
+                xf_indices[str(rendered_xf_index).encode()] = str(workbook_xf_index).encode()
+
+        sheet_data = rendered.sheet_data
+        if xf_indices:
+            sheet_data = STYLE_PATTERN.sub(
+                lambda match: match.group(1) + xf_indices.get(match.group(2), match.group(2)) + match.group(3),
+                sheet_data
+            )
+
+        # ячейки, записанные build через xlsxwriter, уже есть в отрисованном листе: build выполнялась и в процессе пула
+        clear_cells(self)
+        register_merges(self, rendered.merges)
+
+        self.rendered_sheet_data = sheet_data.decode('utf-8')
+        self.unflushed = False
+
+        for row, col in rendered.dimensions:
+            check_dimensions(self, row, col)
+
+
+class RecordingWorkbook(xlsxwriter.Workbook):
+    """Workbook, запоминающий свойства созданных форматов для переноса в другой workbook"""
+
+    def add_format(self, properties=None):
+        xl_format = super().add_format(properties)
+        xl_format.pandex_properties = dict(properties or {})
+        return xl_format
+
+
+class AssemblingWorkbook(xlsxwriter.Workbook):
+    """Workbook, собирающий листы, отрисованные в процессах пула"""
+    worksheet_class = RenderedWorksheet
+
+
+def render_sheet(spec: SheetSpec, options=None):
+    """Рендерит данные листа в отдельном workbook в режиме constant_memory"""
+    output = io.BytesIO()
+
+    workbook = RecordingWorkbook(output, dict(options or {}, constant_memory=True, in_memory=False))
+    sheet = Sheet(workbook, spec.name, streaming=True, record_placements=True)
+    spec.build(sheet)
+    sheet.flush()
+
+    worksheet = sheet.worksheet
+    merges = sheet_merges(worksheet)
+    dimensions = sheet_dimensions(worksheet)
+
+    workbook.close()
+
+    with zipfile.ZipFile(output) as package:
+        sheet_xml = package.read('xl/worksheets/sheet1.xml')
+
+    match = SHEET_DATA_PATTERN.search(sheet_xml)
+    sheet_data = match.group(1) if match else b''
+
+    # формат с индексом 0 - формат по умолчанию, он одинаков во всех workbook
+    formats = {
+        format_xf_index: xl_format.pandex_properties
+        for format_xf_index, xl_format in workbook_formats(workbook)
+        if format_xf_index and hasattr(xl_format, 'pandex_properties')
+    }
+
+    return RenderedSheet(sheet_data, merges, dimensions, formats, sheet_layout(sheet))
+
+
+def sheet_layout(sheet: Sheet):
+    """Расположение элементов листа: (строка, колонка, класс) каждого элемента и итоговый курсор листа"""
+    placements = [(cursor.row, cursor.col, type(element).__name__) for cursor, element in sheet.placements]
+    return placements, (sheet.cursor.row, sheet.cursor.col)
+
+
+def render_workbook(filename, specs, processes=None, options=None, cache=None):
+    """Рендерит листы workbook параллельно в пуле процессов и собирает итоговый xlsx в текущем процессе.
+
+    Данные листов (ячейки и объединения) записываются в процессах пула, а графики,
+    ширина колонок и стили - в основном процессе при повторном вызове build в режиме разметки.
+    processes=1 рендерит листы последовательно без пула.
+
+    cache (pandex.cache.RenderCache) - кеш отрисованных листов: листы, таблицы которых не изменились
+    с прошлого запуска, берутся из кеша, в пуле рендерятся только остальные.
+    """
+    workbook = AssemblingWorkbook(filename, options or {})
+
+    # Листы размечаются без записи ячеек: в них попадают графики и настройки колонок
+    sheets = []
+    for spec in specs:
+        sheet = Sheet(workbook, spec.name, streaming=True, record_placements=True)
+        spec.build(sheet)
+        sheets.append(sheet)
+
+    keys = [sheet_key(sheet, options) if cache is not None else None for sheet in sheets]
+    rendered = [cache.get(key) if key is not None else None for key in keys]
+
+    missing = [position for position, rendered_sheet in enumerate(rendered) if rendered_sheet is None]
+    if processes == 1 or len(missing) <= 1:
+        for position in missing:
+            rendered[position] = render_sheet(specs[position], options)
+    else:
+        context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else None)
+        with context.Pool(processes, initializer=_init_worker, initargs=(specs, options)) as pool:
+            for position, rendered_sheet in zip(missing, pool.map(_render_sheet, missing)):
+                rendered[position] = rendered_sheet
+
+    for position in missing:
+        if keys[position] is not None:
+            cache.put(keys[position], rendered[position])
+
+    for sheet, rendered_sheet in zip(sheets, rendered):
+        if rendered_sheet.layout != sheet_layout(sheet):
+            raise ValueError('Sheet %r was laid out differently in the worker process: '
+                             'SheetSpec.build must be pure and idempotent' % sheet.worksheet.name)
+
+        sheet.worksheet.apply(workbook, rendered_sheet)
+
+    workbook.close()
+
+
+def _init_worker(specs, options):
+    global _specs, _options
+
+    _specs = specs
+    _options = options
+
+
+def _render_sheet(position):
+    return render_sheet(_specs[position], _options)
@@ -1,11 +1,16 @@
+import re
+
 import setuptools
 
+with open("pandex/__init__.py", "r") as fh:
+    version = re.search(r"^__version__ = '(.+)'$", fh.read(), re.MULTILINE).group(1)
+
 with open("README.md", "r") as fh:
     long_description = fh.read()
 
 setuptools.setup(
     name="pandex",
-    version="0.1.5",
+    version=version,
     author="Alexandr A.",
     author_email="flo0.webmaster@gmail.com",
     description="Package for mapping pandas tables to excel and building charts",
@@ -13,6 +18,10 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     url="https://github.com/flo0web/pandex",
     packages=setuptools.find_packages(),
+    extras_require={
+        'arrow': ['pyarrow'],
+        'yaml': ['PyYAML'],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",